@@ -109,6 +109,80 @@ DATABASES = {
     }
 }
 
+# Read replica. Lists, reports, exports and budget checks read from it once DB_REPLICA_HOST
+# is set; without it the alias is never used. A user who writes reads from the primary for
+# the next DATABASE_REPLICA_PIN_SECONDS, which should cover the replication lag.
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+DATABASE_REPLICA_ENABLED = bool(DB_REPLICA_HOST)
+DATABASE_REPLICA_PIN_SECONDS = config('DATABASE_REPLICA_PIN_SECONDS', default=5, cast=int)
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'HOST': DB_REPLICA_HOST or DATABASES['default']['HOST'],
+    'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+    'TEST': {'MIRROR': 'default'},
+}
+DATABASE_ROUTERS = ['utils.db_router.ReplicaRouter']
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='')
+
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            }
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=60 * 15, cast=int)
+# Reports also move with billing events, which do not bump the data version.
+REPORT_CACHE_TIMEOUT = config('REPORT_CACHE_TIMEOUT', default=60, cast=int)
+
+# Users resolved by CustomAuthentication: per-process LRU bound and TTL, plus an
+# optional shared tier in the default cache that invalidates across workers.
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=10000, cast=int)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=300, cast=int)
+AUTH_USER_CACHE_SHARED = config('AUTH_USER_CACHE_SHARED', default=False, cast=bool)
+
+# Answer refresh token blacklist checks from the cache once it has been warmed. Needs a
+# cache shared by every worker that does not evict keys before they expire.
+JWT_BLACKLIST_CACHE_ENABLED = config('JWT_BLACKLIST_CACHE_ENABLED', default=bool(REDIS_CACHE_URL), cast=bool)
+
+# How long verification and password reset codes can be confirmed. Used and expired
+# requests are deleted by the `purge_stale_user_requests` task.
+VERIFICATION_REQUEST_LIFETIME_HOURS = config('VERIFICATION_REQUEST_LIFETIME_HOURS', default=72, cast=int)
+FORGET_PASSWORD_REQUEST_LIFETIME_HOURS = config('FORGET_PASSWORD_REQUEST_LIFETIME_HOURS', default=24, cast=int)
+
+# Email
+# https://docs.djangoproject.com/en/4.2/topics/email/
+
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='webmaster@localhost')
+
+# Verification and password reset emails are buffered on their request rows and sent by
+# `dispatch_pending_emails`, at most MAIL_DISPATCH_DELAY seconds after the first one is
+# queued, in batches sharing one backend connection.
+MAIL_DISPATCH_DELAY = config('MAIL_DISPATCH_DELAY', default=5, cast=int)
+MAIL_DISPATCH_BATCH_SIZE = config('MAIL_DISPATCH_BATCH_SIZE', default=100, cast=int)
+MAIL_DISPATCH_MAX_ATTEMPTS = config('MAIL_DISPATCH_MAX_ATTEMPTS', default=3, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -141,8 +215,13 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.OrderingFilter',
-        'rest_framework.filters.SearchFilter'
-    ]
+        'utils.filters.IndexedSearchFilter'
+    ],
+    # Counted in the default cache, which is shared by every worker when REDIS_CACHE_URL is set.
+    'DEFAULT_THROTTLE_RATES': {
+        'login': config('LOGIN_THROTTLE_RATE', default='10/min'),
+        'send-email': config('SEND_EMAIL_THROTTLE_RATE', default='5/hour'),
+    }
 }
 
 SWAGGER_SETTINGS = {
@@ -182,6 +261,9 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = './static/'
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = config('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -203,3 +285,38 @@ CELERY_WORKER_MAX_MEMORY_PER_CHILD = 300000  # Restart worker if it exceeds memo
 CELERY_TASK_REJECT_ON_WORKER_LOST = True  # Ensure tasks are retried if worker is lost
 CELERY_TASK_DEFAULT_RETRY_DELAY = 300  # Retry failed tasks after 5 minutes
 CELERY_TASK_RETRIES = 5  # Retry 5 times before giving up
+
+# Monthly transaction partitions (PostgreSQL): how many future months are created ahead
+# of time. Full past months older than the retention period are moved to columnar files
+# in PAYMENTS_ARCHIVE_DIR, still readable by reports and exports.
+PAYMENTS_PARTITION_MONTHS_AHEAD = config('PAYMENTS_PARTITION_MONTHS_AHEAD', default=3, cast=int)
+PAYMENTS_TRANSACTION_RETENTION_MONTHS = config('PAYMENTS_TRANSACTION_RETENTION_MONTHS', default=24, cast=int)
+PAYMENTS_ARCHIVE_DIR = config('PAYMENTS_ARCHIVE_DIR', default=str(BASE_DIR / 'archive' / 'transactions'))
+
+# Ad creatives. Uploads are sent in chunks to CREATIVE_UPLOAD_TEMP_DIR, which every web
+# worker must share, and can be resumed until they expire. A complete file is stored once
+# per SHA-256 in the default storage, with the renditions listed here (longest edge in px).
+CREATIVE_UPLOAD_TEMP_DIR = config('CREATIVE_UPLOAD_TEMP_DIR', default=str(BASE_DIR / 'uploads'))
+CREATIVE_UPLOAD_MAX_SIZE = config('CREATIVE_UPLOAD_MAX_SIZE', default=200 * 1024 * 1024, cast=int)
+CREATIVE_UPLOAD_LIFETIME_HOURS = config('CREATIVE_UPLOAD_LIFETIME_HOURS', default=24, cast=int)
+CREATIVE_RENDITION_SIZES = {
+    'thumbnail': 320,
+    'preview': 1280,
+}
+
+# User logos are uploaded as raw bytes and downscaled by the `process_user_logo` task to
+# these variants (longest edge in px); the largest one becomes `User.logo`.
+USER_LOGO_MAX_SIZE = config('USER_LOGO_MAX_SIZE', default=10 * 1024 * 1024, cast=int)
+USER_LOGO_SIZES = {
+    'small': 64,
+    'medium': 256,
+    'large': 512,
+}
+
+# Per-ad counters are buffered by each process and flushed by a background timer once this
+# many billing events are pending or the oldest one is this old. Failed flushes are retried.
+AD_STATS_FLUSH_EVENTS = config('AD_STATS_FLUSH_EVENTS', default=200, cast=int)
+AD_STATS_FLUSH_SECONDS = config('AD_STATS_FLUSH_SECONDS', default=5, cast=int)
+
+# Soft-deleted ads objects untouched for this long are moved to the archive.
+ADS_ARCHIVE_AFTER_DAYS = config('ADS_ARCHIVE_AFTER_DAYS', default=180, cast=int)
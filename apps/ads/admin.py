@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Ad, AdSet, GlobalAdPricing, Brand, Campaign
+from .models import Ad, AdSet, AdStats, ArchivedRecord, GlobalAdPricing, Brand, Campaign, Creative, PerformanceRollup
 
 
 @admin.register(GlobalAdPricing)
@@ -47,4 +47,37 @@ class AdAdmin(admin.ModelAdmin):
     )
     list_filter = ('adset', 'is_active')
     search_fields = ('name',)
+    raw_id_fields = ('creative',)
     ordering = ('name',)
+
+
+@admin.register(AdStats)
+class AdStatsAdmin(admin.ModelAdmin):
+    list_display = ('ad', 'clicks', 'impressions', 'views', 'acquisitions', 'spend', 'updated_at')
+    raw_id_fields = ('ad',)
+    ordering = ('-updated_at',)
+
+
+@admin.register(Creative)
+class CreativeAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'owner', 'size', 'content_type', 'created_at')
+    search_fields = ('sha256',)
+    raw_id_fields = ('owner',)
+    ordering = ('-created_at',)
+
+
+@admin.register(PerformanceRollup)
+class PerformanceRollupAdmin(admin.ModelAdmin):
+    list_display = ('brand', 'campaign', 'ad', 'cost_type', 'local_date', 'local_hour', 'events', 'amount')
+    list_filter = ('cost_type', 'brand')
+    raw_id_fields = ('brand', 'campaign', 'adset', 'ad', 'owner')
+    ordering = ('-local_date', '-local_hour')
+
+
+@admin.register(ArchivedRecord)
+class ArchivedRecordAdmin(admin.ModelAdmin):
+    list_display = ('model_label', 'object_id', 'owner', 'deactivated_at', 'created_at')
+    list_filter = ('model_label',)
+    search_fields = ('object_id',)
+    raw_id_fields = ('owner',)
+    ordering = ('-created_at',)
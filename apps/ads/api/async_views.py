@@ -0,0 +1,225 @@
+from math import ceil
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import Http404, JsonResponse
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from apps.ads.api.views import AdSetViewSet, AdViewSet, BrandViewSet, CampaignViewSet, PerformanceReportAPIView
+from apps.ads.services import ReportingService
+from apps.authentication.authentications import CustomAuthentication
+from mixins.view_mixins import ResponseCacheMixin
+from utils import db_router
+from utils.cache import aget_data_version, record_response_cache
+from utils.decorators import view_cache_key
+from utils.exceptions import custom_exception_handler
+
+
+class AsyncReadView(View):
+    """
+    Async read-only endpoint backed by a DRF view.
+
+    The queryset, filters, page size and serializer come from `drf_view_class`, so both
+    paths answer the same way. Authentication, the response cache and every database round
+    trip are awaited, which lets one process hold many slow clients without a thread each.
+    """
+    drf_view_class = None
+    action = None
+    http_method_names = ['get']
+    cache_timeout = settings.RESPONSE_CACHE_TIMEOUT
+
+    async def get(self, request, *args, **kwargs):
+        # Thread-run queries copy the context, so the routing of this request follows them.
+        with db_router.replica_scope():
+            return await self.respond(request, **kwargs)
+
+    async def respond(self, request, **kwargs):
+        try:
+            drf_request, view = await self.initialize(request, kwargs)
+            if view.reads_from_replica(drf_request):
+                db_router.route_reads_to_replica(not await db_router.ais_pinned(drf_request.user.pk))
+            key = view_cache_key(self, drf_request, **kwargs)
+            version = await self.get_cache_version(drf_request, view)
+            cached_data = await cache.aget(key, version=version)
+            record_response_cache(hit=cached_data is not None)
+            if cached_data is not None:
+                return self.render(cached_data['data'], cached_data['status'], 'HIT')
+            data = await self.get_data(drf_request, view, **kwargs)
+        except (exceptions.APIException, Http404, PermissionDenied) as exc:
+            return self.handle_exception(request, exc)
+
+        response_dict = {'data': data, 'status': status.HTTP_200_OK, 'headers': {}}
+        await cache.aset(key, response_dict, self.cache_timeout, version=version)
+        return self.render(data, status.HTTP_200_OK, 'MISS')
+
+    async def initialize(self, request, kwargs):
+        user_auth = await CustomAuthentication().aauthenticate(request)
+        if user_auth is None:
+            raise exceptions.NotAuthenticated()
+        drf_request = Request(request)
+        drf_request.user = user_auth[0]
+        view = self.drf_view_class(
+            request=drf_request, args=(), kwargs=kwargs, action=self.action, format_kwarg=None
+        )
+        view.headers = {}
+        return drf_request, view
+
+    async def get_cache_version(self, drf_request, view):
+        # The version the DRF view caches under, so a write invalidates both paths.
+        if isinstance(view, ResponseCacheMixin):
+            return await view.aget_cache_version(drf_request)
+        return await aget_data_version(drf_request.user.pk)
+
+    async def get_data(self, drf_request, view, **kwargs):
+        raise NotImplementedError('`get_data()` must be implemented.')
+
+    async def filter_queryset(self, view):
+        # Filter sets validate model choices against the database, so they run in a thread.
+        return await sync_to_async(view.filter_queryset)(view.get_queryset())
+
+    async def paginate(self, drf_request, view, queryset):
+        """
+        Async counterpart of the page number pagination used by `drf_view_class`.
+        Returns the page rows and the envelope without `results`.
+        """
+        paginator = view.paginator
+        page_size = paginator.get_page_size(drf_request)
+        try:
+            page_number = int(drf_request.query_params.get(paginator.page_query_param, 1))
+        except ValueError:
+            raise exceptions.NotFound(_('Invalid page.'))
+
+        count = await queryset.acount()
+        num_pages = max(1, ceil(count / page_size))
+        if not 1 <= page_number <= num_pages:
+            raise exceptions.NotFound(_('Invalid page.'))
+
+        offset = (page_number - 1) * page_size
+        rows = [row async for row in queryset[offset:offset + page_size]]
+
+        url = drf_request.build_absolute_uri()
+        next_url = previous_url = None
+        if page_number < num_pages:
+            next_url = replace_query_param(url, paginator.page_query_param, page_number + 1)
+        if page_number == 2:
+            previous_url = remove_query_param(url, paginator.page_query_param)
+        elif page_number > 2:
+            previous_url = replace_query_param(url, paginator.page_query_param, page_number - 1)
+        return rows, {'count': count, 'next': next_url, 'previous': previous_url}
+
+    def handle_exception(self, request, exc):
+        response = custom_exception_handler(exc, {'view': self, 'request': request})
+        json_response = self.render(response.data, response.status_code)
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            json_response['WWW-Authenticate'] = CustomAuthentication().authenticate_header(request)
+        return json_response
+
+    @staticmethod
+    def render(data, status_code, cache_status=None):
+        response = JsonResponse(data, status=status_code, encoder=JSONEncoder, safe=False)
+        if cache_status:
+            response['X-Cache'] = cache_status
+        return response
+
+
+class AsyncListView(AsyncReadView):
+    action = 'list'
+
+    async def get_data(self, drf_request, view, **kwargs):
+        queryset = await self.filter_queryset(view)
+        objects, page = await self.paginate(drf_request, view, queryset)
+        page['results'] = view.get_serializer(objects, many=True).data
+        return page
+
+
+class AsyncDetailView(AsyncReadView):
+    action = 'retrieve'
+
+    async def get_data(self, drf_request, view, **kwargs):
+        queryset = await self.filter_queryset(view)
+        try:
+            instance = await queryset.aget(**{view.lookup_field: kwargs[view.lookup_field]})
+        except (queryset.model.DoesNotExist, ValidationError, ValueError, TypeError):
+            raise Http404
+        return view.get_serializer(instance).data
+
+
+class AsyncBrandListView(AsyncListView):
+    __doc__ = _("""
+    Async read endpoint for Brands.
+    """)
+    drf_view_class = BrandViewSet
+
+
+class AsyncBrandDetailView(AsyncDetailView):
+    __doc__ = _("""
+    Async read endpoint for a Brand.
+    """)
+    drf_view_class = BrandViewSet
+
+
+class AsyncCampaignListView(AsyncListView):
+    __doc__ = _("""
+    Async read endpoint for Campaigns.
+    """)
+    drf_view_class = CampaignViewSet
+
+
+class AsyncCampaignDetailView(AsyncDetailView):
+    __doc__ = _("""
+    Async read endpoint for a Campaign.
+    """)
+    drf_view_class = CampaignViewSet
+
+
+class AsyncAdSetListView(AsyncListView):
+    __doc__ = _("""
+    Async read endpoint for AdSets.
+    """)
+    drf_view_class = AdSetViewSet
+
+
+class AsyncAdSetDetailView(AsyncDetailView):
+    __doc__ = _("""
+    Async read endpoint for an AdSet.
+    """)
+    drf_view_class = AdSetViewSet
+
+
+class AsyncAdListView(AsyncListView):
+    __doc__ = _("""
+    Async read endpoint for Ads.
+    """)
+    drf_view_class = AdViewSet
+
+
+class AsyncAdDetailView(AsyncDetailView):
+    __doc__ = _("""
+    Async read endpoint for an Ad.
+    """)
+    drf_view_class = AdViewSet
+
+
+class AsyncPerformanceReportView(AsyncReadView):
+    __doc__ = _("""
+    Async read endpoint for performance reports, answered from hourly rollups.
+    """)
+    drf_view_class = PerformanceReportAPIView
+    action = 'report'
+    cache_timeout = settings.REPORT_CACHE_TIMEOUT
+
+    async def get_data(self, drf_request, view, **kwargs):
+        serializer = view.get_serializer(data=drf_request.query_params)
+        serializer.is_valid(raise_exception=True)
+        # The default date range reads the brands' timezones, so the report is built in a thread.
+        report = await sync_to_async(view.get_report)(serializer.validated_data)
+        rows, page = await self.paginate(drf_request, view, report)
+        page['results'] = [ReportingService.format_row(row) for row in rows]
+        return page
@@ -1,7 +1,14 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.validators import RegexValidator
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
-from apps.ads.models import Campaign, AdSet, Ad, Brand
+from apps.ads.models import Campaign, AdSet, Ad, Brand, Creative, CreativeUpload
+from apps.ads.services import ReportingService
 
 
 class BrandSerializer(serializers.ModelSerializer):
@@ -26,7 +33,7 @@ class CampaignSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         user = self.context['request'].user
         brand = attrs['brand']
-        if brand.owner != user:
+        if brand.owner_id != user.pk:
             raise serializers.ValidationError(
                 _("invalid.")
             )
@@ -52,17 +59,39 @@ class AdSetSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         user = self.context['request'].user
         campaign = attrs['campaign']
-        if campaign.brand.owner != user:
+        if campaign.owner_id != user.pk:
             raise serializers.ValidationError(
                 _("invalid.")
             )
         return attrs
 
 
+class AdStatsFieldMixin(object):
+    """Reads a counter of the ad's `stats`, zero until the ad gets its first billed event."""
+
+    def get_attribute(self, instance):
+        stats = getattr(instance, 'stats', None)
+        return getattr(stats, self.source_attrs[-1]) if stats is not None else 0
+
+
+class AdStatsIntegerField(AdStatsFieldMixin, serializers.IntegerField):
+    pass
+
+
+class AdStatsDecimalField(AdStatsFieldMixin, serializers.DecimalField):
+    pass
+
+
 class AdSerializer(serializers.ModelSerializer):
     __doc__ = _("""
-               Ad serializer.
+               Ad serializer. The counters and spend are read-only and may lag billing
+               by a few seconds.
            """)
+    clicks = AdStatsIntegerField(source='stats.clicks', read_only=True)
+    impressions = AdStatsIntegerField(source='stats.impressions', read_only=True)
+    views = AdStatsIntegerField(source='stats.views', read_only=True)
+    acquisitions = AdStatsIntegerField(source='stats.acquisitions', read_only=True)
+    spend = AdStatsDecimalField(source='stats.spend', max_digits=16, decimal_places=4, read_only=True)
 
     class Meta:
         model = Ad
@@ -71,8 +100,96 @@ class AdSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         user = self.context['request'].user
         adset = attrs['adset']
-        if adset.campaign.brand.owner != user:
+        if adset.owner_id != user.pk:
+            raise serializers.ValidationError(
+                _("invalid.")
+            )
+        creative = attrs.get('creative')
+        if creative is not None and creative.owner_id != user.pk:
             raise serializers.ValidationError(
                 _("invalid.")
             )
         return attrs
+
+
+class CreativeSerializer(serializers.ModelSerializer):
+    __doc__ = _("""
+               Creative serializer. `renditions` maps each rendition name to its URL,
+               and stays empty until the renditions are generated.
+           """)
+    renditions = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Creative
+        fields = ('uuid', 'sha256', 'file', 'size', 'content_type', 'renditions', 'created_at')
+        read_only_fields = fields
+
+    def get_renditions(self, obj):
+        return {name: default_storage.url(storage_name) for name, storage_name in obj.renditions.items()}
+
+
+class CreativeUploadSerializer(serializers.ModelSerializer):
+    __doc__ = _("""
+               Creative upload serializer. Send the chunks with `PUT` and an `Upload-Offset`
+               header equal to `received`; `creative` is set once every byte is in.
+           """)
+    sha256 = serializers.CharField(
+        validators=[RegexValidator(r'^[0-9a-fA-F]{64}$', _("Enter the hex SHA-256 of the file."))]
+    )
+    size = serializers.IntegerField(min_value=1, max_value=settings.CREATIVE_UPLOAD_MAX_SIZE)
+
+    class Meta:
+        model = CreativeUpload
+        fields = ('uuid', 'sha256', 'size', 'content_type', 'received', 'creative', 'expires_at')
+        read_only_fields = ('received', 'creative', 'expires_at')
+
+    def validate_sha256(self, value):
+        return value.lower()
+
+
+class PerformanceReportQuerySerializer(serializers.Serializer):
+    __doc__ = _("""
+               Performance report query parameters.
+               Dates are inclusive and in each brand's timezone. Without `end`, reports run
+               to today in each brand's timezone.
+           """)
+    DEFAULT_RANGE_DAYS = 7
+    MAX_RANGE_DAYS = 366
+    # UTC+14 is the furthest ahead any brand's today can be.
+    MAX_UTC_OFFSET = timedelta(hours=14)
+
+    group_by = serializers.CharField(default='campaign,day')
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    brand = serializers.UUIDField(required=False)
+    campaign = serializers.UUIDField(required=False)
+    adset = serializers.UUIDField(required=False)
+    ad = serializers.UUIDField(required=False)
+
+    def validate_group_by(self, value):
+        dimensions = [dimension.strip() for dimension in value.split(',') if dimension.strip()]
+        invalid = set(dimensions) - set(ReportingService.DIMENSIONS)
+        if not dimensions or invalid:
+            raise serializers.ValidationError(
+                _("Choose from: %s.") % ', '.join(ReportingService.DIMENSIONS)
+            )
+        return dimensions
+
+    def validate(self, attrs):
+        start, end = attrs.get('start'), attrs.get('end')
+        if end is None:
+            # The view resolves each brand's today; the checks below use the latest one.
+            attrs['start'], attrs['end'] = start, None
+            if start is None:
+                return attrs
+            end = (timezone.now() + self.MAX_UTC_OFFSET).date()
+        else:
+            start = start or end - timedelta(days=self.DEFAULT_RANGE_DAYS - 1)
+            attrs['start'], attrs['end'] = start, end
+        if start > end:
+            raise serializers.ValidationError(_("start must not be after end."))
+        if (end - start).days >= self.MAX_RANGE_DAYS:
+            raise serializers.ValidationError(
+                _("Date range cannot exceed %s days.") % self.MAX_RANGE_DAYS
+            )
+        return attrs
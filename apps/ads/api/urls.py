@@ -1,13 +1,38 @@
+from django.urls import path
 from rest_framework import routers
 
-from .views import CampaignViewSet, AdViewSet, BrandViewSet, AdSetViewSet
+from .async_views import (
+    AsyncAdDetailView, AsyncAdListView, AsyncAdSetDetailView, AsyncAdSetListView, AsyncBrandDetailView,
+    AsyncBrandListView, AsyncCampaignDetailView, AsyncCampaignListView, AsyncPerformanceReportView
+)
+from .views import (
+    CampaignViewSet, AdViewSet, BrandViewSet, AdSetViewSet, CreativeUploadViewSet, CreativeViewSet,
+    PerformanceReportAPIView
+)
 
 router = routers.DefaultRouter()
 router.register('campaigns', CampaignViewSet, basename='campaigns-api')
 router.register('ads', AdViewSet, basename='ads-api')
 router.register('ad-sets', AdSetViewSet, basename='ad-sets-api')
 router.register('brands', BrandViewSet, basename='brands-api')
+router.register('creatives', CreativeViewSet, basename='creatives-api')
+router.register('creative-uploads', CreativeUploadViewSet, basename='creative-uploads-api')
 
-urlpatterns = []
+async_urlpatterns = [
+    path('async/brands/', AsyncBrandListView.as_view(), name='async-brands-api-list'),
+    path('async/brands/<uuid:pk>/', AsyncBrandDetailView.as_view(), name='async-brands-api-detail'),
+    path('async/campaigns/', AsyncCampaignListView.as_view(), name='async-campaigns-api-list'),
+    path('async/campaigns/<uuid:pk>/', AsyncCampaignDetailView.as_view(), name='async-campaigns-api-detail'),
+    path('async/ad-sets/', AsyncAdSetListView.as_view(), name='async-ad-sets-api-list'),
+    path('async/ad-sets/<uuid:pk>/', AsyncAdSetDetailView.as_view(), name='async-ad-sets-api-detail'),
+    path('async/ads/', AsyncAdListView.as_view(), name='async-ads-api-list'),
+    path('async/ads/<uuid:pk>/', AsyncAdDetailView.as_view(), name='async-ads-api-detail'),
+    path('async/reports/performance/', AsyncPerformanceReportView.as_view(), name='async-performance-report-api'),
+]
 
+urlpatterns = [
+    path('reports/performance/', PerformanceReportAPIView.as_view(), name='performance-report-api'),
+]
+
+urlpatterns += async_urlpatterns
 urlpatterns += router.urls
@@ -1,15 +1,32 @@
+from datetime import timedelta
+
+import pytz
+from django.conf import settings
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import viewsets
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework import exceptions, generics, mixins, status, viewsets
+from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-from apps.ads.api.serializers import CampaignSerializer, BrandSerializer, AdSerializer, AdSetSerializer
-from apps.ads.models import Campaign, Brand, Ad, AdSet
+from apps.ads.api.serializers import (
+    CampaignSerializer, BrandSerializer, AdSerializer, AdSetSerializer, CreativeSerializer, CreativeUploadSerializer,
+    PerformanceReportQuerySerializer
+)
+from apps.ads.models import Campaign, Brand, Ad, AdSet, Creative, CreativeUpload, PerformanceRollup
+from apps.ads.services import CreativeService, ReportingService, UploadConflict
 from apps.authentication.authentications import CustomAuthentication
+from mixins.view_mixins import ConditionalGetMixin, ReplicaReadMixin, ResponseCacheMixin, SparseFieldsetMixin
+from utils.cache import aget_ad_stats_version, get_ad_stats_version
+from utils.decorators import cache_response, owner_data_version
+from utils.filters import IndexedSearchFilter
 
 
-class BrandViewSet(viewsets.ModelViewSet):
+class BrandViewSet(ReplicaReadMixin, ResponseCacheMixin, ConditionalGetMixin, SparseFieldsetMixin,
+                   viewsets.ModelViewSet):
     __doc__ = _("""
     API endpoint for Brand.
     """)
@@ -23,10 +40,11 @@ class BrandViewSet(viewsets.ModelViewSet):
     ordering_fields = (
         'name', 'created_at', 'updated_at'
     )
+    ordering = ('-created_at',)
     filter_backends = [
         DjangoFilterBackend,
         OrderingFilter,
-        SearchFilter
+        IndexedSearchFilter
     ]
 
     def get_queryset(self):
@@ -40,7 +58,8 @@ class BrandViewSet(viewsets.ModelViewSet):
         instance.save()
 
 
-class CampaignViewSet(viewsets.ModelViewSet):
+class CampaignViewSet(ReplicaReadMixin, ResponseCacheMixin, ConditionalGetMixin, SparseFieldsetMixin,
+                      viewsets.ModelViewSet):
     __doc__ = _("""
     API endpoint for Campaigns.
     """)
@@ -55,23 +74,25 @@ class CampaignViewSet(viewsets.ModelViewSet):
         'name', 'status',
         'created_at', 'updated_at'
     )
+    ordering = ('-created_at',)
     filterset_fields = ('brand', 'status')
 
     filter_backends = [
         DjangoFilterBackend,
         OrderingFilter,
-        SearchFilter
+        IndexedSearchFilter
     ]
 
     def get_queryset(self):
-        return super().get_queryset().filter(brand__owner=self.request.user)
+        return super().get_queryset().filter(owner=self.request.user)
 
     def perform_destroy(self, instance):
         instance.is_active = False
         instance.save()
 
 
-class AdSetViewSet(viewsets.ModelViewSet):
+class AdSetViewSet(ReplicaReadMixin, ResponseCacheMixin, ConditionalGetMixin, SparseFieldsetMixin,
+                   viewsets.ModelViewSet):
     __doc__ = _("""
     API endpoint for AdSet.
     """)
@@ -85,23 +106,25 @@ class AdSetViewSet(viewsets.ModelViewSet):
     ordering_fields = (
         'name', 'created_at', 'updated_at'
     )
+    ordering = ('-created_at',)
     filterset_fields = ('campaign', 'campaign__brand')
 
     filter_backends = [
         DjangoFilterBackend,
         OrderingFilter,
-        SearchFilter
+        IndexedSearchFilter
     ]
 
     def get_queryset(self):
-        return super().get_queryset().filter(campaign__brand__owner=self.request.user)
+        return super().get_queryset().filter(owner=self.request.user)
 
     def perform_destroy(self, instance):
         instance.is_active = False
         instance.save()
 
 
-class AdViewSet(viewsets.ModelViewSet):
+class AdViewSet(ReplicaReadMixin, ResponseCacheMixin, ConditionalGetMixin, SparseFieldsetMixin,
+                viewsets.ModelViewSet):
     __doc__ = _("""
     API endpoint for Ad.
     """)
@@ -115,17 +138,142 @@ class AdViewSet(viewsets.ModelViewSet):
     ordering_fields = (
         'name', 'created_at', 'updated_at'
     )
+    ordering = ('-created_at',)
     filterset_fields = ('adset', 'adset__campaign', 'adset__campaign__brand')
+    etag_fields = ('updated_at', 'stats__updated_at')
 
     filter_backends = [
         DjangoFilterBackend,
         OrderingFilter,
-        SearchFilter
+        IndexedSearchFilter
     ]
 
     def get_queryset(self):
-        return super().get_queryset().filter(adset__campaign__brand__owner=self.request.user)
+        return super().get_queryset().filter(owner=self.request.user).select_related('stats')
+
+    # Counter flushes only refresh the ad responses, not the owner's whole cache.
+    def get_cache_version(self, request):
+        return f'{super().get_cache_version(request)}.{get_ad_stats_version(request.user.pk)}'
+
+    async def aget_cache_version(self, request):
+        return f'{await super().aget_cache_version(request)}.{await aget_ad_stats_version(request.user.pk)}'
 
     def perform_destroy(self, instance):
         instance.is_active = False
         instance.save()
+
+
+class UploadOffsetConflict(exceptions.APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _('The chunk does not start where the upload stands.')
+    default_code = 'upload_offset_conflict'
+
+
+class CreativeViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    __doc__ = _("""
+    API endpoint for the creatives of the user, created through creative uploads.
+    """)
+    serializer_class = CreativeSerializer
+    authentication_classes = (CustomAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    queryset = Creative.objects.all()
+    ordering_fields = (
+        'created_at', 'size'
+    )
+    ordering = ('-created_at',)
+    filterset_fields = ('sha256',)
+    filter_backends = [
+        DjangoFilterBackend,
+        OrderingFilter
+    ]
+
+    def get_queryset(self):
+        return super().get_queryset().filter(owner=self.request.user)
+
+
+class CreativeUploadViewSet(ReplicaReadMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                            viewsets.GenericViewSet):
+    __doc__ = _("""
+    API endpoint for chunked, resumable creative uploads.
+    `POST` declares the `sha256` and `size` of the file; the upload comes back complete when
+    the user already has that content. Each `PUT` sends the next chunk as the raw request body,
+    with an `Upload-Offset` header equal to `received`. After an interruption, `GET` tells
+    where to resume.
+    """)
+    serializer_class = CreativeUploadSerializer
+    authentication_classes = (CustomAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    queryset = CreativeUpload.objects.all()
+    http_method_names = ['get', 'post', 'put', 'head', 'options']
+    replica_actions = ()
+
+    def get_queryset(self):
+        return super().get_queryset().filter(owner=self.request.user, expires_at__gt=timezone.now())
+
+    def perform_create(self, serializer):
+        serializer.instance = CreativeService.start_upload(owner=self.request.user, **serializer.validated_data)
+
+    def update(self, request, *args, **kwargs):
+        try:
+            offset = int(request.headers['Upload-Offset'])
+        except (KeyError, ValueError):
+            raise exceptions.ValidationError({'Upload-Offset': _('Send the byte offset of the chunk.')})
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+
+        upload = get_object_or_404(self.get_queryset(), pk=kwargs['pk'])
+        if upload.creative_id is None:
+            try:
+                upload = CreativeService.write_chunk(upload, offset, request.stream, length)
+            except UploadConflict as exc:
+                raise UploadOffsetConflict(str(exc))
+            except ValueError as exc:
+                raise exceptions.ParseError(str(exc))
+        return Response(self.get_serializer(upload).data, headers={'Upload-Offset': str(upload.received)})
+
+
+class PerformanceReportAPIView(ReplicaReadMixin, generics.GenericAPIView):
+    __doc__ = _("""
+    API endpoint for campaign and ad performance reports.
+    Answered from hourly rollups, grouped by `group_by` (brand, campaign, adset, ad, day, hour, cost_type).
+    """)
+    serializer_class = PerformanceReportQuerySerializer
+    authentication_classes = (CustomAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    queryset = PerformanceRollup.objects.all()
+    report_filters = ('brand', 'campaign', 'adset', 'ad')
+    replica_actions = None
+
+    def get_queryset(self):
+        return super().get_queryset().filter(owner=self.request.user)
+
+    def get_date_filter(self, params):
+        """
+        Rollups are bucketed by each brand's local date, so without `end` the range runs to
+        today in each brand's timezone.
+        """
+        if params['end'] is not None:
+            return Q(local_date__gte=params['start'], local_date__lte=params['end'])
+        brands = Brand.objects.filter(owner=self.request.user)
+        if params.get('brand'):
+            brands = brands.filter(uuid=params['brand'])
+        now = timezone.now()
+        date_filter = Q(pk__in=[])
+        for timezone_str in brands.order_by().values_list('timezone_str', flat=True).distinct():
+            today = now.astimezone(pytz.timezone(timezone_str)).date()
+            start = params['start'] or today - timedelta(days=self.serializer_class.DEFAULT_RANGE_DAYS - 1)
+            date_filter |= Q(brand__timezone_str=timezone_str, local_date__gte=start, local_date__lte=today)
+        return date_filter
+
+    def get_report(self, params):
+        rollups = self.get_queryset().filter(self.get_date_filter(params))
+        for field in self.report_filters:
+            if params.get(field):
+                rollups = rollups.filter(**{field: params[field]})
+        return ReportingService.performance_report(rollups, params['group_by'])
+
+    @cache_response(timeout=settings.REPORT_CACHE_TIMEOUT, cache_version=owner_data_version)
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        page = self.paginate_queryset(self.get_report(serializer.validated_data))
+        return self.get_paginated_response([ReportingService.format_row(row) for row in page])
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from apps.ads.models import Ad, AdSet, Brand, Campaign
+
+
+class Command(BaseCommand):
+    help = 'Populates the denormalized brand/owner columns of campaigns, ad sets and ads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Resync every row instead of only the rows without an owner.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        only_missing = not options['all']
+
+        brands = Brand.objects.filter(pk=OuterRef('brand_id'))
+        campaigns = Campaign.objects.filter(pk=OuterRef('campaign_id'))
+        adsets = AdSet.objects.filter(pk=OuterRef('adset_id'))
+
+        # Parents first, so every level copies already populated columns.
+        steps = (
+            (Campaign, {
+                'owner_id': Subquery(brands.values('owner_id')[:1]),
+            }),
+            (AdSet, {
+                'brand_id': Subquery(campaigns.values('brand_id')[:1]),
+                'owner_id': Subquery(campaigns.values('owner_id')[:1]),
+            }),
+            (Ad, {
+                'brand_id': Subquery(adsets.values('brand_id')[:1]),
+                'owner_id': Subquery(adsets.values('owner_id')[:1]),
+            }),
+        )
+        for model, values in steps:
+            queryset = model.objects.order_by('pk')
+            if only_missing:
+                queryset = queryset.filter(owner__isnull=True)
+            updated = 0
+            last_pk = None
+            while True:
+                batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+                pks = list(batch.values_list('pk', flat=True)[:batch_size])
+                if not pks:
+                    break
+                updated += model.objects.filter(pk__in=pks).update(**values)
+                last_pk = pks[-1]
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {updated} rows updated')
+        self.stdout.write(self.style.SUCCESS('Owner backfill finished.'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_datetime
+
+from apps.ads.models import AdStats, Brand, PerformanceRollup
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the hourly performance rollups from the transaction ledger, then the ad counters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--brand', help='UUID of a single brand to rebuild.')
+        parser.add_argument(
+            '--since',
+            type=parse_datetime,
+            help='ISO datetime; rebuilds from the local day containing it instead of from the beginning.'
+        )
+
+    def handle(self, *args, **options):
+        brands = Brand.objects.order_by('pk')
+        if options['brand']:
+            brands = brands.filter(pk=options['brand'])
+        for brand in brands.iterator():
+            PerformanceRollup.rebuild(brand, since=options['since'])
+            AdStats.rebuild(brand)
+            self.stdout.write(f'Rebuilt rollups for {brand}')
+        self.stdout.write(self.style.SUCCESS('Performance rollups rebuilt.'))
@@ -0,0 +1,106 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Brand',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the object was created.', verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('name', models.CharField(max_length=128, verbose_name='Title')),
+                ('daily_budget', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Title')),
+                ('monthly_budget', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Title')),
+                ('timezone_str', models.CharField(default='UTC', max_length=50, verbose_name='Title')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Active ?')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='brands', to=settings.AUTH_USER_MODEL, verbose_name='Owner')),
+            ],
+            options={
+                'verbose_name': 'Brand',
+                'verbose_name_plural': 'Brand',
+            },
+        ),
+        migrations.CreateModel(
+            name='GlobalAdPricing',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the object was created.', verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('cost_per_click', models.DecimalField(decimal_places=4, default=0.05, max_digits=10, verbose_name='Default Cost Per Click')),
+                ('cost_per_impression', models.DecimalField(decimal_places=2, default=2.0, max_digits=10, verbose_name='Default Cost Per 1000 Impressions')),
+                ('cost_per_view', models.DecimalField(decimal_places=4, default=0.1, max_digits=10, verbose_name='Default Cost Per View')),
+                ('cost_per_acquisition', models.DecimalField(decimal_places=2, default=10.0, max_digits=10, verbose_name='Default Cost Per Acquisition')),
+            ],
+            options={
+                'verbose_name': 'Global Ad Pricing',
+                'verbose_name_plural': 'Global Ad Pricing',
+            },
+        ),
+        migrations.CreateModel(
+            name='Campaign',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the object was created.', verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('scheduled', 'Scheduled'), ('budget_reached', 'Budget Reached'), ('running', 'Running'), ('paused', 'Paused'), ('completed', 'Completed')], default='draft', max_length=14, verbose_name='Status')),
+                ('name', models.CharField(max_length=100, verbose_name='Name')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Active?')),
+                ('allowed_start_hour', models.TimeField(blank=True, null=True, verbose_name='Allowed Start Hour')),
+                ('allowed_end_hour', models.TimeField(blank=True, null=True, verbose_name='Allowed End Hour')),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='campaigns', to='ads.brand', verbose_name='Brand')),
+            ],
+            options={
+                'verbose_name': 'Campaign',
+                'verbose_name_plural': 'Campaigns',
+            },
+        ),
+        migrations.CreateModel(
+            name='AdSet',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the object was created.', verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('name', models.CharField(max_length=100, verbose_name='Name')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Active?')),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='adsets', to='ads.campaign', verbose_name='Campaign')),
+            ],
+            options={
+                'verbose_name': 'Ad Set',
+                'verbose_name_plural': 'Ad Sets',
+            },
+        ),
+        migrations.CreateModel(
+            name='Ad',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the object was created.', verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('name', models.CharField(max_length=100, verbose_name='Name')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Active?')),
+                ('file', models.FileField(blank=True, null=True, upload_to='ads/', verbose_name='File')),
+                ('content', models.TextField(blank=True, null=True, verbose_name='Content')),
+                ('cost_per_click', models.DecimalField(blank=True, decimal_places=4, max_digits=10, null=True, verbose_name='Cost Per Click')),
+                ('cost_per_impression', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Cost Per 1000 Impressions')),
+                ('cost_per_view', models.DecimalField(blank=True, decimal_places=4, max_digits=10, null=True, verbose_name='Cost Per View')),
+                ('cost_per_acquisition', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Cost Per Acquisition')),
+                ('adset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ads', to='ads.adset', verbose_name='Ad Set')),
+            ],
+            options={
+                'verbose_name': 'Ad',
+                'verbose_name_plural': 'Ads',
+            },
+        ),
+    ]
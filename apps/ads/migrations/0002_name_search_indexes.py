@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+SEARCH_TABLES = ('ads_brand', 'ads_campaign', 'ads_adset', 'ads_ad')
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # `icontains` compiles to `UPPER(name::text) LIKE ...`, which a
+        # gin_trgm_ops index on the same expression can answer.
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table in SEARCH_TABLES:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {table}_name_trgm ON {table} USING gin (UPPER(name::text) gin_trgm_ops)'
+            )
+    elif vendor == 'sqlite':
+        # SQLite only applies its LIKE optimization to NOCASE indexes.
+        for table in SEARCH_TABLES:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {table}_name_nocase ON {table} (name COLLATE NOCASE)'
+            )
+
+
+def drop_search_indexes(apps, schema_editor):
+    suffix = {'postgresql': 'trgm', 'sqlite': 'nocase'}.get(schema_editor.connection.vendor)
+    if suffix is None:
+        return
+    for table in SEARCH_TABLES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_name_{suffix}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['name'], name='ads_ad_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adset',
+            index=models.Index(fields=['name'], name='ads_adset_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='brand',
+            index=models.Index(fields=['name'], name='ads_brand_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['name'], name='ads_campaign_name_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
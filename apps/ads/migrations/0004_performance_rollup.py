@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ads', '0003_denormalized_owner'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerformanceRollup',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the object was created.', verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('cost_type', models.CharField(blank=True, max_length=15, null=True, verbose_name='Cost Type')),
+                ('local_date', models.DateField(verbose_name='Local Date')),
+                ('local_hour', models.PositiveSmallIntegerField(verbose_name='Local Hour')),
+                ('events', models.PositiveIntegerField(default=0, verbose_name='Events')),
+                ('amount', models.DecimalField(decimal_places=4, default=0, max_digits=14, verbose_name='Amount')),
+                ('ad', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='performance_rollups', to='ads.ad', verbose_name='Ad')),
+                ('adset', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='performance_rollups', to='ads.adset', verbose_name='Ad Set')),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='performance_rollups', to='ads.brand', verbose_name='Brand')),
+                ('campaign', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='performance_rollups', to='ads.campaign', verbose_name='Campaign')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Owner')),
+            ],
+            options={
+                'verbose_name': 'Performance Rollup',
+                'verbose_name_plural': 'Performance Rollups',
+                'indexes': [models.Index(fields=['owner', 'local_date'], name='ads_rollup_owner_date_idx'), models.Index(fields=['brand', 'local_date'], name='ads_rollup_brand_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='performancerollup',
+            constraint=models.UniqueConstraint(fields=('brand', 'campaign', 'ad', 'cost_type', 'local_date', 'local_hour'), name='ads_rollup_unique_bucket'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:31
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ads', '0004_performance_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedRecord',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the object was created.', verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('model_label', models.CharField(max_length=64, verbose_name='Model')),
+                ('object_id', models.UUIDField(verbose_name='Object ID')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Data')),
+                ('deactivated_at', models.DateTimeField(verbose_name='Deactivated at')),
+            ],
+            options={
+                'verbose_name': 'Archived Record',
+                'verbose_name_plural': 'Archived Records',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', '-created_at'], name='ads_ad_owner_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['adset'], name='ads_ad_adset_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['updated_at'], name='ads_ad_inactive_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adset',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', '-created_at'], name='ads_adset_owner_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adset',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['campaign'], name='ads_adset_campaign_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adset',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['updated_at'], name='ads_adset_inactive_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='brand',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', '-created_at'], name='ads_brand_owner_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='brand',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['updated_at'], name='ads_brand_inactive_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', '-created_at'], name='ads_campaign_owner_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['brand', 'status'], name='ads_campaign_brand_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['updated_at'], name='ads_campaign_inactive_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedrecord',
+            name='owner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Owner'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedrecord',
+            index=models.Index(fields=['model_label', 'object_id'], name='ads_archive_object_idx'),
+        ),
+    ]
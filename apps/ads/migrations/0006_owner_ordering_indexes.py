@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0005_partial_active_indexes_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', 'name'], name='ads_ad_owner_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', '-updated_at'], name='ads_ad_owner_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adset',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', 'name'], name='ads_adset_owner_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adset',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', '-updated_at'], name='ads_adset_owner_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='brand',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', 'name'], name='ads_brand_owner_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='brand',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', '-updated_at'], name='ads_brand_owner_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', 'name'], name='ads_campaign_owner_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', 'status'], name='ads_campaign_owner_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', '-updated_at'], name='ads_campaign_owner_updated_idx'),
+        ),
+    ]
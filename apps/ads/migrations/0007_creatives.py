@@ -0,0 +1,72 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ads', '0006_owner_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Creative',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the object was created.', verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('sha256', models.CharField(max_length=64, verbose_name='SHA-256')),
+                ('file', models.FileField(max_length=255, upload_to='', verbose_name='File')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Size')),
+                ('content_type', models.CharField(blank=True, max_length=100, verbose_name='Content Type')),
+                ('renditions', models.JSONField(blank=True, default=dict, help_text='Storage name of each derived rendition, by rendition name.', verbose_name='Renditions')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='creatives', to=settings.AUTH_USER_MODEL, verbose_name='Owner')),
+            ],
+            options={
+                'verbose_name': 'Creative',
+                'verbose_name_plural': 'Creatives',
+            },
+        ),
+        migrations.AddField(
+            model_name='ad',
+            name='creative',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ads', to='ads.creative', verbose_name='Creative'),
+        ),
+        migrations.CreateModel(
+            name='CreativeUpload',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the object was created.', verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('sha256', models.CharField(max_length=64, verbose_name='SHA-256')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Size')),
+                ('content_type', models.CharField(blank=True, max_length=100, verbose_name='Content Type')),
+                ('received', models.PositiveBigIntegerField(default=0, verbose_name='Received')),
+                ('expires_at', models.DateTimeField(verbose_name='Expires at')),
+                ('creative', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='ads.creative', verbose_name='Creative')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Owner')),
+            ],
+            options={
+                'verbose_name': 'Creative Upload',
+                'verbose_name_plural': 'Creative Uploads',
+                'indexes': [models.Index(fields=['expires_at'], name='ads_creative_upload_exp_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='creative',
+            index=models.Index(fields=['sha256'], name='ads_creative_sha256_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='creative',
+            index=models.Index(fields=['owner', '-created_at'], name='ads_creative_owner_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='creative',
+            constraint=models.UniqueConstraint(fields=('owner', 'sha256'), name='ads_creative_owner_sha256_unique'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:03
+
+from django.db import migrations, models
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+import uuid
+
+COUNTERS = {
+    'click': 'clicks',
+    'impression': 'impressions',
+    'view': 'views',
+    'acquisition': 'acquisitions',
+}
+
+
+def create_ad_stats(apps, schema_editor):
+    """Fills the counters of existing ads from the performance rollups."""
+    AdStats = apps.get_model('ads', 'AdStats')
+    PerformanceRollup = apps.get_model('ads', 'PerformanceRollup')
+    totals = PerformanceRollup.objects.filter(ad__isnull=False).order_by().values('ad').annotate(
+        spend=Coalesce(Sum('amount'), 0, output_field=models.DecimalField()),
+        **{field: Coalesce(Sum('events', filter=Q(cost_type=cost_type)), 0) for cost_type, field in COUNTERS.items()}
+    )
+    AdStats.objects.bulk_create(
+        [
+            AdStats(ad_id=row['ad'], spend=row['spend'], **{field: row[field] for field in COUNTERS.values()})
+            for row in totals.iterator()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0007_creatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdStats',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the object was created.', verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('clicks', models.PositiveBigIntegerField(default=0, verbose_name='Clicks')),
+                ('impressions', models.PositiveBigIntegerField(default=0, verbose_name='Impressions')),
+                ('views', models.PositiveBigIntegerField(default=0, verbose_name='Views')),
+                ('acquisitions', models.PositiveBigIntegerField(default=0, verbose_name='Acquisitions')),
+                ('spend', models.DecimalField(decimal_places=4, default=0, max_digits=16, verbose_name='Spend')),
+                ('ad', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='ads.ad', verbose_name='Ad')),
+            ],
+            options={
+                'verbose_name': 'Ad Stats',
+                'verbose_name_plural': 'Ad Stats',
+            },
+        ),
+        migrations.RunPython(create_ad_stats, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,46 @@
+import logging
+import os
+import threading
+from datetime import datetime, time
+
 import pytz
 from dateutil.relativedelta import relativedelta
 
-from django.db import models, transaction
-from django.db.models import Sum, F
+from django.conf import settings
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum
+from django.db.models.functions import TruncHour
 from django.db.models.functions.comparison import Coalesce
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from apps.users.models import User
 from mixins.model_mixins import BaseModelMixin
-from utils.db import AtTimeZone
+from utils.cache import bump_ad_stats_version, bump_data_version
+from utils.images import RENDITION_EXTENSION
+
+logger = logging.getLogger(__name__)
+
+
+def _track_loaded_values(instance, *attnames):
+    instance._loaded_values = {
+        attname: instance.__dict__[attname] for attname in attnames if attname in instance.__dict__
+    }
+
+
+def _field_changed(instance, attname):
+    """Returns whether `attname` differs from the value the instance was loaded with."""
+    loaded_values = getattr(instance, '_loaded_values', {})
+    return attname in loaded_values and loaded_values[attname] != getattr(instance, attname)
+
+
+def _should_sync(instance, parent, update_fields):
+    """Returns whether the denormalized owner columns of `instance` must be copied from `parent`."""
+    if update_fields is not None and parent not in update_fields:
+        return False
+    return instance._state.adding or instance.owner_id is None or _field_changed(instance, f'{parent}_id')
 
 
 class GlobalAdPricing(BaseModelMixin):
@@ -88,10 +119,50 @@ class Brand(BaseModelMixin):
     class Meta:
         verbose_name = _("Brand")
         verbose_name_plural = _("Brand")
+        indexes = [
+            models.Index(fields=['name'], name='ads_brand_name_idx'),
+            models.Index(
+                fields=['owner', '-created_at'],
+                condition=Q(is_active=True),
+                name='ads_brand_owner_active_idx'
+            ),
+            models.Index(
+                fields=['owner', 'name'],
+                condition=Q(is_active=True),
+                name='ads_brand_owner_name_idx'
+            ),
+            models.Index(
+                fields=['owner', '-updated_at'],
+                condition=Q(is_active=True),
+                name='ads_brand_owner_updated_idx'
+            ),
+            models.Index(
+                fields=['updated_at'],
+                condition=Q(is_active=False),
+                name='ads_brand_inactive_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        _track_loaded_values(instance, 'owner_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        owner_changed = _field_changed(self, 'owner_id') and (update_fields is None or 'owner' in update_fields)
+        super().save(*args, **kwargs)
+        if owner_changed:
+            bump_data_version(self._loaded_values['owner_id'])
+            Campaign.objects.filter(brand=self).update(owner_id=self.owner_id)
+            AdSet.objects.filter(brand=self).update(owner_id=self.owner_id)
+            Ad.objects.filter(brand=self).update(owner_id=self.owner_id)
+        _track_loaded_values(self, 'owner_id')
+
     def get_brand_timezone(self):
         return pytz.timezone(self.timezone_str)
 
@@ -100,38 +171,37 @@ class Brand(BaseModelMixin):
         brand_tz = self.get_brand_timezone()
         return dt.astimezone(brand_tz)
 
-    def get_daily_spend(self):
-        from apps.payments.models import Transaction
-
-        """Returns the total cost spent today in the brand's timezone."""
+    def get_local_range(self, start_date, end_date):
+        """
+        Returns the aware [start, end) bounds of local dates in the brand's timezone.
+        Filtering `created_at` on them keeps the ledger index and partitions usable.
+        """
         brand_tz = self.get_brand_timezone()
-        now = timezone.now().astimezone(brand_tz)  # Localized now()
+        return (
+            brand_tz.localize(datetime.combine(start_date, time.min)),
+            brand_tz.localize(datetime.combine(end_date, time.min))
+        )
+
+    def get_spend(self, start, end):
+        """Returns the total cost spent in [start, end)."""
+        from apps.payments.models import Transaction
 
-        return Transaction.objects.annotate(
-            local_datetime=AtTimeZone(F('created_at'), brand_tz.zone)
-        ).filter(
+        return Transaction.objects.filter(
             brand=self,
             transaction_type=Transaction.TransactionTypeChoices.COST,
-            local_datetime__date=now.date()
+            created_at__gte=start,
+            created_at__lt=end
         ).aggregate(total=Coalesce(Sum('amount'), 0, output_field=models.DecimalField()))['total']
 
-    def get_monthly_spend(self):
-        from apps.payments.models import Transaction
+    def get_daily_spend(self):
+        """Returns the total cost spent today in the brand's timezone."""
+        today = self._localize_datetime(timezone.now()).date()
+        return self.get_spend(*self.get_local_range(today, today + relativedelta(days=1)))
 
+    def get_monthly_spend(self):
         """Returns the total cost spent in the current month in the brand's timezone."""
-        brand_tz = self.get_brand_timezone()
-        now = timezone.now().astimezone(brand_tz)
-        start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)  # First day of the month
-        end_of_month = start_of_month + relativedelta(months=1)
-
-        return Transaction.objects.annotate(
-            local_datetime=AtTimeZone(F('created_at'), brand_tz.zone)
-        ).filter(
-            brand=self,
-            transaction_type=Transaction.TransactionTypeChoices.COST,
-            local_datetime__gte=start_of_month,
-            local_datetime__lt=end_of_month
-        ).aggregate(total=Coalesce(Sum('amount'), 0, output_field=models.DecimalField()))['total']
+        start_of_month = self._localize_datetime(timezone.now()).date().replace(day=1)
+        return self.get_spend(*self.get_local_range(start_of_month, start_of_month + relativedelta(months=1)))
 
 
 class Campaign(BaseModelMixin):
@@ -149,6 +219,14 @@ class Campaign(BaseModelMixin):
         on_delete=models.CASCADE,
         related_name='campaigns'
     )
+    owner = models.ForeignKey(
+        User,
+        verbose_name=_("Owner"),
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        related_name='+'
+    )
     status = models.CharField(
         verbose_name=_("Status"),
         max_length=14,
@@ -177,10 +255,65 @@ class Campaign(BaseModelMixin):
     class Meta:
         verbose_name = _("Campaign")
         verbose_name_plural = _("Campaigns")
+        indexes = [
+            models.Index(fields=['name'], name='ads_campaign_name_idx'),
+            models.Index(
+                fields=['owner', '-created_at'],
+                condition=Q(is_active=True),
+                name='ads_campaign_owner_active_idx'
+            ),
+            models.Index(
+                fields=['owner', 'name'],
+                condition=Q(is_active=True),
+                name='ads_campaign_owner_name_idx'
+            ),
+            models.Index(
+                fields=['owner', 'status'],
+                condition=Q(is_active=True),
+                name='ads_campaign_owner_status_idx'
+            ),
+            models.Index(
+                fields=['owner', '-updated_at'],
+                condition=Q(is_active=True),
+                name='ads_campaign_owner_updated_idx'
+            ),
+            models.Index(
+                fields=['brand', 'status'],
+                condition=Q(is_active=True),
+                name='ads_campaign_brand_active_idx'
+            ),
+            models.Index(
+                fields=['updated_at'],
+                condition=Q(is_active=False),
+                name='ads_campaign_inactive_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        _track_loaded_values(instance, 'brand_id', 'owner_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        sync = _should_sync(self, 'brand', update_fields)
+        if sync:
+            self.owner_id = self.brand.owner_id
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'owner'}
+        cascade = sync and not self._state.adding and (
+            _field_changed(self, 'brand_id') or _field_changed(self, 'owner_id')
+        )
+        super().save(*args, **kwargs)
+        if cascade:
+            AdSet.objects.filter(campaign=self).update(brand_id=self.brand_id, owner_id=self.owner_id)
+            Ad.objects.filter(adset__campaign=self).update(brand_id=self.brand_id, owner_id=self.owner_id)
+        _track_loaded_values(self, 'brand_id', 'owner_id')
+
     def start(self):
         self.status = self.CampaignStatus.RUNNING
         self.save()
@@ -209,6 +342,22 @@ class AdSet(BaseModelMixin):
         on_delete=models.CASCADE,
         related_name='adsets'
     )
+    brand = models.ForeignKey(
+        Brand,
+        verbose_name=_("Brand"),
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        related_name='+'
+    )
+    owner = models.ForeignKey(
+        User,
+        verbose_name=_("Owner"),
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        related_name='+'
+    )
     name = models.CharField(
         verbose_name=_("Name"),
         max_length=100
@@ -221,10 +370,172 @@ class AdSet(BaseModelMixin):
     class Meta:
         verbose_name = _("Ad Set")
         verbose_name_plural = _("Ad Sets")
+        indexes = [
+            models.Index(fields=['name'], name='ads_adset_name_idx'),
+            models.Index(
+                fields=['owner', '-created_at'],
+                condition=Q(is_active=True),
+                name='ads_adset_owner_active_idx'
+            ),
+            models.Index(
+                fields=['owner', 'name'],
+                condition=Q(is_active=True),
+                name='ads_adset_owner_name_idx'
+            ),
+            models.Index(
+                fields=['owner', '-updated_at'],
+                condition=Q(is_active=True),
+                name='ads_adset_owner_updated_idx'
+            ),
+            models.Index(
+                fields=['campaign'],
+                condition=Q(is_active=True),
+                name='ads_adset_campaign_active_idx'
+            ),
+            models.Index(
+                fields=['updated_at'],
+                condition=Q(is_active=False),
+                name='ads_adset_inactive_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        _track_loaded_values(instance, 'campaign_id', 'owner_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        sync = _should_sync(self, 'campaign', update_fields)
+        if sync:
+            campaign = self.campaign
+            if campaign.owner_id is None:
+                campaign.save(update_fields=['brand'])
+            self.brand_id, self.owner_id = campaign.brand_id, campaign.owner_id
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'brand', 'owner'}
+        cascade = sync and not self._state.adding and (
+            _field_changed(self, 'campaign_id') or _field_changed(self, 'owner_id')
+        )
+        super().save(*args, **kwargs)
+        if cascade:
+            Ad.objects.filter(adset=self).update(brand_id=self.brand_id, owner_id=self.owner_id)
+        _track_loaded_values(self, 'campaign_id', 'owner_id')
+
+
+class Creative(BaseModelMixin):
+    __doc__ = _("""
+    Ad creative file addressed by its SHA-256. The file is stored once per content,
+    whoever uploads it; each owner references it through their own row.
+    """)
+    owner = models.ForeignKey(
+        User,
+        verbose_name=_("Owner"),
+        on_delete=models.CASCADE,
+        related_name='creatives'
+    )
+    sha256 = models.CharField(
+        verbose_name=_("SHA-256"),
+        max_length=64
+    )
+    file = models.FileField(
+        verbose_name=_("File"),
+        max_length=255
+    )
+    size = models.PositiveBigIntegerField(
+        verbose_name=_("Size")
+    )
+    content_type = models.CharField(
+        verbose_name=_("Content Type"),
+        max_length=100,
+        blank=True
+    )
+    renditions = models.JSONField(
+        verbose_name=_("Renditions"),
+        default=dict,
+        blank=True,
+        help_text=_("Storage name of each derived rendition, by rendition name.")
+    )
+
+    class Meta:
+        verbose_name = _("Creative")
+        verbose_name_plural = _("Creatives")
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'sha256'], name='ads_creative_owner_sha256_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['sha256'], name='ads_creative_sha256_idx'),
+            models.Index(fields=['owner', '-created_at'], name='ads_creative_owner_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256} - {self.owner_id}"
+
+    @staticmethod
+    def get_storage_name(sha256, rendition=None):
+        """Returns the storage name of a content hash, or of one of its renditions."""
+        if rendition is None:
+            return f'creatives/{sha256[:2]}/{sha256}'
+        return f'creatives/{sha256[:2]}/{sha256}-{rendition}.{RENDITION_EXTENSION}'
+
+
+class CreativeUpload(BaseModelMixin):
+    __doc__ = _("""
+    Resumable upload of a creative. Chunks are appended to a temporary file until `received`
+    reaches `size`, then the content is checked against `sha256` and stored as a Creative.
+    """)
+    owner = models.ForeignKey(
+        User,
+        verbose_name=_("Owner"),
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    sha256 = models.CharField(
+        verbose_name=_("SHA-256"),
+        max_length=64
+    )
+    size = models.PositiveBigIntegerField(
+        verbose_name=_("Size")
+    )
+    content_type = models.CharField(
+        verbose_name=_("Content Type"),
+        max_length=100,
+        blank=True
+    )
+    received = models.PositiveBigIntegerField(
+        verbose_name=_("Received"),
+        default=0
+    )
+    creative = models.ForeignKey(
+        Creative,
+        verbose_name=_("Creative"),
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    expires_at = models.DateTimeField(
+        verbose_name=_("Expires at")
+    )
+
+    class Meta:
+        verbose_name = _("Creative Upload")
+        verbose_name_plural = _("Creative Uploads")
+        indexes = [
+            models.Index(fields=['expires_at'], name='ads_creative_upload_exp_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256} - {self.received}/{self.size}"
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.CREATIVE_UPLOAD_TEMP_DIR, f'{self.pk}.part')
+
 
 class Ad(BaseModelMixin):
     adset = models.ForeignKey(
@@ -233,6 +544,22 @@ class Ad(BaseModelMixin):
         on_delete=models.CASCADE,
         related_name='ads'
     )
+    brand = models.ForeignKey(
+        Brand,
+        verbose_name=_("Brand"),
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        related_name='+'
+    )
+    owner = models.ForeignKey(
+        User,
+        verbose_name=_("Owner"),
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        related_name='+'
+    )
     name = models.CharField(
         verbose_name=_("Name"),
         max_length=100
@@ -247,6 +574,14 @@ class Ad(BaseModelMixin):
         null=True,
         blank=True
     )
+    creative = models.ForeignKey(
+        Creative,
+        verbose_name=_("Creative"),
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='ads'
+    )
     content = models.TextField(
         verbose_name=_("Content"),
         null=True,
@@ -285,10 +620,56 @@ class Ad(BaseModelMixin):
     class Meta:
         verbose_name = _("Ad")
         verbose_name_plural = _("Ads")
+        indexes = [
+            models.Index(fields=['name'], name='ads_ad_name_idx'),
+            models.Index(
+                fields=['owner', '-created_at'],
+                condition=Q(is_active=True),
+                name='ads_ad_owner_active_idx'
+            ),
+            models.Index(
+                fields=['owner', 'name'],
+                condition=Q(is_active=True),
+                name='ads_ad_owner_name_idx'
+            ),
+            models.Index(
+                fields=['owner', '-updated_at'],
+                condition=Q(is_active=True),
+                name='ads_ad_owner_updated_idx'
+            ),
+            models.Index(
+                fields=['adset'],
+                condition=Q(is_active=True),
+                name='ads_ad_adset_active_idx'
+            ),
+            models.Index(
+                fields=['updated_at'],
+                condition=Q(is_active=False),
+                name='ads_ad_inactive_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        _track_loaded_values(instance, 'adset_id', 'owner_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if _should_sync(self, 'adset', update_fields):
+            adset = self.adset
+            if adset.owner_id is None:
+                adset.save(update_fields=['campaign'])
+            self.brand_id, self.owner_id = adset.brand_id, adset.owner_id
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'brand', 'owner'}
+        super().save(*args, **kwargs)
+        _track_loaded_values(self, 'adset_id', 'owner_id')
+
     def get_cost_per_click(self):
         return self.cost_per_click if self.cost_per_click is not None else GlobalAdPricing.get_default_pricing().cost_per_click
 
@@ -323,7 +704,7 @@ class Ad(BaseModelMixin):
         with transaction.atomic():
             brand = Brand.objects.select_for_update().get(uuid=brand.uuid)
 
-            Transaction.objects.create(
+            ledger_entry = Transaction.objects.create(
                 brand=brand,
                 campaign=campaign,
                 ad=self,
@@ -331,12 +712,15 @@ class Ad(BaseModelMixin):
                 transaction_type=Transaction.TransactionTypeChoices.COST,
                 cost_type=cost_type
             )
+            PerformanceRollup.record(ledger_entry, brand, self)
+            AdStats.record(ledger_entry, self)
 
             daily_spend, monthly_spend = self._get_brand_budget_spent(brand)
             if daily_spend >= brand.daily_budget or monthly_spend >= brand.monthly_budget:
                 Campaign.objects.filter(brand=brand, status=Campaign.CampaignStatus.RUNNING).update(
-                    status=Campaign.CampaignStatus.BUDGET_REACHED
+                    status=Campaign.CampaignStatus.BUDGET_REACHED, updated_at=timezone.now()
                 )
+                bump_data_version(brand.owner_id)
                 return True, "Transaction created, but all campaigns for this brand are now paused due to budget limit."
 
         return True, "Transaction created successfully."
@@ -362,3 +746,409 @@ class Ad(BaseModelMixin):
 
         return self._create_transaction_and_check_budget(self.get_cost_per_acquisition(),
                                                          Transaction.CostTypeChoices.ACQUISITION)
+
+
+class PerformanceRollup(BaseModelMixin):
+    __doc__ = _("""
+    Hourly cost totals per ad and cost type, bucketed in the brand's local time.
+    Maintained on the billing path so reports never scan the ledger.
+    """)
+    brand = models.ForeignKey(
+        Brand,
+        verbose_name=_("Brand"),
+        on_delete=models.CASCADE,
+        related_name='performance_rollups'
+    )
+    campaign = models.ForeignKey(
+        Campaign,
+        verbose_name=_("Campaign"),
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='performance_rollups'
+    )
+    adset = models.ForeignKey(
+        AdSet,
+        verbose_name=_("Ad Set"),
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='performance_rollups'
+    )
+    ad = models.ForeignKey(
+        Ad,
+        verbose_name=_("Ad"),
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='performance_rollups'
+    )
+    owner = models.ForeignKey(
+        User,
+        verbose_name=_("Owner"),
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    cost_type = models.CharField(
+        verbose_name=_("Cost Type"),
+        max_length=15,
+        null=True,
+        blank=True
+    )
+    local_date = models.DateField(
+        verbose_name=_("Local Date")
+    )
+    local_hour = models.PositiveSmallIntegerField(
+        verbose_name=_("Local Hour")
+    )
+    events = models.PositiveIntegerField(
+        verbose_name=_("Events"),
+        default=0
+    )
+    amount = models.DecimalField(
+        verbose_name=_("Amount"),
+        max_digits=14,
+        decimal_places=4,
+        default=0
+    )
+
+    class Meta:
+        verbose_name = _("Performance Rollup")
+        verbose_name_plural = _("Performance Rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['brand', 'campaign', 'ad', 'cost_type', 'local_date', 'local_hour'],
+                name='ads_rollup_unique_bucket'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['owner', 'local_date'], name='ads_rollup_owner_date_idx'),
+            models.Index(fields=['brand', 'local_date'], name='ads_rollup_brand_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.brand_id} - {self.local_date} {self.local_hour:02d}:00 - {self.cost_type}"
+
+    @classmethod
+    def record(cls, ledger_entry, brand, ad):
+        """
+        Adds a cost transaction to its hourly bucket. Callers must hold the brand row lock,
+        which serializes the update-or-create per brand.
+        """
+        local_datetime = brand._localize_datetime(ledger_entry.created_at)
+        bucket = dict(
+            brand=brand,
+            campaign_id=ledger_entry.campaign_id,
+            ad=ad,
+            cost_type=ledger_entry.cost_type,
+            local_date=local_datetime.date(),
+            local_hour=local_datetime.hour
+        )
+        updated = cls.objects.filter(**bucket).update(
+            events=F('events') + 1,
+            amount=F('amount') + ledger_entry.amount,
+            updated_at=timezone.now()
+        )
+        if not updated:
+            cls.objects.create(
+                adset_id=ad.adset_id,
+                owner_id=brand.owner_id,
+                events=1,
+                amount=ledger_entry.amount,
+                **bucket
+            )
+
+    @classmethod
+    def rebuild(cls, brand, since=None):
+        """
+        Recomputes the rollups of a brand from the ledger, from the local day containing
+        `since` (or from the beginning). Used for backfills, never on the request path.
+        """
+        from apps.payments.models import Transaction
+
+        brand_tz = brand.get_brand_timezone()
+        ledger = Transaction.objects.filter(brand=brand, transaction_type=Transaction.TransactionTypeChoices.COST)
+        stale = cls.objects.filter(brand=brand)
+        if since is not None:
+            local_date = brand._localize_datetime(since).date()
+            local_start = brand_tz.localize(datetime.combine(local_date, time.min))
+            ledger = ledger.filter(created_at__gte=local_start)
+            stale = stale.filter(local_date__gte=local_start.date())
+
+        buckets = ledger.order_by().annotate(
+            local_hour_start=TruncHour('created_at', tzinfo=brand_tz)
+        ).values(
+            'campaign_id', 'ad_id', 'ad__adset_id', 'cost_type', 'local_hour_start'
+        ).annotate(events=Count('pk'), total=Sum('amount'))
+
+        with transaction.atomic():
+            stale.delete()
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        brand=brand,
+                        campaign_id=bucket['campaign_id'],
+                        adset_id=bucket['ad__adset_id'],
+                        ad_id=bucket['ad_id'],
+                        owner_id=brand.owner_id,
+                        cost_type=bucket['cost_type'],
+                        local_date=bucket['local_hour_start'].date(),
+                        local_hour=bucket['local_hour_start'].hour,
+                        events=bucket['events'],
+                        amount=bucket['total']
+                    )
+                    for bucket in buckets.iterator()
+                ],
+                batch_size=1000
+            )
+
+
+class AdStats(BaseModelMixin):
+    __doc__ = _("""
+    Lifetime event counters and spend of an ad. Billing events are buffered per process
+    once committed and added in batches; `rebuild()` recomputes them from the rollups.
+    """)
+    # Transaction cost type -> counter field.
+    COUNTERS = {
+        'click': 'clicks',
+        'impression': 'impressions',
+        'view': 'views',
+        'acquisition': 'acquisitions',
+    }
+    FIELDS = (*COUNTERS.values(), 'spend')
+
+    ad = models.OneToOneField(
+        Ad,
+        verbose_name=_("Ad"),
+        on_delete=models.CASCADE,
+        related_name='stats'
+    )
+    clicks = models.PositiveBigIntegerField(
+        verbose_name=_("Clicks"),
+        default=0
+    )
+    impressions = models.PositiveBigIntegerField(
+        verbose_name=_("Impressions"),
+        default=0
+    )
+    views = models.PositiveBigIntegerField(
+        verbose_name=_("Views"),
+        default=0
+    )
+    acquisitions = models.PositiveBigIntegerField(
+        verbose_name=_("Acquisitions"),
+        default=0
+    )
+    spend = models.DecimalField(
+        verbose_name=_("Spend"),
+        max_digits=16,
+        decimal_places=4,
+        default=0
+    )
+
+    class Meta:
+        verbose_name = _("Ad Stats")
+        verbose_name_plural = _("Ad Stats")
+
+    def __str__(self):
+        return f"{self.ad_id} - {self.clicks} clicks"
+
+    @classmethod
+    def record(cls, ledger_entry, ad):
+        """Buffers a cost transaction for the counters of `ad` once it is committed."""
+        transaction.on_commit(
+            lambda: ad_stats_buffer.add(ad.pk, ad.owner_id, cls.COUNTERS[ledger_entry.cost_type], ledger_entry.amount)
+        )
+
+    @classmethod
+    def add(cls, deltas):
+        """
+        Adds `{ad_id: {field: delta, 'owner_id': owner_id}}` to the counters in one transaction
+        and bumps the ad stats version of every owner, so only their cached ad responses refresh.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            existing_ads = Ad.objects.filter(pk__in=deltas).values_list('pk', flat=True)
+            cls.objects.bulk_create([cls(ad_id=ad_id) for ad_id in existing_ads], ignore_conflicts=True)
+            # A stable order keeps concurrent flushes from deadlocking on each other's rows.
+            for ad_id, delta in sorted(deltas.items()):
+                cls.objects.filter(ad_id=ad_id).update(
+                    updated_at=now,
+                    **{field: F(field) + delta[field] for field in cls.FIELDS if delta[field]}
+                )
+        for owner_id in {delta['owner_id'] for delta in deltas.values()}:
+            bump_ad_stats_version(owner_id)
+
+    @classmethod
+    def rebuild(cls, brand):
+        """
+        Recomputes the counters of the ads of a brand from their performance rollups.
+        Used for backfills and repairs, never on the request path.
+        """
+        totals = PerformanceRollup.objects.filter(brand=brand, ad__isnull=False).order_by().values('ad').annotate(
+            spend=Coalesce(Sum('amount'), 0, output_field=models.DecimalField()),
+            **{
+                field: Coalesce(Sum('events', filter=Q(cost_type=cost_type)), 0)
+                for cost_type, field in cls.COUNTERS.items()
+            }
+        )
+        with transaction.atomic():
+            cls.objects.filter(ad__brand=brand).delete()
+            cls.objects.bulk_create(
+                [cls(ad_id=row['ad'], **{field: row[field] for field in cls.FIELDS}) for row in totals.iterator()],
+                batch_size=1000
+            )
+
+
+class AdStatsBuffer(object):
+    """
+    Per-process buffer of committed billing events. A background timer adds it to AdStats
+    in one batch once it holds AD_STATS_FLUSH_EVENTS events or AD_STATS_FLUSH_SECONDS
+    after its first event, so billing requests never wait on the flush. A failed batch is
+    merged back and retried. Events buffered when a process dies are lost until
+    `AdStats.rebuild()` runs.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.events = 0
+        self.timer = None
+
+    def add(self, ad_id, owner_id, field, amount):
+        with self.lock:
+            self._merge({ad_id: {**dict.fromkeys(AdStats.FIELDS, 0), field: 1, 'spend': amount, 'owner_id': owner_id}})
+            if self.events >= settings.AD_STATS_FLUSH_EVENTS:
+                # Events past the threshold join the flush already due instead of starting a thread each.
+                if self.timer is None or self.timer.interval != 0:
+                    self._schedule(0)
+            elif self.timer is None:
+                self._schedule(settings.AD_STATS_FLUSH_SECONDS)
+
+    def flush(self):
+        """Adds the pending events to AdStats now. Returns whether they were added."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+            pending, self.pending, self.events, self.timer = self.pending, {}, 0, None
+        if not pending:
+            return True
+        try:
+            AdStats.add(pending)
+        except Exception:
+            logger.exception(f'Failed to flush the counters of {len(pending)} ads, keeping them for a retry')
+            with self.lock:
+                self._merge(pending)
+                self._schedule(settings.AD_STATS_FLUSH_SECONDS)
+            return False
+        return True
+
+    def clear(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+            self.pending, self.events, self.timer = {}, 0, None
+
+    def _merge(self, deltas):
+        # Callers hold the lock.
+        for ad_id, delta in deltas.items():
+            pending = self.pending.get(ad_id)
+            if pending is None:
+                pending = self.pending[ad_id] = {**dict.fromkeys(AdStats.FIELDS, 0), 'owner_id': delta['owner_id']}
+            for field in AdStats.FIELDS:
+                pending[field] += delta[field]
+            self.events += sum(delta[field] for field in AdStats.COUNTERS.values())
+
+    def _schedule(self, delay):
+        # Callers hold the lock.
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = threading.Timer(delay, self._flush_in_background)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread opened its own connection.
+            connections.close_all()
+
+
+ad_stats_buffer = AdStatsBuffer()
+
+
+class ArchivedRecord(BaseModelMixin):
+    __doc__ = _("""
+    Snapshot of a soft-deleted Brand, Campaign, AdSet or Ad moved out of the hot tables.
+    """)
+    model_label = models.CharField(
+        verbose_name=_("Model"),
+        max_length=64
+    )
+    object_id = models.UUIDField(
+        verbose_name=_("Object ID")
+    )
+    owner = models.ForeignKey(
+        User,
+        verbose_name=_("Owner"),
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    data = models.JSONField(
+        verbose_name=_("Data"),
+        encoder=DjangoJSONEncoder
+    )
+    deactivated_at = models.DateTimeField(
+        verbose_name=_("Deactivated at")
+    )
+
+    class Meta:
+        verbose_name = _("Archived Record")
+        verbose_name_plural = _("Archived Records")
+        indexes = [
+            models.Index(fields=['model_label', 'object_id'], name='ads_archive_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} - {self.object_id}"
+
+    @classmethod
+    def archivable(cls, model, cutoff):
+        """
+        Inactive rows of `model` untouched since `cutoff` that nothing references anymore,
+        so deleting them can never cascade into live rows or the ledger.
+        """
+        queryset = model.objects.filter(is_active=False, updated_at__lt=cutoff)
+        for relation in model._meta.get_fields(include_hidden=True):
+            if relation.auto_created and not relation.concrete and (relation.one_to_many or relation.one_to_one):
+                references = relation.related_model._base_manager.filter(**{relation.field.name: OuterRef('pk')})
+                queryset = queryset.filter(~Exists(references))
+        return queryset.order_by()
+
+    @classmethod
+    def archive(cls, model, cutoff, batch_size=500):
+        """
+        Moves archivable rows of `model` into the archive in batches. Returns the number moved.
+        """
+        queryset = cls.archivable(model, cutoff)
+        archived = 0
+        while True:
+            with transaction.atomic():
+                rows = list(queryset.select_for_update(skip_locked=True)[:batch_size])
+                if not rows:
+                    return archived
+                cls.objects.bulk_create([
+                    cls(
+                        model_label=model._meta.label,
+                        object_id=row.pk,
+                        owner_id=row.owner_id,
+                        data=serializers.serialize('python', [row])[0]['fields'],
+                        deactivated_at=row.updated_at
+                    )
+                    for row in rows
+                ])
+                model.objects.filter(pk__in=[row.pk for row in rows]).delete()
+            archived += len(rows)
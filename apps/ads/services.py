@@ -0,0 +1,201 @@
+import fcntl
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from apps.ads.models import Creative, CreativeUpload
+from apps.ads.tasks import generate_creative_renditions
+from apps.payments.models import Transaction
+
+
+class ReportingService(object):
+    # Report dimension -> rollup columns it groups by.
+    DIMENSIONS = {
+        'brand': ('brand',),
+        'campaign': ('campaign',),
+        'adset': ('adset',),
+        'ad': ('ad',),
+        'day': ('local_date',),
+        'hour': ('local_date', 'local_hour'),
+        'cost_type': ('cost_type',),
+    }
+    COUNTERS = {
+        'clicks': Transaction.CostTypeChoices.CLICK,
+        'impressions': Transaction.CostTypeChoices.IMPRESSION,
+        'views': Transaction.CostTypeChoices.VIEW,
+        'acquisitions': Transaction.CostTypeChoices.ACQUISITION,
+    }
+    COLUMN_NAMES = {
+        'local_date': 'day',
+        'local_hour': 'hour',
+    }
+
+    @classmethod
+    def performance_report(cls, rollups, group_by):
+        """
+        Aggregates a PerformanceRollup queryset by the given report dimensions.
+        """
+        columns = []
+        for dimension in group_by:
+            columns.extend(column for column in cls.DIMENSIONS[dimension] if column not in columns)
+
+        if 'cost_type' in group_by:
+            metrics = {'events': Sum('events')}
+        else:
+            metrics = {
+                name: Coalesce(Sum('events', filter=Q(cost_type=cost_type)), 0)
+                for name, cost_type in cls.COUNTERS.items()
+            }
+        metrics['spend'] = Sum('amount')
+        if 'clicks' in metrics:
+            metrics['click_spend'] = Sum('amount', filter=Q(cost_type=Transaction.CostTypeChoices.CLICK))
+        return rollups.order_by().values(*columns).annotate(**metrics).order_by(*columns)
+
+    @classmethod
+    def format_row(cls, row):
+        row = {cls.COLUMN_NAMES.get(column, column): value for column, value in row.items()}
+        if 'clicks' in row:
+            # Cost per click only counts what the clicks cost, not impressions, views or acquisitions.
+            click_spend = row.pop('click_spend')
+            row['cpc'] = round(click_spend / row['clicks'], 4) if row['clicks'] else None
+        return row
+
+
+class UploadConflict(Exception):
+    """A chunk that cannot be written where its upload stands."""
+
+
+class CreativeService(object):
+    """
+    Chunked, resumable uploads of content-addressed creatives. An owner who already has
+    the content gets it back without sending any byte; otherwise the bytes are streamed
+    to a temporary file, checked against the declared hash and stored once per hash.
+    """
+    CHUNK_SIZE = 64 * 1024
+
+    @staticmethod
+    def start_upload(owner, sha256, size, content_type=''):
+        """Returns a new upload, already complete when `owner` has a creative with this content."""
+        upload = CreativeUpload(
+            owner=owner,
+            sha256=sha256,
+            size=size,
+            content_type=content_type,
+            expires_at=timezone.now() + timedelta(hours=settings.CREATIVE_UPLOAD_LIFETIME_HOURS)
+        )
+        upload.creative = Creative.objects.filter(owner=owner, sha256=sha256).first()
+        if upload.creative is not None:
+            upload.received = size
+        upload.save()
+        return upload
+
+    @classmethod
+    def write_chunk(cls, upload, offset, stream, length):
+        """
+        Appends `length` bytes of `stream` at `offset` and completes the upload once every
+        byte is in. The body is streamed outside any transaction, under a lock on the
+        temporary file; the row is only locked to check the offset before and to record it
+        after. Raises `UploadConflict` when `offset` is not where the upload stands or
+        another chunk is being received, and `ValueError` when the chunk runs past the
+        declared size or the content does not match the declared hash.
+        """
+        os.makedirs(settings.CREATIVE_UPLOAD_TEMP_DIR, exist_ok=True)
+        with os.fdopen(os.open(upload.temp_path, os.O_RDWR | os.O_CREAT), 'r+b') as fp:
+            try:
+                fcntl.flock(fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadConflict(_('Another chunk of this upload is being received.'))
+            with transaction.atomic():
+                upload = cls.lock_at_offset(upload, offset)
+            if upload.creative_id is not None:
+                # Completed by an earlier request; drop the file opened above.
+                os.remove(upload.temp_path)
+                return upload
+            if offset + length > upload.size:
+                raise ValueError(_('The chunk runs past the declared size.'))
+
+            # Drops whatever an interrupted chunk left past the last recorded offset.
+            fp.seek(offset)
+            fp.truncate()
+            remaining = length
+            while remaining:
+                data = stream.read(min(cls.CHUNK_SIZE, remaining))
+                if not data:
+                    break
+                fp.write(data)
+                remaining -= len(data)
+            fp.flush()
+            received = fp.tell()
+
+            error = None
+            with transaction.atomic():
+                upload = cls.lock_at_offset(upload, offset)
+                upload.received = received
+                upload.save(update_fields=['received', 'updated_at'])
+                if upload.received == upload.size:
+                    try:
+                        cls.complete(upload)
+                    except ValueError as exc:
+                        # The reset to the start of the upload has to be committed.
+                        error = exc
+        if error is not None:
+            raise error
+        return upload
+
+    @staticmethod
+    def lock_at_offset(upload, offset):
+        """
+        Returns `upload` read again under its row lock. Raises `UploadConflict` when it is
+        still incomplete and does not stand at `offset`.
+        """
+        upload = CreativeUpload.objects.select_for_update().get(pk=upload.pk)
+        if upload.creative_id is None and upload.received != offset:
+            raise UploadConflict(_('Resume the upload at byte {offset}.').format(offset=upload.received))
+        return upload
+
+    @classmethod
+    def complete(cls, upload):
+        """Stores the received content, unless its hash is already stored, as the owner's creative."""
+        digest = hashlib.sha256()
+        with open(upload.temp_path, 'rb') as fp:
+            for data in iter(lambda: fp.read(cls.CHUNK_SIZE), b''):
+                digest.update(data)
+        if digest.hexdigest() != upload.sha256:
+            os.remove(upload.temp_path)
+            upload.received = 0
+            upload.save(update_fields=['received', 'updated_at'])
+            raise ValueError(_('The content does not match the declared SHA-256; upload it again.'))
+
+        name = Creative.get_storage_name(upload.sha256)
+        if not default_storage.exists(name):
+            with open(upload.temp_path, 'rb') as fp:
+                name = default_storage.save(name, File(fp))
+        os.remove(upload.temp_path)
+
+        # Another owner's renditions of the same content are reused as they are.
+        renditions = Creative.objects.filter(sha256=upload.sha256).exclude(renditions={}).values_list(
+            'renditions', flat=True
+        ).first()
+        upload.creative, created = Creative.objects.get_or_create(
+            owner=upload.owner,
+            sha256=upload.sha256,
+            defaults={
+                'file': name,
+                'size': upload.size,
+                'content_type': upload.content_type,
+                'renditions': renditions or {},
+            }
+        )
+        upload.save(update_fields=['creative', 'updated_at'])
+        if created and not renditions:
+            transaction.on_commit(lambda: generate_creative_renditions.delay(upload.sha256))
+        return upload.creative
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.ads.models import Ad, AdSet, Brand, Campaign
+from utils.cache import bump_data_version
+
+
+@receiver([post_save, post_delete], sender=Brand)
+@receiver([post_save, post_delete], sender=Campaign)
+@receiver([post_save, post_delete], sender=AdSet)
+@receiver([post_save, post_delete], sender=Ad)
+def invalidate_owner_responses(sender, instance, **kwargs):
+    bump_data_version(instance.owner_id)
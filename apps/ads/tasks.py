@@ -1,36 +1,46 @@
 import logging
-from datetime import datetime
+import os
+from datetime import datetime, timedelta
 
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.utils import timezone
 
 from celery import shared_task
 
-from apps.ads.models import Campaign, Brand
+from apps.ads.models import Ad, AdSet, ArchivedRecord, Campaign, Brand, Creative, CreativeUpload
+from utils.cache import bump_data_version
+from utils.db_router import read_from_replica
+from utils.images import make_renditions
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True, name='enforce_campaign_budget')
 def enforce_campaign_budget(self):
-    brands = Brand.objects.prefetch_related('campaigns').filter(
-        campaigns__status__in=[
-            Campaign.CampaignStatus.RUNNING,
-            Campaign.CampaignStatus.SCHEDULED,
-            Campaign.CampaignStatus.BUDGET_REACHED,
-        ]
-    ).distinct()
-    for brand in brands:
-        daily_spend = brand.get_daily_spend()
-        monthly_spend = brand.get_monthly_spend()
-
+    # Spend is read from the replica; the status updates below go to the primary.
+    with read_from_replica():
+        brands = Brand.objects.prefetch_related('campaigns').filter(
+            campaigns__status__in=[
+                Campaign.CampaignStatus.RUNNING,
+                Campaign.CampaignStatus.SCHEDULED,
+                Campaign.CampaignStatus.BUDGET_REACHED,
+            ]
+        ).distinct()
+        spends = [(brand, brand.get_daily_spend(), brand.get_monthly_spend()) for brand in brands]
+
+    for brand, daily_spend, monthly_spend in spends:
         if daily_spend >= brand.daily_budget or monthly_spend >= brand.monthly_budget:
-            brand.campaigns.filter(status=Campaign.CampaignStatus.RUNNING).update(
-                status=Campaign.CampaignStatus.BUDGET_REACHED
+            updated = brand.campaigns.filter(status=Campaign.CampaignStatus.RUNNING).update(
+                status=Campaign.CampaignStatus.BUDGET_REACHED, updated_at=timezone.now()
             )
         else:
-            brand.campaigns.filter(status=Campaign.CampaignStatus.BUDGET_REACHED).update(
-                status=Campaign.CampaignStatus.SCHEDULED
+            updated = brand.campaigns.filter(status=Campaign.CampaignStatus.BUDGET_REACHED).update(
+                status=Campaign.CampaignStatus.SCHEDULED, updated_at=timezone.now()
             )
+        if updated:
+            bump_data_version(brand.owner_id)
     return "Checked and updated brand budgets"
 
 
@@ -60,11 +70,11 @@ def start_scheduled_campaigns(self):
 
             if allowed_start_local <= now_local < allowed_end_local:
                 campaign.status = Campaign.CampaignStatus.RUNNING
-                campaign.save(update_fields=['status'])
+                campaign.save(update_fields=['status', 'updated_at'])
         else:
             # No dayparting defined, start the campaign.
             campaign.status = Campaign.CampaignStatus.RUNNING
-            campaign.save(update_fields=['status'])
+            campaign.save(update_fields=['status', 'updated_at'])
     return "Scheduled campaigns updated based on dayparting conditions."
 
 
@@ -103,6 +113,66 @@ def stop_dayparting_campaigns(self):
         # If current local time is outside the allowed window, update the campaign status to SCHEDULED.
         if not (allowed_start_local <= now_local < allowed_end_local):
             campaign.status = Campaign.CampaignStatus.SCHEDULED
-            campaign.save(update_fields=['status'])
+            campaign.save(update_fields=['status', 'updated_at'])
 
     return "Stopped dayparting campaigns that are out of allowed time."
+
+
+@shared_task(bind=True, name='archive_inactive_ads_objects')
+def archive_inactive_ads_objects(self, batch_size=500):
+    """
+    Moves long soft-deleted ads objects into the archive, children first so that
+    parents emptied in the same run are archived too.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.ADS_ARCHIVE_AFTER_DAYS)
+    archived = {}
+    for model in (Ad, AdSet, Campaign, Brand):
+        archived[model._meta.label] = ArchivedRecord.archive(model, cutoff, batch_size)
+    logger.info("Archived inactive ads objects: %s", archived)
+    return archived
+
+
+@shared_task(bind=True, name='generate_creative_renditions')
+def generate_creative_renditions(self, sha256):
+    """
+    Renders the configured renditions of an image creative once per content hash and
+    records them on every creative row holding that content.
+    """
+    creative = Creative.objects.filter(sha256=sha256).order_by().first()
+    if creative is None or not creative.content_type.startswith('image/'):
+        return {}
+    try:
+        with creative.file.open('rb') as fp:
+            images = make_renditions(fp, settings.CREATIVE_RENDITION_SIZES)
+    except ValueError as exc:
+        logger.info(f'Creative {sha256} has no renditions: {exc}')
+        return {}
+
+    renditions = {}
+    for name, data in images.items():
+        storage_name = Creative.get_storage_name(sha256, name)
+        if not default_storage.exists(storage_name):
+            storage_name = default_storage.save(storage_name, ContentFile(data))
+        renditions[name] = storage_name
+    updated = Creative.objects.filter(sha256=sha256).update(renditions=renditions)
+    logger.info(f'Rendered {len(renditions)} renditions of creative {sha256} for {updated} owners')
+    return renditions
+
+
+@shared_task(bind=True, name='purge_expired_creative_uploads')
+def purge_expired_creative_uploads(self, batch_size=500):
+    """
+    Deletes expired uploads with their temporary files. Stored creatives are kept.
+    """
+    purged = 0
+    while True:
+        uploads = list(CreativeUpload.objects.filter(expires_at__lte=timezone.now()).order_by()[:batch_size])
+        if not uploads:
+            break
+        for upload in uploads:
+            if os.path.exists(upload.temp_path):
+                os.remove(upload.temp_path)
+        CreativeUpload.objects.filter(pk__in=[upload.pk for upload in uploads]).delete()
+        purged += len(uploads)
+    logger.info(f'Purged {purged} expired creative uploads')
+    return purged
@@ -1,23 +1,49 @@
 from django.test import TestCase
 from apps.ads.models import GlobalAdPricing
 
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
 from decimal import Decimal
-from datetime import time
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+from datetime import time, timedelta
 
+import pytz
+from PIL import Image
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase, APIClient
+from rest_framework.test import APITestCase, APITransactionTestCase, APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
+from apps.authentication.cache import user_cache
 from apps.users.models import User
-from apps.ads.models import Brand, Campaign, AdSet, Ad
+from apps.ads.api.views import AdSetViewSet, AdViewSet, BrandViewSet, CampaignViewSet
+from apps.ads.models import (
+    Brand, Campaign, AdSet, Ad, AdStats, ArchivedRecord, Creative, CreativeUpload, PerformanceRollup, ad_stats_buffer
+)
+from apps.ads.services import CreativeService
 from apps.payments.models import Transaction
+from utils.cache import get_data_version
+from utils.db_router import ReplicaRouter, is_pinned, read_from_replica
 
 
 class APITestCaseBase(APITestCase):
     """Base test case that creates a test user and sets up an authenticated API client."""
 
     def setUp(self):
+        cache.clear()
+        user_cache.clear()
         self.user = User.objects.create_user(username="testuser", password="testpass")
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
@@ -63,6 +89,26 @@ class AdsModelTests(TestCase):
         )
         self.global_pricing = GlobalAdPricing.get_default_pricing()
 
+    def test_owner_denormalized_on_save(self):
+        self.assertEqual(self.campaign.owner_id, self.user.pk)
+        self.assertEqual((self.adset.brand_id, self.adset.owner_id), (self.brand.pk, self.user.pk))
+        self.assertEqual((self.ad.brand_id, self.ad.owner_id), (self.brand.pk, self.user.pk))
+
+        other_user = User.objects.create(username="otheruser", email="other@example.com")
+        brand = Brand.objects.get(pk=self.brand.pk)
+        brand.owner = other_user
+        brand.save()
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.owner_id, other_user.pk)
+
+    def test_backfill_owners_command(self):
+        Ad.objects.update(brand=None, owner=None)
+        AdSet.objects.update(brand=None, owner=None)
+        Campaign.objects.update(owner=None)
+        call_command("backfill_owners", batch_size=1, stdout=StringIO())
+        self.ad.refresh_from_db()
+        self.assertEqual((self.ad.brand_id, self.ad.owner_id), (self.brand.pk, self.user.pk))
+
     def test_global_pricing_default(self):
         self.assertIsNotNone(self.global_pricing)
         self.assertEqual(self.global_pricing.cost_per_click, 0.05)
@@ -120,6 +166,34 @@ class AdsModelTests(TestCase):
         self.campaign.refresh_from_db()
         self.assertEqual(self.campaign.status, Campaign.CampaignStatus.SCHEDULED)
 
+    def test_archive_inactive_objects(self):
+        billed_ad = Ad.objects.create(adset=self.adset, name="Billed Ad", is_active=False)
+        Transaction.objects.create(
+            brand=self.brand,
+            campaign=self.campaign,
+            ad=billed_ad,
+            amount=Decimal("0.10"),
+            transaction_type=Transaction.TransactionTypeChoices.COST,
+            cost_type=Transaction.CostTypeChoices.CLICK
+        )
+        recent_ad = Ad.objects.create(adset=self.adset, name="Recent Ad", is_active=False)
+        dead_campaign = Campaign.objects.create(brand=self.brand, name="Dead Campaign", is_active=False)
+        dead_adset = AdSet.objects.create(campaign=dead_campaign, name="Dead AdSet", is_active=False)
+        dead_ad = Ad.objects.create(adset=dead_adset, name="Dead Ad", is_active=False)
+        long_ago = timezone.now() - timedelta(days=365)
+        Ad.objects.filter(pk__in=[billed_ad.pk, dead_ad.pk]).update(updated_at=long_ago)
+        AdSet.objects.filter(pk=dead_adset.pk).update(updated_at=long_ago)
+        Campaign.objects.filter(pk=dead_campaign.pk).update(updated_at=long_ago)
+
+        from apps.ads.tasks import archive_inactive_ads_objects
+        archived = archive_inactive_ads_objects()
+        self.assertEqual(archived, {"ads.Ad": 1, "ads.AdSet": 1, "ads.Campaign": 1, "ads.Brand": 0})
+        self.assertEqual(Ad.objects.filter(pk__in=[billed_ad.pk, recent_ad.pk]).count(), 2)
+        self.assertFalse(Campaign.objects.filter(pk=dead_campaign.pk).exists())
+        record = ArchivedRecord.objects.get(object_id=dead_ad.pk)
+        self.assertEqual((record.model_label, record.owner_id), ("ads.Ad", self.user.pk))
+        self.assertEqual(record.data["adset"], str(dead_adset.pk))
+
 
 class BrandAPITest(APITestCaseBase):
     def setUp(self):
@@ -140,6 +214,40 @@ class BrandAPITest(APITestCaseBase):
         # Only brands for the authenticated user should be returned.
         self.assertEqual(len(response.data['results']), 1)
 
+    def test_get_brands_cached_per_user(self):
+        url = reverse("brands-api-list")
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(len(response.data['results']), 1)
+
+        other_user = User.objects.create_user(username="otheruser", email="other@example.com", password="testpass")
+        self.client.force_authenticate(user=other_user)
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data['results']), 0)
+
+    def test_get_brands_invalidated_on_write(self):
+        url = reverse("brands-api-list")
+        self.client.get(url)
+        self.brand.name = "Renamed Brand"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.brand.save()
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data['results'][0]['name'], "Renamed Brand")
+
+    def test_data_version_bumped_on_commit(self):
+        version = get_data_version(self.user.pk)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.brand.name = "Renamed Brand"
+            self.brand.save()
+        # A read before the commit must not cache the old rows under a new version.
+        self.assertEqual(get_data_version(self.user.pk), version)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(get_data_version(self.user.pk), version)
+
     def test_create_brand(self):
         url = reverse("brands-api-list")
         data = {
@@ -196,6 +304,42 @@ class CampaignAPITest(APITestCaseBase):
         # Only campaigns belonging to brands owned by the user should be returned.
         self.assertEqual(len(response.data['results']), 1)
 
+    def test_get_campaigns_not_modified(self):
+        url = reverse("campaigns-api-list")
+        response = self.client.get(url)
+        etag = response["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        self.campaign.name = "Renamed Campaign"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_get_campaigns_etag_changes_on_budget_pause(self):
+        self.addCleanup(ad_stats_buffer.clear)
+        self.campaign.start()
+        adset = AdSet.objects.create(campaign=self.campaign, name="Test AdSet")
+        ad = Ad.objects.create(adset=adset, name="Test Ad", cost_per_click=Decimal("100.00"))
+        url = reverse("campaigns-api-list")
+        etag = self.client.get(url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ad.log_click()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data['results'][0]['status'], Campaign.CampaignStatus.BUDGET_REACHED)
+
+    def test_get_campaign_not_modified(self):
+        url = reverse("campaigns-api-detail", args=[self.campaign.uuid])
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
     def test_create_campaign(self):
         url = reverse("campaigns-api-list")
         data = {
@@ -302,3 +446,596 @@ class AdAPITest(APITestCaseBase):
         response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data["name"], "New Ad")
+
+    def test_get_ads_sparse_fields(self):
+        url = reverse("ads-api-list")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"fields": "uuid,name"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results'][0]), {"uuid", "name"})
+        self.assertFalse(any('"content"' in query['sql'] for query in queries.captured_queries))
+
+    def test_get_ad_omit_fields(self):
+        url = reverse("ads-api-detail", args=[self.ad.uuid])
+        response = self.client.get(url, {"omit": "content,file"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("content", response.data)
+        self.assertNotIn("file", response.data)
+        self.assertEqual(response.data["name"], "Test Ad")
+
+    def test_search_ads_uses_name_index(self):
+        Ad.objects.create(adset=self.adset, name="Other Ad", is_active=True)
+        url = reverse("ads-api-list")
+        response = self.client.get(url, {"search": "test"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([ad["name"] for ad in response.data['results']], ["Test Ad"])
+
+        if connection.vendor == "postgresql":
+            # A handful of rows is cheaper to scan, so the planner has to be kept off seq scans.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = Ad.objects.filter(name__icontains="test").explain()
+            self.assertIn("ads_ad_name_trgm", plan)
+        elif connection.vendor == "sqlite":
+            plan = Ad.objects.filter(name__istartswith="test").explain()
+            self.assertIn("ads_ad_name_nocase", plan)
+
+    @skipUnless(connection.vendor in ("postgresql", "sqlite"), "Needs partial index support.")
+    def test_owner_lookup_uses_partial_index(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = Ad.objects.filter(is_active=True, owner=self.user).order_by("-created_at").explain()
+        self.assertIn("ads_ad_owner_active_idx", plan)
+
+    @skipUnless(connection.vendor == "sqlite", "Checks SQLite query plan output.")
+    def test_api_orderings_are_served_by_indexes(self):
+        for viewset in (BrandViewSet, CampaignViewSet, AdSetViewSet, AdViewSet):
+            for field in viewset.ordering_fields:
+                for ordering in (field, f"-{field}"):
+                    with self.subTest(viewset=viewset.__name__, ordering=ordering):
+                        plan = viewset.queryset.filter(owner=self.user).order_by(ordering).explain()
+                        self.assertIn("USING INDEX", plan)
+                        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class PerformanceReportAPITest(APITestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal("100.00"),
+            monthly_budget=Decimal("1000.00"),
+            timezone_str="UTC",
+            owner=self.user,
+            is_active=True
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            status=Campaign.CampaignStatus.RUNNING,
+            is_active=True
+        )
+        self.adset = AdSet.objects.create(campaign=self.campaign, name="Test AdSet", is_active=True)
+        self.ad = Ad.objects.create(adset=self.adset, name="Test Ad", is_active=True)
+        for amount, cost_type in (
+            (Decimal("0.10"), Transaction.CostTypeChoices.CLICK),
+            (Decimal("0.30"), Transaction.CostTypeChoices.CLICK),
+            (Decimal("0.002"), Transaction.CostTypeChoices.IMPRESSION),
+        ):
+            ledger_entry = Transaction.objects.create(
+                brand=self.brand,
+                campaign=self.campaign,
+                ad=self.ad,
+                amount=amount,
+                transaction_type=Transaction.TransactionTypeChoices.COST,
+                cost_type=cost_type
+            )
+            PerformanceRollup.record(ledger_entry, self.brand, self.ad)
+
+    def test_report_by_campaign_and_day(self):
+        url = reverse("performance-report-api")
+        response = self.client.get(url, {"group_by": "campaign,day"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row, = response.data['results']
+        self.assertEqual(row["campaign"], self.campaign.uuid)
+        self.assertEqual(row["day"], timezone.now().date())
+        self.assertEqual((row["clicks"], row["impressions"]), (2, 1))
+        self.assertEqual(row["spend"], Decimal("0.402"))
+        self.assertEqual(row["cpc"], Decimal("0.2"))
+        self.assertNotIn("click_spend", row)
+
+    def test_report_by_cost_type(self):
+        url = reverse("performance-report-api")
+        response = self.client.get(url, {"group_by": "ad,cost_type"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        events = {row["cost_type"]: row["events"] for row in response.data['results']}
+        self.assertEqual(events, {"click": 2, "impression": 1})
+
+    def test_report_defaults_to_each_brands_today(self):
+        brands = {
+            timezone_str: Brand.objects.create(
+                name=timezone_str,
+                daily_budget=Decimal("100.00"),
+                monthly_budget=Decimal("1000.00"),
+                timezone_str=timezone_str,
+                owner=self.user
+            )
+            for timezone_str in ("Etc/GMT+12", "Etc/GMT-14")
+        }
+        today = {
+            timezone_str: timezone.now().astimezone(pytz.timezone(timezone_str)).date()
+            for timezone_str in brands
+        }
+        # The west brand's row dated the east brand's today lies in its future.
+        for brand, local_date, events in (
+            (brands["Etc/GMT+12"], today["Etc/GMT+12"], 1),
+            (brands["Etc/GMT-14"], today["Etc/GMT-14"], 2),
+            (brands["Etc/GMT+12"], today["Etc/GMT-14"], 4),
+        ):
+            PerformanceRollup.objects.create(
+                brand=brand, owner=self.user, cost_type=Transaction.CostTypeChoices.CLICK,
+                local_date=local_date, local_hour=0, events=events, amount=Decimal("1.00")
+            )
+
+        url = reverse("performance-report-api")
+        response = self.client.get(url, {"group_by": "brand"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        clicks = {row["brand"]: row["clicks"] for row in response.data['results']}
+        self.assertEqual(clicks[brands["Etc/GMT+12"].uuid], 1)
+        self.assertEqual(clicks[brands["Etc/GMT-14"].uuid], 2)
+
+        response = self.client.get(url, {"group_by": "brand", "brand": brands["Etc/GMT-14"].uuid})
+        row, = response.data['results']
+        self.assertEqual(row["clicks"], 2)
+
+    def test_report_invalid_group_by(self):
+        url = reverse("performance-report-api")
+        response = self.client.get(url, {"group_by": "owner"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_matches_billing_path(self):
+        recorded = set(PerformanceRollup.objects.values_list('cost_type', 'events', 'amount'))
+        PerformanceRollup.rebuild(self.brand)
+        self.assertEqual(set(PerformanceRollup.objects.values_list('cost_type', 'events', 'amount')), recorded)
+
+
+class AsyncReadPathTest(APITestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.brand = Brand.objects.create(
+            name="Async Brand",
+            daily_budget=Decimal("100.00"),
+            monthly_budget=Decimal("1000.00"),
+            timezone_str="UTC",
+            owner=self.user
+        )
+        self.campaign = Campaign.objects.create(brand=self.brand, name="Async Campaign")
+        self.adset = AdSet.objects.create(campaign=self.campaign, name="Async AdSet")
+        self.ad = Ad.objects.create(adset=self.adset, name="Async Ad", cost_per_click=Decimal("0.10"))
+        ledger_entry = Transaction.objects.create(
+            brand=self.brand,
+            campaign=self.campaign,
+            ad=self.ad,
+            amount=Decimal("0.10"),
+            transaction_type=Transaction.TransactionTypeChoices.COST,
+            cost_type=Transaction.CostTypeChoices.CLICK
+        )
+        PerformanceRollup.record(ledger_entry, self.brand, self.ad)
+        self.async_client = AsyncClient()
+        self.auth_headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    async def test_async_list_matches_sync_list(self):
+        for basename in ("brands-api", "campaigns-api", "ad-sets-api", "ads-api"):
+            sync_response = await sync_to_async(self.client.get)(reverse(f"{basename}-list"))
+            response = await self.async_client.get(reverse(f"async-{basename}-list"), headers=self.auth_headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json(), json.loads(sync_response.content))
+
+    async def test_async_list_filters_and_caches(self):
+        url = reverse("async-ads-api-list")
+        response = await self.async_client.get(
+            url, {"adset": str(self.adset.pk), "fields": "uuid,name"}, headers=self.auth_headers
+        )
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["results"], [{"uuid": str(self.ad.pk), "name": "Async Ad"}])
+        response = await self.async_client.get(
+            url, {"fields": "uuid,name", "adset": str(self.adset.pk)}, headers=self.auth_headers
+        )
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    async def test_async_detail_is_owner_scoped(self):
+        response = await self.async_client.get(
+            reverse("async-campaigns-api-detail", args=[self.campaign.pk]), headers=self.auth_headers
+        )
+        self.assertEqual(response.json()["name"], "Async Campaign")
+        other = await User.objects.acreate(username="other", email="other@example.com")
+        other_headers = {"Authorization": f"Bearer {AccessToken.for_user(other)}"}
+        response = await self.async_client.get(
+            reverse("async-campaigns-api-detail", args=[self.campaign.pk]), headers=other_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_async_requires_token(self):
+        response = await self.async_client.get(reverse("async-brands-api-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(response.has_header("WWW-Authenticate"))
+
+    async def test_async_performance_report(self):
+        url = reverse("async-performance-report-api")
+        response = await self.async_client.get(url, {"group_by": "ad"}, headers=self.auth_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row, = response.json()["results"]
+        self.assertEqual((row["ad"], row["clicks"], row["spend"]), (str(self.ad.pk), 1, 0.1))
+        response = await self.async_client.get(url, {"group_by": "nope"}, headers=self.auth_headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(DATABASE_REPLICA_ENABLED=True)
+class ReplicaRoutingTest(APITransactionTestCase):
+    """The `replica` alias mirrors the default test database and stands in for a replica."""
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(username="replicauser", password="testpass")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.brand = Brand.objects.create(
+            name="Replica Brand",
+            daily_budget=Decimal("1.00"),
+            monthly_budget=Decimal("100.00"),
+            timezone_str="UTC",
+            owner=self.user,
+            is_active=True
+        )
+        # Drops the pin of the writes above, as if the replica had caught up.
+        cache.clear()
+
+    def test_lists_and_reports_read_from_replica(self):
+        for url, params in ((reverse("brands-api-list"), {}), (reverse("performance-report-api"), {"group_by": "ad"})):
+            with CaptureQueriesContext(connections["replica"]) as replica_queries:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(replica_queries.captured_queries, url)
+
+        with CaptureQueriesContext(connections["replica"]) as replica_queries:
+            self.client.get(reverse("brands-api-detail", args=[self.brand.uuid]))
+        self.assertEqual(replica_queries.captured_queries, [])
+
+    def test_write_pins_user_to_primary(self):
+        response = self.client.patch(reverse("brands-api-detail", args=[self.brand.uuid]), {"name": "Renamed"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connections["replica"]) as replica_queries:
+            response = self.client.get(reverse("brands-api-list"))
+        self.assertEqual(response.data["results"][0]["name"], "Renamed")
+        self.assertEqual(replica_queries.captured_queries, [])
+
+        with read_from_replica(self.user.pk):
+            self.assertEqual(ReplicaRouter().db_for_read(Brand), "default")
+        with read_from_replica():
+            self.assertEqual(ReplicaRouter().db_for_read(Brand), "replica")
+            with transaction.atomic():
+                self.assertEqual(ReplicaRouter().db_for_read(Brand), "default")
+            self.assertEqual(ReplicaRouter().db_for_write(Brand), "default")
+        self.assertEqual(ReplicaRouter().db_for_read(Brand), "default")
+
+    def test_budget_enforcement_reads_spend_from_replica(self):
+        from apps.ads.tasks import enforce_campaign_budget
+
+        campaign = Campaign.objects.create(
+            brand=self.brand, name="Replica Campaign", status=Campaign.CampaignStatus.RUNNING, is_active=True
+        )
+        Transaction.objects.create(
+            brand=self.brand, amount=Decimal("2.00"), transaction_type=Transaction.TransactionTypeChoices.COST
+        )
+        with CaptureQueriesContext(connections["replica"]) as replica_queries:
+            enforce_campaign_budget()
+        replica_sql = [query["sql"] for query in replica_queries.captured_queries]
+        self.assertTrue(any("payments_transaction" in sql for sql in replica_sql))
+        self.assertFalse(any(sql.startswith("UPDATE") for sql in replica_sql))
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, Campaign.CampaignStatus.BUDGET_REACHED)
+
+        # The task bumped the owner's data version, so their next list reads the primary.
+        self.assertTrue(is_pinned(self.user.pk))
+        with CaptureQueriesContext(connections["replica"]) as replica_queries:
+            response = self.client.get(reverse("campaigns-api-list"))
+        self.assertEqual(response.data["results"][0]["status"], Campaign.CampaignStatus.BUDGET_REACHED)
+        self.assertEqual(replica_queries.captured_queries, [])
+
+    def test_counter_flush_pins_user_to_primary(self):
+        campaign = Campaign.objects.create(brand=self.brand, name="Replica Campaign")
+        adset = AdSet.objects.create(campaign=campaign, name="Replica AdSet")
+        ad = Ad.objects.create(adset=adset, name="Replica Ad", is_active=True)
+        cache.clear()
+        with CaptureQueriesContext(connections["replica"]) as replica_queries:
+            self.client.get(reverse("ads-api-list"))
+        self.assertTrue(replica_queries.captured_queries)
+
+        AdStats.add({ad.pk: {**dict.fromkeys(AdStats.FIELDS, 0), "clicks": 1, "owner_id": self.user.pk}})
+        self.assertTrue(is_pinned(self.user.pk))
+        with CaptureQueriesContext(connections["replica"]) as replica_queries:
+            response = self.client.get(reverse("ads-api-list"))
+        self.assertEqual(response.data["results"][0]["clicks"], 1)
+        self.assertEqual(replica_queries.captured_queries, [])
+
+
+class CreativeUploadTest(APITestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        overrides = override_settings(
+            MEDIA_ROOT=self.media_root.name,
+            CREATIVE_UPLOAD_TEMP_DIR=os.path.join(self.media_root.name, "uploads")
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        buffer = BytesIO()
+        Image.new("RGB", (1600, 900), (200, 40, 40)).save(buffer, "PNG")
+        self.content = buffer.getvalue()
+        self.sha256 = hashlib.sha256(self.content).hexdigest()
+
+    def start(self, content=None, sha256=None):
+        content = self.content if content is None else content
+        response = self.client.post(reverse("creative-uploads-api-list"), {
+            "sha256": sha256 or hashlib.sha256(content).hexdigest(),
+            "size": len(content),
+            "content_type": "image/png",
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def put_chunk(self, upload, chunk, offset):
+        return self.client.put(
+            reverse("creative-uploads-api-detail", args=[upload["uuid"]]), chunk,
+            content_type="application/offset+octet-stream", HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def upload(self, content=None):
+        content = self.content if content is None else content
+        upload = self.start(content)
+        if upload["creative"] is None:
+            response = self.put_chunk(upload, content, 0)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            upload = response.data
+        return Creative.objects.get(pk=upload["creative"])
+
+    def test_chunked_upload_resumes_at_received_offset(self):
+        upload = self.start()
+        half = len(self.content) // 2
+        self.assertEqual(self.put_chunk(upload, self.content[:half], 0)["Upload-Offset"], str(half))
+
+        response = self.put_chunk(upload, self.content[:half], 0)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        response = self.client.get(reverse("creative-uploads-api-detail", args=[upload["uuid"]]))
+        self.assertEqual((response.data["received"], response.data["creative"]), (half, None))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.put_chunk(upload, self.content[half:], half)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        creative = Creative.objects.get(pk=response.data["creative"])
+        self.assertEqual(creative.file.name, Creative.get_storage_name(self.sha256))
+        self.assertEqual(creative.file.read(), self.content)
+        creative.file.close()
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(os.listdir(os.path.join(self.media_root.name, "uploads")))
+
+    def test_same_content_is_stored_once(self):
+        creative = self.upload()
+        # The owner gets their creative back without sending the bytes again.
+        self.assertEqual(self.start()["creative"], creative.pk)
+
+        creative.renditions = {"thumbnail": "creatives/thumbnail.webp"}
+        creative.save()
+        other = User.objects.create_user(username="otheruser", email="other@example.com", password="testpass")
+        self.client.force_authenticate(user=other)
+        with self.captureOnCommitCallbacks() as callbacks:
+            other_creative = self.upload()
+        self.assertNotEqual(other_creative.pk, creative.pk)
+        self.assertEqual(other_creative.file.name, creative.file.name)
+        self.assertEqual(other_creative.renditions, creative.renditions)
+        self.assertEqual(callbacks, [])
+        self.assertEqual(len(os.listdir(os.path.dirname(creative.file.path))), 1)
+
+        # Ads can only use the creatives of their owner.
+        campaign = Campaign.objects.create(brand=Brand.objects.create(
+            name="Other Brand", daily_budget=Decimal("1"), monthly_budget=Decimal("1"), owner=other
+        ), name="Other Campaign")
+        adset = AdSet.objects.create(campaign=campaign, name="Other AdSet")
+        response = self.client.post(reverse("ads-api-list"), {"adset": adset.pk, "name": "Ad", "creative": creative.pk})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            reverse("ads-api-list"), {"adset": adset.pk, "name": "Ad", "creative": other_creative.pk}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_chunk_is_streamed_outside_transactions(self):
+        upload = CreativeUpload.objects.get(pk=self.start()["uuid"])
+        depth = len(connection.atomic_blocks)
+        depths = []
+
+        class Stream(BytesIO):
+            def read(stream, size=-1):
+                depths.append(len(connection.atomic_blocks))
+                return super().read(size)
+
+        upload = CreativeService.write_chunk(upload, 0, Stream(self.content), len(self.content))
+        self.assertIsNotNone(upload.creative_id)
+        self.assertEqual(set(depths), {depth})
+
+    def test_concurrent_chunk_is_rejected(self):
+        upload = self.start()
+        temp_path = CreativeUpload.objects.get(pk=upload["uuid"]).temp_path
+        os.makedirs(os.path.dirname(temp_path))
+        with open(temp_path, "wb") as fp:
+            fcntl.flock(fp, fcntl.LOCK_EX)
+            response = self.put_chunk(upload, self.content, 0)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(CreativeUpload.objects.get(pk=upload["uuid"]).received, 0)
+
+    def test_content_not_matching_hash_is_rejected(self):
+        upload = self.start(sha256="0" * 64)
+        response = self.put_chunk(upload, self.content, 0)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(CreativeUpload.objects.get(pk=upload["uuid"]).received, 0)
+        self.assertFalse(Creative.objects.exists())
+
+    def test_renditions_are_generated_once_per_content(self):
+        from apps.ads.tasks import generate_creative_renditions
+
+        creative = self.upload()
+        renditions = generate_creative_renditions(self.sha256)
+        self.assertEqual(set(renditions), {"thumbnail", "preview"})
+        with Image.open(os.path.join(self.media_root.name, renditions["thumbnail"])) as image:
+            self.assertEqual((image.format, image.size), ("WEBP", (320, 180)))
+        creative.refresh_from_db()
+        self.assertEqual(creative.renditions, renditions)
+        response = self.client.get(reverse("creatives-api-list"))
+        self.assertEqual(response.data["results"][0]["renditions"]["preview"], f"/media/{renditions['preview']}")
+
+
+class AdStatsTest(APITestCaseBase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(ad_stats_buffer.clear)
+        self.brand = Brand.objects.create(
+            name="Stats Brand",
+            daily_budget=Decimal("100.00"),
+            monthly_budget=Decimal("1000.00"),
+            timezone_str="UTC",
+            owner=self.user
+        )
+        campaign = Campaign.objects.create(
+            brand=self.brand, name="Stats Campaign", status=Campaign.CampaignStatus.RUNNING
+        )
+        self.adset = AdSet.objects.create(campaign=campaign, name="Stats AdSet")
+        self.ad = Ad.objects.create(
+            adset=self.adset,
+            name="Stats Ad",
+            cost_per_click=Decimal("0.10"),
+            cost_per_impression=Decimal("2.00"),
+            cost_per_view=Decimal("0.05"),
+            cost_per_acquisition=Decimal("5.00")
+        )
+
+    @override_settings(AD_STATS_FLUSH_EVENTS=100, AD_STATS_FLUSH_SECONDS=3600)
+    def test_flushed_counters_match_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ad.log_click()
+            self.ad.log_click()
+            self.ad.log_impression()
+        self.assertFalse(AdStats.objects.exists())
+        self.assertTrue(ad_stats_buffer.flush())
+        stats = AdStats.objects.get(ad=self.ad)
+        self.assertEqual((stats.clicks, stats.impressions, stats.spend), (2, 1, Decimal("0.2020")))
+
+        AdStats.rebuild(self.brand)
+        self.assertEqual(AdStats.objects.get(ad=self.ad).clicks, 2)
+        PerformanceRollup.objects.filter(cost_type=Transaction.CostTypeChoices.CLICK).update(events=7)
+        AdStats.rebuild(self.brand)
+        self.assertEqual(AdStats.objects.get(ad=self.ad).clicks, 7)
+
+    def test_ad_list_reads_stats_in_the_same_query(self):
+        ads = [Ad.objects.create(adset=self.adset, name=f"Listed Ad {index}") for index in range(5)]
+        AdStats.objects.bulk_create([AdStats(ad=ad, clicks=index) for index, ad in enumerate(ads)])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("ads-api-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats_queries = [query["sql"] for query in queries.captured_queries if '"ads_adstats"' in query["sql"]]
+        self.assertTrue(all('"ads_ad"' in sql for sql in stats_queries))
+        clicks = {row["name"]: (row["clicks"], row["spend"]) for row in response.data["results"]}
+        self.assertEqual(clicks["Listed Ad 3"], (3, "0.0000"))
+        self.assertEqual(clicks["Stats Ad"], (0, "0.0000"))
+
+        # A flush changes the ETag of the list, and leaves the other cached responses alone.
+        etag = response["ETag"]
+        self.client.get(reverse("brands-api-list"))
+        with self.captureOnCommitCallbacks(execute=True):
+            AdStats.add({ads[0].pk: {**dict.fromkeys(AdStats.FIELDS, 0), "clicks": 1, "owner_id": self.user.pk}})
+        response = self.client.get(reverse("ads-api-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(reverse("brands-api-list"))["X-Cache"], "HIT")
+        self.assertEqual(AdStats.objects.get(ad=ads[0]).clicks, 1)
+
+
+class AdStatsBufferTest(APITransactionTestCase):
+    """Flushes run in a timer thread, which only sees committed rows."""
+
+    def setUp(self):
+        self.addCleanup(ad_stats_buffer.clear)
+        user = User.objects.create_user(username="statsuser", password="testpass")
+        brand = Brand.objects.create(
+            name="Stats Brand",
+            daily_budget=Decimal("100.00"),
+            monthly_budget=Decimal("1000.00"),
+            timezone_str="UTC",
+            owner=user
+        )
+        campaign = Campaign.objects.create(brand=brand, name="Stats Campaign", status=Campaign.CampaignStatus.RUNNING)
+        self.ad = Ad.objects.create(
+            adset=AdSet.objects.create(campaign=campaign, name="Stats AdSet"),
+            name="Stats Ad",
+            cost_per_click=Decimal("0.10"),
+            cost_per_impression=Decimal("2.00"),
+            cost_per_acquisition=Decimal("5.00")
+        )
+
+    @override_settings(AD_STATS_FLUSH_EVENTS=4, AD_STATS_FLUSH_SECONDS=3600)
+    def test_billing_events_are_flushed_in_batches(self):
+        self.ad.log_click()
+        self.ad.log_click()
+        self.ad.log_impression()
+        self.assertEqual(ad_stats_buffer.timer.interval, 3600)
+
+        self.ad.log_acquisition()
+        ad_stats_buffer.timer.join(5)
+        stats = AdStats.objects.get(ad=self.ad)
+        self.assertEqual(
+            (stats.clicks, stats.impressions, stats.views, stats.acquisitions, stats.spend),
+            (2, 1, 0, 1, Decimal("5.2020"))
+        )
+        self.assertEqual(ad_stats_buffer.pending, {})
+
+    @override_settings(AD_STATS_FLUSH_EVENTS=2, AD_STATS_FLUSH_SECONDS=3600)
+    def test_events_past_the_threshold_share_one_flush(self):
+        release = threading.Event()
+        # Holds the due flush back, so the events below arrive while it is pending.
+        with mock.patch.object(ad_stats_buffer, "_flush_in_background", release.wait):
+            self.ad.log_click()
+            self.ad.log_click()
+            timer = ad_stats_buffer.timer
+            self.assertEqual(timer.interval, 0)
+            self.ad.log_click()
+            self.ad.log_impression()
+            self.assertIs(ad_stats_buffer.timer, timer)
+            release.set()
+            timer.join(5)
+        self.assertEqual(ad_stats_buffer.events, 4)
+
+    @override_settings(AD_STATS_FLUSH_EVENTS=100, AD_STATS_FLUSH_SECONDS=0)
+    def test_idle_buffer_is_flushed_after_its_age(self):
+        self.ad.log_click()
+        ad_stats_buffer.timer.join(5)
+        self.assertEqual(AdStats.objects.get(ad=self.ad).clicks, 1)
+
+    @override_settings(AD_STATS_FLUSH_EVENTS=100, AD_STATS_FLUSH_SECONDS=3600)
+    def test_failed_flush_is_kept_for_a_retry(self):
+        self.ad.log_click()
+        # Counters cannot go negative, so this batch fails.
+        ad_stats_buffer.pending[self.ad.pk]["views"] = -1
+        with self.assertLogs("apps.ads.models", "ERROR"):
+            self.assertFalse(ad_stats_buffer.flush())
+        self.assertFalse(AdStats.objects.filter(clicks__gt=0).exists())
+        self.assertEqual(
+            (ad_stats_buffer.pending[self.ad.pk]["clicks"], ad_stats_buffer.pending[self.ad.pk]["views"]), (1, -1)
+        )
+        self.assertEqual(ad_stats_buffer.timer.interval, 3600)
+
+        ad_stats_buffer.pending[self.ad.pk]["views"] = 0
+        self.assertTrue(ad_stats_buffer.flush())
+        self.assertEqual(AdStats.objects.get(ad=self.ad).clicks, 1)
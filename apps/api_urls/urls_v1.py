@@ -20,6 +20,7 @@ urlpatterns = [
     path('auth/', include('apps.authentication.api.urls')),
     path('user/', include('apps.users.api.urls')),
     path('ads/', include('apps.ads.api.urls')),
+    path('payments/', include('apps.payments.api.urls')),
     path('docs', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     re_path(
         r'^docs(?P<format>\.json)$',
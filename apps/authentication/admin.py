@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.utils import timezone
+
+from apps.users.models import User
 from .models import UserVerificationRequest
 from djangoql.admin import DjangoQLSearchMixin
 
@@ -6,6 +9,9 @@ from djangoql.admin import DjangoQLSearchMixin
 @admin.action(description='Make selected requests verified')
 def verify_request(modeladmin, request, queryset):
     queryset.update(used=True, is_active=False)
+    User.objects.filter(
+        pk__in=queryset.values('user'), email_verified_at__isnull=True
+    ).update(email_verified_at=timezone.now())
 
 
 @admin.register(UserVerificationRequest)
@@ -13,7 +19,7 @@ class UserVerificationRequestAdmin(DjangoQLSearchMixin, admin.ModelAdmin):
     list_display = (
         'uuid', 'code', 'email',
         'user', 'used', 'is_active',
-        'created_at', 'updated_at'
+        'created_at', 'expires_at', 'sent_at', 'updated_at'
     )
     search_fields = ('email', 'code')
     list_filter = ('used',)
@@ -1,6 +1,6 @@
 from typing import Optional, Type
 
-from django.contrib.auth import get_user_model, password_validation
+from django.contrib.auth import password_validation
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -9,41 +9,41 @@ from rest_framework.exceptions import ValidationError, PermissionDenied
 from rest_framework_simplejwt.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer, PasswordField
 from rest_framework_simplejwt.settings import api_settings
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.utils import get_md5_hash_password
 
+from apps.users.managers import normalize_email
 from apps.users.models import User
 
 from ..models import UserVerificationRequest
 from ..services import AuthenticationService
 from ..tasks import send_account_verification_email, send_forget_password_email
+from ..tokens import CachedBlacklistRefreshToken
 
 
 class LifeTimeTokenSerializer:
 
     def validate(self, attrs):
         # adding lifetime to data
-        email = attrs.get('email', '').lower()
+        email = normalize_email(attrs.get('email', ''))
         attrs['email'] = email
         data = super().validate(attrs)
         data['lifetime'] = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
-        if email:
-            qs = UserVerificationRequest.objects.filter(email=email)
-            if not qs.exists():
+        user = getattr(self, 'user', None)
+        if user is not None and user.email_verified_at is None:
+            if not UserVerificationRequest.objects.filter(user=user).exists():
                 raise ValidationError("verification does not exists, use resend verification.")
-            if qs.exists() and qs.filter(used=True, is_active=False).order_by('-created_at').exists() is False:
-                raise PermissionDenied({'verified': False})
+            raise PermissionDenied({'verified': False})
         return data
 
 
-class LifeTimeTokenObtainSerializer(LifeTimeTokenSerializer):
+class LifeTimeTokenObtainSerializer(LifeTimeTokenSerializer, TokenObtainPairSerializer):
     def validate(self, attrs):
         data = super(LifeTimeTokenObtainSerializer, self).validate(attrs)
         return data
 
 
 class LifeTimeTokenRefreshSerializer(LifeTimeTokenSerializer, TokenRefreshSerializer):
-    pass
+    token_class = CachedBlacklistRefreshToken
 
 
 class RegisterSerializer(serializers.Serializer):
@@ -62,39 +62,30 @@ class RegisterSerializer(serializers.Serializer):
         return value
 
     def validate_email(self, value):
-        if User.objects.filter(email__icontains=value.lower(), is_temp=False).exists():
+        if AuthenticationService.email_exists(value):
             raise ValidationError(
                 _('This email address is already registered. You can only create one profile per email address.'))
-        return value
+        return normalize_email(value)
 
     def create(self, validated_data):
         first_name = validated_data['first_name']
         last_name = validated_data['last_name']
-        email = validated_data['email'].lower()
+        email = validated_data['email']
         password = validated_data['password']
         gender = validated_data['gender']
         phone_number = validated_data['phone_number']
         username = email
-        if User.objects.filter(email=email, is_temp=True, is_active=True).exists():
-            user = User.objects.filter(email=email, is_temp=True, is_active=True).first()
-            user.set_password(password)
-            user.first_name = first_name
-            user.last_name = last_name
-            user.gender = gender
-            user.phone_number = phone_number
-            user.save()
-        else:
-            user = User.objects.create_user(
-                username=username,
-                email=email,
-                password=password,
-                first_name=first_name,
-                last_name=last_name,
-                gender=gender,
-                phone_number=phone_number,
-                is_active=True
-
-            )
+        user = User.objects.create_user(
+            username=username,
+            email=email,
+            password=password,
+            first_name=first_name,
+            last_name=last_name,
+            gender=gender,
+            phone_number=phone_number,
+            is_active=True
+
+        )
         UserVerificationRequest.objects.create(
             user=user,
             email=email,
@@ -142,9 +133,9 @@ class ChangeEmailSerializer(serializers.Serializer):
         fields = ('email',)
 
     def validate_email(self, email):
-        if User.objects.filter(email__icontains=email.lower()).exists():
+        if AuthenticationService.email_exists(email):
             raise serializers.ValidationError(_('this email has been taken already!'))
-        return email
+        return normalize_email(email)
 
     def update(self, instance, validated_data):
         send_account_verification_email.delay(instance.id)
@@ -155,16 +146,15 @@ class ForgetPasswordSerializer(serializers.Serializer):
     email = serializers.EmailField(write_only=True)
 
     def validate_email(self, value):
-        value = value.lower()
-        if not User.objects.filter(email__icontains=value).exists():
+        value = normalize_email(value)
+        if not AuthenticationService.email_exists(value):
             raise ValidationError(_('user with this email does not exists.'))
         if not AuthenticationService.is_verified(value):
             raise ValidationError(_('Please finish your Email verification before resetting your password.'))
         return value
 
     def create(self, validated_data):
-        email = validated_data['email'].lower()
-        user = get_user_model().objects.filter(email__icontains=email).first()
+        user = User.objects.filter_by_email(validated_data['email']).first()
         send_forget_password_email.delay(user.id)
         return {'forget_password_request': 'created'}
 
@@ -188,16 +178,15 @@ class ResendVerificationSerializer(serializers.Serializer):
     email = serializers.EmailField(write_only=True)
 
     def validate_email(self, value):
-        value = value.lower()
-        if not User.objects.filter(email__icontains=value).exists():
+        value = normalize_email(value)
+        if not AuthenticationService.email_exists(value):
             raise ValidationError(_('user with this email does not exists.'))
         if AuthenticationService.is_verified(value):
             raise ValidationError(_('user with this email has been verified already.'))
         return value
 
     def create(self, validated_data):
-        email = validated_data['email'].lower()
-        user = get_user_model().objects.filter(email__icontains=email).first()
+        user = User.objects.filter_by_email(validated_data['email']).first()
         send_account_verification_email.delay(user.id)
         return user
 
@@ -208,7 +197,7 @@ class LogoutSerializer(serializers.Serializer):
 
     def validate_refresh(self, value):
         try:
-            RefreshToken(value)
+            CachedBlacklistRefreshToken(value)
         except Exception:
             raise serializers.ValidationError("Invalid refresh token")
         return value
@@ -1,9 +1,11 @@
 from rest_framework import throttling
 
+from utils.throttles import SlidingWindowRateThrottle
 
-class SendEmailThrottle(throttling.AnonRateThrottle):
+
+class SendEmailThrottle(SlidingWindowRateThrottle, throttling.AnonRateThrottle):
     scope = 'send-email'
 
 
-class LoginThrottle(throttling.AnonRateThrottle):
+class LoginThrottle(SlidingWindowRateThrottle, throttling.AnonRateThrottle):
     scope = 'login'
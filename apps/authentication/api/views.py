@@ -1,10 +1,10 @@
 from django.http import Http404
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from apps.users.models import User
@@ -17,6 +17,7 @@ from .serializers import (
 from .throttles import SendEmailThrottle, LoginThrottle
 from ..authentications import CustomAuthentication
 from ..models import UserForgetPasswordRequest, UserVerificationRequest
+from ..tokens import CachedBlacklistRefreshToken
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -52,7 +53,7 @@ class VerificationConfirmAPIView(generics.GenericAPIView):
 
     def post(self, request, *args, **kwargs):
         code = kwargs.get('code')
-        obj = UserVerificationRequest.objects.filter(is_active=True, used=False, code=code).first()
+        obj = UserVerificationRequest.pending().filter(code=code).first()
         if obj:
             obj.used = True
             obj.is_active = False
@@ -60,6 +61,7 @@ class VerificationConfirmAPIView(generics.GenericAPIView):
             if obj.user:
                 user = obj.user
                 user.email = obj.email
+                user.email_verified_at = timezone.now()
                 user.save()
             return Response({'status': 'success'})
         raise Http404("not found")
@@ -70,7 +72,7 @@ class ForgetPasswordConfirmAPIView(generics.GenericAPIView):
 
     def post(self, request, *args, **kwargs):
         code = kwargs.get('code')
-        obj = UserForgetPasswordRequest.objects.filter(is_active=True, used=False, code=code).first()
+        obj = UserForgetPasswordRequest.pending().filter(code=code).first()
         if obj:
             serializer = self.serializer_class(data=request.data)
             serializer.is_valid(raise_exception=True)
@@ -78,6 +80,9 @@ class ForgetPasswordConfirmAPIView(generics.GenericAPIView):
             user = obj.user
             user.set_password(password)
             user.save()
+            obj.used = True
+            obj.is_active = False
+            obj.save()
             return Response(serializer.data)
         raise Http404("not found")
 
@@ -121,7 +126,7 @@ class LogoutView(generics.GenericAPIView):
         try:
             serializer = self.serializer_class(data=request.data)
             serializer.is_valid(raise_exception=True)
-            token = RefreshToken(serializer.validated_data['refresh'])
+            token = CachedBlacklistRefreshToken(serializer.validated_data['refresh'])
             token.blacklist()
             return Response(status=status.HTTP_205_RESET_CONTENT)
         except Exception:
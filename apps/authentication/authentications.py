@@ -1,12 +1,10 @@
-from functools import lru_cache
-
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import exceptions
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.settings import api_settings
 
-from apps.users.models import User
+from apps.authentication.cache import user_cache
 
 
 class CustomAuthentication(JWTAuthentication):
@@ -36,22 +34,33 @@ class CustomAuthentication(JWTAuthentication):
 
         raise exceptions.AuthenticationFailed('Token is expired!')
 
+    async def aauthenticate(self, request):
+        """
+        Async counterpart of `authenticate` for plain Django async views.
+        Token validation is CPU only; the user comes from the user cache or the async ORM.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        user_pk = validated_token.get(api_settings.USER_ID_CLAIM)
+        if not user_pk:
+            raise exceptions.AuthenticationFailed('Token is expired!')
+
+        return await user_cache.aget(user_pk), {}
+
     @staticmethod
-    @lru_cache(maxsize=None)
     def authenticate_credentials(user_pk=None):
         """
-        Returns a user of the existing service
+        Returns a user of the existing service, from the user cache when possible.
         """
         if not user_pk:
             msg = _('Invalid payload.')
             raise exceptions.AuthenticationFailed(msg)
 
-        if user_pk:
-            try:
-                user = User.objects.get(pk=user_pk)
-            except User.DoesNotExist:
-                msg = _('Invalid signature.')
-                raise exceptions.AuthenticationFailed(msg)
-            except Exception as e:
-                raise exceptions.AuthenticationFailed(e)
-            return user
+        return user_cache.get(user_pk)
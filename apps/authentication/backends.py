@@ -20,7 +20,7 @@ class EmailAuthBackend(ModelBackend):
         if username is None or password is None:
             return
         try:
-            user = UserModel.objects.get(email=username.lower())
+            user = UserModel.objects.filter_by_email(username).get()
         except UserModel.DoesNotExist:
             # Run the default password hasher once to reduce the timing
             # difference between an existing and a nonexistent user (#20760).
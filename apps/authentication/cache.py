@@ -0,0 +1,115 @@
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+
+from apps.users.models import User
+from utils.cache import LRUCache, aget_version, bump_version, get_version
+
+USER_KEY = 'auth-user:{user_pk}'
+USER_VERSION_KEY = 'auth-user-version:{user_pk}'
+
+
+class UserCache(object):
+    """
+    Users resolved from token claims.
+
+    The first tier is a bounded per-process LRU with a TTL, invalidated by the `User`
+    signals of this process. With `shared`, users are also kept in the django cache and
+    each local entry is checked against a per-user version stored there, so a save in
+    any process invalidates every worker. Inactive users are rejected and never cached.
+    """
+
+    def __init__(self, max_size, ttl, shared=False):
+        self.local = LRUCache(max_size, ttl)
+        self.ttl = ttl
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def get(self, user_pk):
+        version = get_version(USER_VERSION_KEY.format(user_pk=user_pk)) if self.shared else None
+        user = self._get_local(user_pk, version)
+        if user is not None:
+            return user
+
+        key = USER_KEY.format(user_pk=user_pk)
+        user = cache.get(key, version=version) if self.shared else None
+        if user is None:
+            user = self.check_user(User.unordered.filter(pk=user_pk).first())
+            if self.shared:
+                cache.set(key, user, self.ttl, version=version)
+            self._record('loads')
+        else:
+            self._record('shared_hits')
+        self.local.set(user_pk, (user, version))
+        return user
+
+    async def aget(self, user_pk):
+        """
+        Async counterpart of `get`.
+        """
+        version = await aget_version(USER_VERSION_KEY.format(user_pk=user_pk)) if self.shared else None
+        user = self._get_local(user_pk, version)
+        if user is not None:
+            return user
+
+        key = USER_KEY.format(user_pk=user_pk)
+        user = await cache.aget(key, version=version) if self.shared else None
+        if user is None:
+            user = self.check_user(await User.unordered.filter(pk=user_pk).afirst())
+            if self.shared:
+                await cache.aset(key, user, self.ttl, version=version)
+            self._record('loads')
+        else:
+            self._record('shared_hits')
+        self.local.set(user_pk, (user, version))
+        return user
+
+    def invalidate(self, user_pk):
+        self.local.delete(user_pk)
+        if self.shared:
+            bump_version(USER_VERSION_KEY.format(user_pk=user_pk))
+
+    def clear(self):
+        self.local.clear()
+
+    def stats(self):
+        """
+        Returns the local tier metrics (size, hits, misses, evictions, hit rate) of this
+        process, plus how many misses were answered by the shared tier or the database.
+        """
+        with self._lock:
+            return {
+                **self.local.stats(),
+                'shared_hits': self._stats['shared_hits'],
+                'loads': self._stats['loads']
+            }
+
+    @staticmethod
+    def check_user(user):
+        if user is None:
+            raise exceptions.AuthenticationFailed(_('Invalid signature.'))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User is inactive.'))
+        return user
+
+    def _get_local(self, user_pk, version):
+        entry = self.local.get(user_pk)
+        if entry is not None and entry[1] == version:
+            return entry[0]
+        return None
+
+    def _record(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+
+user_cache = UserCache(
+    max_size=settings.AUTH_USER_CACHE_SIZE,
+    ttl=settings.AUTH_USER_CACHE_TTL,
+    shared=settings.AUTH_USER_CACHE_SHARED
+)
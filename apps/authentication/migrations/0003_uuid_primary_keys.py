@@ -0,0 +1,50 @@
+import uuid
+
+from django.db import migrations, models
+
+REQUEST_MODELS = ('userverificationrequest', 'userforgetpasswordrequest')
+
+
+def populate_uuids(apps, schema_editor):
+    for model_name in REQUEST_MODELS:
+        model = apps.get_model('authentication', model_name)
+        for pk in model.objects.filter(uuid__isnull=True).values_list('pk', flat=True).iterator():
+            model.objects.filter(pk=pk).update(uuid=uuid.uuid4())
+
+
+class Migration(migrations.Migration):
+    """
+    The request models inherit the uuid primary key of BaseModelMixin, but the initial
+    migrations were generated with an integer `id`. Existing rows get a fresh uuid.
+    """
+
+    dependencies = [
+        ('authentication', '0002_initial'),
+    ]
+
+    operations = [
+        *(
+            migrations.AddField(
+                model_name=model_name,
+                name='uuid',
+                field=models.UUIDField(null=True),
+            )
+            for model_name in REQUEST_MODELS
+        ),
+        migrations.RunPython(populate_uuids, migrations.RunPython.noop),
+        *(
+            migrations.AlterField(
+                model_name=model_name,
+                name='uuid',
+                field=models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False),
+            )
+            for model_name in REQUEST_MODELS
+        ),
+        *(
+            migrations.RemoveField(
+                model_name=model_name,
+                name='id',
+            )
+            for model_name in REQUEST_MODELS
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:37
+
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    for model_name in ('userverificationrequest', 'userforgetpasswordrequest'):
+        model = apps.get_model('authentication', model_name)
+        model.objects.exclude(email=Lower('email')).update(email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_uuid_primary_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='userverificationrequest',
+            index=models.Index(fields=['email'], name='auth_verification_email_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:10
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F
+
+LIFETIME_SETTINGS = {
+    'userverificationrequest': 'VERIFICATION_REQUEST_LIFETIME_HOURS',
+    'userforgetpasswordrequest': 'FORGET_PASSWORD_REQUEST_LIFETIME_HOURS',
+}
+
+
+def set_expires_at(apps, schema_editor):
+    for model_name, setting in LIFETIME_SETTINGS.items():
+        model = apps.get_model('authentication', model_name)
+        lifetime = timedelta(hours=getattr(settings, setting))
+        model.objects.filter(expires_at__isnull=True).update(
+            expires_at=ExpressionWrapper(F('created_at') + lifetime, output_field=models.DateTimeField())
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_verification_email_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userforgetpasswordrequest',
+            name='expires_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Expires at'),
+        ),
+        migrations.AddField(
+            model_name='userverificationrequest',
+            name='expires_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Expires at'),
+        ),
+        migrations.RunPython(set_expires_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='userforgetpasswordrequest',
+            name='expires_at',
+            field=models.DateTimeField(editable=False, verbose_name='Expires at'),
+        ),
+        migrations.AlterField(
+            model_name='userverificationrequest',
+            name='expires_at',
+            field=models.DateTimeField(editable=False, verbose_name='Expires at'),
+        ),
+        migrations.AddIndex(
+            model_name='userforgetpasswordrequest',
+            index=models.Index(
+                condition=models.Q(('is_active', True), ('used', False)), fields=['code'], name='auth_reset_code_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='userforgetpasswordrequest',
+            index=models.Index(fields=['expires_at'], name='auth_reset_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userverificationrequest',
+            index=models.Index(
+                condition=models.Q(('is_active', True), ('used', False)), fields=['code'],
+                name='auth_verification_code_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='userverificationrequest',
+            index=models.Index(fields=['expires_at'], name='auth_verification_expiry_idx'),
+        ),
+    ]
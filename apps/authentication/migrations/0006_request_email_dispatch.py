@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:43
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_requests_sent(apps, schema_editor):
+    # Requests created before batched dispatch had their email sent by the task that created them.
+    for model_name in ('userverificationrequest', 'userforgetpasswordrequest'):
+        model = apps.get_model('authentication', model_name)
+        model.objects.update(sent_at=F('created_at'), send_attempts=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_request_expiry_code_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userforgetpasswordrequest',
+            name='send_attempts',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Send attempts'),
+        ),
+        migrations.AddField(
+            model_name='userforgetpasswordrequest',
+            name='send_error',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Send error'),
+        ),
+        migrations.AddField(
+            model_name='userforgetpasswordrequest',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Sent at'),
+        ),
+        migrations.AddField(
+            model_name='userverificationrequest',
+            name='send_attempts',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Send attempts'),
+        ),
+        migrations.AddField(
+            model_name='userverificationrequest',
+            name='send_error',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Send error'),
+        ),
+        migrations.AddField(
+            model_name='userverificationrequest',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Sent at'),
+        ),
+        migrations.RunPython(mark_existing_requests_sent, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='userforgetpasswordrequest',
+            index=models.Index(condition=models.Q(('is_active', True), ('sent_at__isnull', True), ('used', False)), fields=['created_at'], name='auth_reset_unsent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userverificationrequest',
+            index=models.Index(condition=models.Q(('is_active', True), ('sent_at__isnull', True), ('used', False)), fields=['created_at'], name='auth_verification_unsent_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-19 20:10
+
+from django.db import migrations
+
+# Periodic task name, task and crontab fields for each task.
+TASKS = (
+    (
+        'Warm token blacklist cache', 'warm_token_blacklist_cache',
+        {'minute': '5', 'hour': '*', 'day_of_week': '*', 'day_of_month': '*', 'month_of_year': '*'},
+    ),
+    (
+        'Purge expired tokens', 'purge_expired_tokens',
+        {'minute': '30', 'hour': '3', 'day_of_week': '*', 'day_of_month': '*', 'month_of_year': '*'},
+    ),
+)
+
+
+def schedule_token_tasks(apps, schema_editor):
+    """
+    Registers the token tasks with the beat database scheduler. Blacklist checks read the
+    database until the cache is warm, so warming runs hourly to recover from a cache flush;
+    expired tokens are purged daily.
+    """
+    CrontabSchedule = apps.get_model('django_celery_beat', 'CrontabSchedule')
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    for name, task, crontab in TASKS:
+        schedule, _created = CrontabSchedule.objects.get_or_create(timezone='UTC', **crontab)
+        PeriodicTask.objects.update_or_create(
+            name=name,
+            defaults={'task': task, 'crontab': schedule, 'enabled': True}
+        )
+
+
+def unschedule_token_tasks(apps, schema_editor):
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    PeriodicTask.objects.filter(task__in=[task for _name, task, _crontab in TASKS]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_request_email_dispatch'),
+        ('django_celery_beat', '0019_alter_periodictasks_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(schedule_token_tasks, unschedule_token_tasks),
+    ]
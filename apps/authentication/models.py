@@ -1,10 +1,14 @@
 import random
+from datetime import timedelta
 
+from django.conf import settings
 from django.core.validators import RegexValidator
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from mixins.model_mixins import BaseModelMixin
+from apps.users.managers import normalize_email
 from apps.users.models import User
 from .utils import create_tracking_code_with_uuid
 
@@ -46,6 +50,30 @@ class UserRequestMixin(BaseModelMixin):
         verbose_name=_('Active?'),
         default=True,
     )
+    expires_at = models.DateTimeField(
+        verbose_name=_('Expires at'),
+        editable=False
+    )
+    sent_at = models.DateTimeField(
+        verbose_name=_('Sent at'),
+        null=True,
+        blank=True,
+        editable=False
+    )
+    send_attempts = models.PositiveSmallIntegerField(
+        verbose_name=_('Send attempts'),
+        default=0,
+        editable=False
+    )
+    send_error = models.TextField(
+        verbose_name=_('Send error'),
+        blank=True,
+        default='',
+        editable=False
+    )
+
+    # Name of the setting holding how many hours a new request stays valid.
+    lifetime_setting = None
 
     @property
     def user_email(self):
@@ -54,14 +82,73 @@ class UserRequestMixin(BaseModelMixin):
     class Meta:
         abstract = True
 
+    def save(self, *args, **kwargs):
+        if self.email is not None:
+            self.email = normalize_email(self.email)
+        if self.expires_at is None:
+            self.expires_at = timezone.now() + self.get_lifetime()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def get_lifetime(cls):
+        return timedelta(hours=getattr(settings, cls.lifetime_setting))
+
+    @classmethod
+    def pending(cls):
+        """
+        Requests whose code can still be confirmed, served by the partial index on `code`.
+        """
+        return cls.objects.filter(is_active=True, used=False, expires_at__gt=timezone.now())
+
+    @classmethod
+    def unsent(cls):
+        """
+        Pending requests whose email still has to go out, oldest first.
+        """
+        return cls.pending().filter(
+            sent_at__isnull=True, send_attempts__lt=settings.MAIL_DISPATCH_MAX_ATTEMPTS
+        ).order_by('created_at')
+
+    @classmethod
+    def stale(cls):
+        """
+        Used or expired requests, which `purge_stale_user_requests` deletes.
+        """
+        return cls.objects.filter(models.Q(used=True) | models.Q(expires_at__lte=timezone.now()))
+
 
 class UserVerificationRequest(UserRequestMixin):
+    lifetime_setting = 'VERIFICATION_REQUEST_LIFETIME_HOURS'
+
     class Meta:
         verbose_name = _('User Verification Request')
         verbose_name_plural = _('Users Verification Requests')
+        indexes = [
+            models.Index(fields=['email'], name='auth_verification_email_idx'),
+            models.Index(
+                fields=['code'], condition=models.Q(is_active=True, used=False), name='auth_verification_code_idx'
+            ),
+            models.Index(fields=['expires_at'], name='auth_verification_expiry_idx'),
+            models.Index(
+                fields=['created_at'], condition=models.Q(is_active=True, used=False, sent_at__isnull=True),
+                name='auth_verification_unsent_idx'
+            ),
+        ]
 
 
 class UserForgetPasswordRequest(UserRequestMixin):
+    lifetime_setting = 'FORGET_PASSWORD_REQUEST_LIFETIME_HOURS'
+
     class Meta:
         verbose_name = _('User Forget Password Request')
         verbose_name_plural = _('Users Forget Password Requests')
+        indexes = [
+            models.Index(
+                fields=['code'], condition=models.Q(is_active=True, used=False), name='auth_reset_code_idx'
+            ),
+            models.Index(fields=['expires_at'], name='auth_reset_expiry_idx'),
+            models.Index(
+                fields=['created_at'], condition=models.Q(is_active=True, used=False, sent_at__isnull=True),
+                name='auth_reset_unsent_idx'
+            ),
+        ]
@@ -1,27 +1,116 @@
-from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+from django.utils.translation import gettext as _
 
-from apps.authentication.models import UserVerificationRequest
+from apps.authentication.models import UserForgetPasswordRequest, UserVerificationRequest
+from apps.users.models import User
 
 
 class AuthenticationService(object):
     @staticmethod
     def is_verified(email):
-        verification = UserVerificationRequest.objects.filter(email__icontains=email, used=True,
-                                                              is_active=False).order_by('-created_at').first()
-        return verification is not None
+        return User.objects.filter_by_email(email).filter(email_verified_at__isnull=False).exists()
 
     @staticmethod
     def email_exists(email):
-        return User.objects.filter(email__icontains=email).exists()
+        return User.objects.filter_by_email(email).exists()
 
     @staticmethod
-    def send_verification_email(user, code, email=None):
-        ...
+    def build_verification_email(verification_request):
+        return EmailMessage(
+            subject=_('Verify your email'),
+            body=_('Your verification code is {code}.').format(code=verification_request.code),
+            to=[verification_request.email or verification_request.user.email]
+        )
 
     @staticmethod
     def send_phone_verification_sms(user, code, phone_number):
         ...
 
     @staticmethod
-    def send_forget_password_email(user, code):
-        ...
+    def build_forget_password_email(forget_request):
+        return EmailMessage(
+            subject=_('Reset your password'),
+            body=_('Your password reset code is {code}.').format(code=forget_request.code),
+            to=[forget_request.email or forget_request.user.email]
+        )
+
+
+class MailDispatchService(object):
+    """
+    Sends the emails of pending verification and password reset requests. Each batch
+    shares one connection of the configured email backend, and each message result is
+    stored on its request row.
+    """
+    BUILDERS = (
+        (UserVerificationRequest, AuthenticationService.build_verification_email),
+        (UserForgetPasswordRequest, AuthenticationService.build_forget_password_email),
+    )
+    RESULT_FIELDS = ['sent_at', 'send_attempts', 'send_error']
+
+    @classmethod
+    def dispatch(cls, batch_size):
+        """
+        Sends batches until nothing is left to send. Returns the sent and failed counts.
+        """
+        results = {'sent': 0, 'failed': 0}
+        # Failed requests are retried by the next dispatch, not within this one.
+        failed = set()
+        while True:
+            batch = cls.get_batch(batch_size, failed)
+            if not batch:
+                return results
+            for (request, _build), sent in zip(batch, cls.send_batch(batch)):
+                results['sent' if sent else 'failed'] += 1
+                if not sent:
+                    failed.add(request.pk)
+
+    @classmethod
+    def get_batch(cls, batch_size, exclude=()):
+        batch = []
+        for model, build in cls.BUILDERS:
+            remaining = batch_size - len(batch)
+            if remaining <= 0:
+                break
+            requests = model.unsent().exclude(pk__in=exclude).select_related('user')[:remaining]
+            batch.extend((request, build) for request in requests)
+        return batch
+
+    @classmethod
+    def send_batch(cls, batch):
+        """
+        Sends one message per request over a single connection and records the outcome.
+        Returns whether each message was sent.
+        """
+        outcomes = []
+        try:
+            with get_connection() as connection:
+                for request, build in batch:
+                    outcomes.append(cls.send(connection, request, build))
+        except Exception as exc:
+            # The connection failed to open or close; requests not yet sent share the error.
+            for request, _build in batch[len(outcomes):]:
+                outcomes.append(cls.record(request, error=exc))
+
+        for model, _build in cls.BUILDERS:
+            rows = [request for request, _build in batch if isinstance(request, model)]
+            model.objects.bulk_update(rows, cls.RESULT_FIELDS)
+        return outcomes
+
+    @classmethod
+    def send(cls, connection, request, build):
+        try:
+            connection.send_messages([build(request)])
+        except Exception as exc:
+            return cls.record(request, error=exc)
+        return cls.record(request)
+
+    @staticmethod
+    def record(request, error=None):
+        request.send_attempts += 1
+        if error is None:
+            request.sent_at = timezone.now()
+            request.send_error = ''
+        else:
+            request.send_error = f'{type(error).__name__}: {error}'
+        return error is None
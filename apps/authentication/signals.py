@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.authentication.cache import user_cache
+from apps.users.models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Invalidating before the commit would let a concurrent request cache the old row again.
+    user_pk = instance.pk
+    transaction.on_commit(lambda: user_cache.invalidate(user_pk))
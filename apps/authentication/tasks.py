@@ -1,27 +1,65 @@
 import logging
+from itertools import islice
+
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 
 from apps.authentication.models import UserVerificationRequest, UserForgetPasswordRequest
-from apps.authentication.services import AuthenticationService
+from apps.authentication.services import MailDispatchService
+from apps.authentication.tokens import BLACKLIST_WARM_KEY, cache_blacklisted_jtis
 from apps.users.models import User
+from utils.db import delete_in_batches
 
 logger = logging.getLogger(__name__)
 
 
+MAIL_DISPATCH_SCHEDULED_KEY = 'mail-dispatch:scheduled'
+MAIL_DISPATCH_LOCK_KEY = 'mail-dispatch:lock'
+
+
+def queue_request_email(model, user, **lookup):
+    """
+    Makes sure `user` has a pending request of `model` whose email is waiting to go out,
+    and schedules a dispatch. An already sent pending request is sent again.
+    """
+    request, created = model.objects.get_or_create(
+        user=user,
+        used=False,
+        is_active=True,
+        expires_at__gt=timezone.now(),
+        **lookup
+    )
+    if not created and request.sent_at is not None:
+        request.sent_at = None
+        request.send_attempts = 0
+        request.send_error = ''
+        request.save(update_fields=['sent_at', 'send_attempts', 'send_error', 'updated_at'])
+    schedule_email_dispatch()
+    return request
+
+
+def schedule_email_dispatch():
+    """
+    Debounces dispatch: only the first email queued in a window schedules the task, which
+    then sends everything queued up to its start.
+    """
+    # The marker outlives the countdown so a lost task does not block dispatch for long.
+    if cache.add(MAIL_DISPATCH_SCHEDULED_KEY, 1, settings.MAIL_DISPATCH_DELAY + 60):
+        dispatch_pending_emails.apply_async(countdown=settings.MAIL_DISPATCH_DELAY)
+
+
 @shared_task(bind=True, name='send_account_verification_email')
 def send_account_verification_email(self, user_id, email=None, code=None):
     try:
         user = User.objects.get(pk=user_id)
         if email is None:
             email = user.email
-        verification_request, _created = UserVerificationRequest.objects.get_or_create(
-            user=user,
-            email=email,
-            used=False,
-            is_active=True,
-            defaults={'code': code}
+        queue_request_email(
+            UserVerificationRequest, user, email=email, defaults={'code': code} if code else {}
         )
-        AuthenticationService.send_verification_email(user, verification_request.code, email)
     except User.DoesNotExist:
         logger.error(f'User with pk {user_id} does not exist')
 
@@ -30,12 +68,66 @@ def send_account_verification_email(self, user_id, email=None, code=None):
 def send_forget_password_email(self, user_id):
     try:
         user = User.objects.get(pk=user_id)
-        forget_request, _created = UserForgetPasswordRequest.objects.get_or_create(
-            user=user,
-            email=user.email,
-            used=False,
-            is_active=True
-        )
-        AuthenticationService.send_forget_password_email(user, forget_request.code)
+        queue_request_email(UserForgetPasswordRequest, user, email=user.email)
     except User.DoesNotExist:
         logger.error(f'User with pk {user_id} does not exist')
+
+
+@shared_task(bind=True, name='dispatch_pending_emails')
+def dispatch_pending_emails(self, batch_size=None):
+    """
+    Sends every pending verification and password reset email in batches. Also safe to
+    run periodically, to retry failed messages.
+    """
+    cache.delete(MAIL_DISPATCH_SCHEDULED_KEY)
+    if not cache.add(MAIL_DISPATCH_LOCK_KEY, 1, settings.EMAIL_TIMEOUT * 10):
+        # Another worker is dispatching; it will pick up what was queued.
+        return None
+    try:
+        results = MailDispatchService.dispatch(batch_size or settings.MAIL_DISPATCH_BATCH_SIZE)
+    finally:
+        cache.delete(MAIL_DISPATCH_LOCK_KEY)
+    logger.info(f'Dispatched emails: {results}')
+    return results
+
+
+@shared_task(bind=True, name='purge_expired_tokens')
+def purge_expired_tokens(self, batch_size=5000):
+    """
+    Deletes expired outstanding tokens and their blacklist entries in batches,
+    so the purge never holds long locks on the token tables.
+    """
+    # Blacklist entries go with their outstanding token through the cascade.
+    purged = delete_in_batches(OutstandingToken.objects.filter(expires_at__lt=timezone.now()), batch_size)
+    logger.info(f'Purged {purged} expired tokens')
+    return purged
+
+
+@shared_task(bind=True, name='purge_stale_user_requests')
+def purge_stale_user_requests(self, batch_size=5000):
+    """
+    Deletes used and expired verification and password reset requests in batches.
+    Verification state lives on `User.email_verified_at`, so nothing depends on old requests.
+    """
+    purged = {}
+    for model in (UserVerificationRequest, UserForgetPasswordRequest):
+        purged[model._meta.model_name] = delete_in_batches(model.stale(), batch_size)
+    logger.info(f'Purged stale user requests: {purged}')
+    return purged
+
+
+@shared_task(bind=True, name='warm_token_blacklist_cache')
+def warm_token_blacklist_cache(self, chunk_size=5000):
+    """
+    Loads every unexpired blacklisted JTI into the cache, then marks the cache as warm
+    so blacklist checks stop reaching the database.
+    """
+    entries = BlacklistedToken.objects.filter(
+        token__expires_at__gt=timezone.now()
+    ).values_list('token__jti', 'token__expires_at').iterator(chunk_size=chunk_size)
+    loaded = 0
+    while chunk := list(islice(entries, chunk_size)):
+        cache_blacklisted_jtis(chunk)
+        loaded += len(chunk)
+    cache.set(BLACKLIST_WARM_KEY, 1, timeout=None)
+    return loaded
@@ -0,0 +1,345 @@
+from datetime import timedelta
+from smtplib import SMTPRecipientsRefused
+from unittest import skipUnless
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django_celery_beat.models import PeriodicTask
+from rest_framework import exceptions
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.authentication.api.serializers import (
+    ForgetPasswordSerializer, LifeTimeTokenObtainSerializer, RegisterSerializer
+)
+from apps.authentication.api.throttles import LoginThrottle
+from apps.authentication.authentications import CustomAuthentication
+from apps.authentication.cache import UserCache, user_cache
+from apps.authentication.models import UserForgetPasswordRequest, UserVerificationRequest
+from apps.authentication.services import AuthenticationService
+from apps.authentication.tasks import (
+    MAIL_DISPATCH_SCHEDULED_KEY, dispatch_pending_emails, purge_expired_tokens, purge_stale_user_requests,
+    send_account_verification_email, warm_token_blacklist_cache
+)
+from apps.authentication.tokens import CachedBlacklistRefreshToken
+from apps.users.models import User
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(username="cached", email="cached@example.com", password="testpass")
+        self.request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_authentication_hits_cache(self):
+        user, _ = CustomAuthentication().authenticate(self.request)
+        self.assertEqual(user, self.user)
+        with self.assertNumQueries(0):
+            user, _ = CustomAuthentication().authenticate(self.request)
+        self.assertEqual(user, self.user)
+        self.assertGreaterEqual(user_cache.stats()["hits"], 1)
+
+    def test_save_invalidates_and_inactive_users_are_rejected(self):
+        CustomAuthentication().authenticate(self.request)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            CustomAuthentication().authenticate(self.request)
+        self.assertEqual(user_cache.stats()["size"], 0)
+
+    def test_invalidated_once_the_write_commits(self):
+        CustomAuthentication().authenticate(self.request)
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                self.user.is_active = False
+                self.user.save()
+                self.assertEqual(user_cache.stats()["size"], 1)
+        # Still cached until the commit, so no request can cache the old row after it.
+        self.assertEqual(user_cache.stats()["size"], 1)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(user_cache.stats()["size"], 0)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            CustomAuthentication().authenticate(self.request)
+
+    def test_local_tier_is_bounded(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="testpass")
+        cache = UserCache(max_size=1, ttl=60)
+        cache.get(self.user.pk)
+        cache.get(other.pk)
+        stats = cache.stats()
+        self.assertEqual((stats["size"], stats["evictions"], stats["loads"]), (1, 1, 2))
+
+    def test_shared_tier_invalidates_other_processes(self):
+        worker_a, worker_b = UserCache(max_size=10, ttl=60, shared=True), UserCache(max_size=10, ttl=60, shared=True)
+        worker_a.get(self.user.pk)
+        with self.assertNumQueries(0):
+            worker_b.get(self.user.pk)
+        self.assertEqual(worker_b.stats()["shared_hits"], 1)
+
+        worker_b.invalidate(self.user.pk)
+        with self.assertNumQueries(1):
+            worker_a.get(self.user.pk)
+
+
+class TokenBlacklistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="tokens", email="tokens@example.com", password="testpass")
+
+    def test_refresh_rotation_blacklists_old_token(self):
+        refresh = CachedBlacklistRefreshToken.for_user(self.user)
+        response = self.client.post(reverse("token_refresh"), {"refresh": str(refresh)})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("refresh", response.data)
+        response = self.client.post(reverse("token_refresh"), {"refresh": str(refresh)})
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(JWT_BLACKLIST_CACHE_ENABLED=True)
+    def test_warm_cache_answers_blacklist_checks(self):
+        revoked = CachedBlacklistRefreshToken.for_user(self.user)
+        revoked.blacklist()
+        live = CachedBlacklistRefreshToken.for_user(self.user)
+        self.assertEqual(warm_token_blacklist_cache(), 1)
+        with self.assertNumQueries(0):
+            with self.assertRaises(TokenError):
+                CachedBlacklistRefreshToken(str(revoked))
+            CachedBlacklistRefreshToken(str(live))
+
+    @override_settings(JWT_BLACKLIST_CACHE_ENABLED=True)
+    def test_cold_cache_falls_back_to_database(self):
+        revoked = CachedBlacklistRefreshToken.for_user(self.user)
+        revoked.blacklist()
+        cache.clear()
+        with self.assertRaises(TokenError):
+            CachedBlacklistRefreshToken(str(revoked))
+
+    def test_purge_expired_tokens(self):
+        expired_at = timezone.now() - timedelta(days=1)
+        for jti in ("expired-1", "expired-2"):
+            token = OutstandingToken.objects.create(user=self.user, jti=jti, token=jti, expires_at=expired_at)
+            BlacklistedToken.objects.create(token=token)
+        live = CachedBlacklistRefreshToken.for_user(self.user)
+
+        self.assertEqual(purge_expired_tokens(batch_size=1), 2)
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), [live["jti"]])
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    def test_token_tasks_are_scheduled(self):
+        scheduled = PeriodicTask.objects.filter(enabled=True).values_list("task", flat=True)
+        self.assertIn("warm_token_blacklist_cache", scheduled)
+        self.assertIn("purge_expired_tokens", scheduled)
+
+
+class EmailNormalizationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="bob", email=" Bob@Example.COM ", password="testpass")
+
+    def test_emails_are_stored_normalized(self):
+        self.assertEqual(self.user.email, "bob@example.com")
+        self.assertEqual(User.objects.get_by_natural_key("BOB@example.com"), self.user)
+        UserVerificationRequest.objects.create(user=self.user, email="Bob@Example.com")
+        self.assertTrue(UserVerificationRequest.objects.filter(email="bob@example.com").exists())
+
+    def test_lookups_are_exact_matches(self):
+        self.assertTrue(AuthenticationService.email_exists("BOB@example.com"))
+        self.assertFalse(AuthenticationService.email_exists("ob@example.com"))
+        with CaptureQueriesContext(connection) as queries:
+            AuthenticationService.email_exists("bob@example.com")
+        self.assertNotIn("LIKE", queries[0]["sql"])
+
+    def test_serializers_use_normalized_email(self):
+        serializer = RegisterSerializer(data={
+            "first_name": "Bob",
+            "last_name": "Smith",
+            "email": "BOB@example.com",
+            "phone_number": "+12345678901",
+            "password": "a-Long-passw0rd",
+            "confirm_password": "a-Long-passw0rd",
+            "gender": User.GenderChoices.MALE
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("email", serializer.errors)
+
+        self.user.email_verified_at = timezone.now()
+        self.user.save()
+        serializer = ForgetPasswordSerializer(data={"email": "Bob@Example.com"})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data["email"], "bob@example.com")
+
+
+class EmailVerificationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="verify", email="verify@example.com", password="testpass")
+        self.verification = UserVerificationRequest.objects.create(user=self.user, email=self.user.email)
+        self.credentials = {"email": "Verify@example.com", "password": "testpass"}
+
+    def test_unverified_login_is_rejected(self):
+        serializer = LifeTimeTokenObtainSerializer(data=self.credentials, context={"request": None})
+        with self.assertRaises(exceptions.PermissionDenied):
+            serializer.is_valid()
+
+    def test_confirmed_user_logs_in_without_verification_queries(self):
+        response = self.client.post(reverse("verification-confirm", args=[self.verification.code]))
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.email_verified_at)
+        self.assertTrue(AuthenticationService.is_verified("VERIFY@example.com"))
+
+        serializer = LifeTimeTokenObtainSerializer(data=self.credentials, context={"request": None})
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertIn("refresh", serializer.validated_data)
+        self.assertFalse(any(UserVerificationRequest._meta.db_table in query["sql"] for query in queries))
+
+
+class UserRequestExpiryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="expiry", email="expiry@example.com", password="testpass")
+
+    def test_requests_expire(self):
+        verification = UserVerificationRequest.objects.create(user=self.user, email=self.user.email)
+        self.assertAlmostEqual(
+            verification.expires_at - verification.created_at, UserVerificationRequest.get_lifetime(),
+            delta=timedelta(seconds=1)
+        )
+        UserVerificationRequest.objects.filter(pk=verification.pk).update(expires_at=timezone.now())
+
+        response = self.client.post(reverse("verification-confirm", args=[verification.code]))
+        self.assertEqual(response.status_code, 404)
+
+    @skipUnless(connection.vendor in ("postgresql", "sqlite"), "Needs partial index support.")
+    def test_code_lookup_uses_partial_index(self):
+        if connection.vendor == "postgresql":
+            # A handful of rows is cheaper to scan, so the planner has to be kept off seq scans.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = UserVerificationRequest.pending().filter(code="abc").explain()
+        self.assertIn("auth_verification_code_idx", plan)
+
+    def test_reset_codes_are_single_use(self):
+        reset = UserForgetPasswordRequest.objects.create(user=self.user, email=self.user.email)
+        url = reverse("forget-password-confirm", args=[reset.code])
+        data = {"password": "a-Long-passw0rd", "confirm_password": "a-Long-passw0rd"}
+        self.assertEqual(self.client.post(url, data).status_code, 200)
+        self.assertEqual(self.client.post(url, data).status_code, 404)
+
+    def test_purge_stale_user_requests(self):
+        pending = UserVerificationRequest.objects.create(user=self.user, email=self.user.email)
+        UserVerificationRequest.objects.create(user=self.user, email=self.user.email, used=True, is_active=False)
+        UserVerificationRequest.objects.create(
+            user=self.user, email=self.user.email, expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        UserForgetPasswordRequest.objects.create(user=self.user, email=self.user.email, used=True)
+
+        purged = purge_stale_user_requests(batch_size=1)
+        self.assertEqual(purged, {"userverificationrequest": 2, "userforgetpasswordrequest": 1})
+        self.assertEqual(list(UserVerificationRequest.objects.all()), [pending])
+        self.assertFalse(UserForgetPasswordRequest.objects.exists())
+
+
+class CountingEmailBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if "bounce@example.com" in message.to:
+                raise SMTPRecipientsRefused({"bounce@example.com": (550, b"No such user")})
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND=f"{__name__}.CountingEmailBackend")
+class MailDispatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        CountingEmailBackend.opened = 0
+        self.users = [
+            User.objects.create_user(username=f"mail{index}", email=f"mail{index}@example.com", password="testpass")
+            for index in range(3)
+        ]
+
+    def test_batches_share_one_connection(self):
+        for user in self.users:
+            UserVerificationRequest.objects.create(user=user, email=user.email)
+        UserForgetPasswordRequest.objects.create(user=self.users[0], email=self.users[0].email)
+        bounced = UserVerificationRequest.objects.create(user=self.users[1], email="bounce@example.com")
+
+        self.assertEqual(dispatch_pending_emails(batch_size=3), {"sent": 4, "failed": 1})
+        self.assertEqual(CountingEmailBackend.opened, 2)
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(UserVerificationRequest.objects.filter(sent_at__isnull=False).count(), 3)
+        self.assertTrue(UserForgetPasswordRequest.objects.get().sent_at)
+
+        bounced.refresh_from_db()
+        self.assertIsNone(bounced.sent_at)
+        self.assertEqual(bounced.send_attempts, 1)
+        self.assertIn("SMTPRecipientsRefused", bounced.send_error)
+
+        with override_settings(MAIL_DISPATCH_MAX_ATTEMPTS=1):
+            self.assertEqual(dispatch_pending_emails(), {"sent": 0, "failed": 0})
+
+    def test_resend_queues_the_pending_request_again(self):
+        # A dispatch is already scheduled, so queueing does not reach the broker.
+        user = self.users[0]
+        cache.set(MAIL_DISPATCH_SCHEDULED_KEY, 1)
+        send_account_verification_email(user.pk)
+        dispatch_pending_emails()
+        cache.set(MAIL_DISPATCH_SCHEDULED_KEY, 1)
+        send_account_verification_email(user.pk)
+
+        request = UserVerificationRequest.objects.get()
+        self.assertIsNone(request.sent_at)
+        dispatch_pending_emails()
+        self.assertEqual([message.body for message in mail.outbox], [f"Your verification code is {request.code}."] * 2)
+
+
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.request = APIRequestFactory().post("/")
+        self.request.user = AnonymousUser()
+
+    def make_throttle(self, now):
+        throttle = LoginThrottle()
+        throttle.rate = "3/min"
+        throttle.num_requests, throttle.duration = throttle.parse_rate(throttle.rate)
+        throttle.timer = lambda: now
+        return throttle
+
+    def test_previous_window_is_weighted(self):
+        start = 600 * 60
+        for _ in range(3):
+            self.assertTrue(self.make_throttle(start).allow_request(self.request, None))
+        throttle = self.make_throttle(start + 30)
+        self.assertFalse(throttle.allow_request(self.request, None))
+        self.assertEqual(throttle.wait(), 30 + 60 * (1 - 3 / 4))
+
+        # Half of the previous window (4 requests) still counts 30 seconds into the next one.
+        self.assertTrue(self.make_throttle(start + 90).allow_request(self.request, None))
+        throttle = self.make_throttle(start + 90)
+        self.assertFalse(throttle.allow_request(self.request, None))
+        self.assertEqual(throttle.wait(), 15)
+        self.assertTrue(self.make_throttle(start + 120).allow_request(self.request, None))
+
+    def test_login_endpoint_is_throttled(self):
+        url = reverse("token")
+        credentials = {"email": "nobody@example.com", "password": "wrong"}
+        statuses = [self.client.post(url, credentials).status_code for _ in range(11)]
+        self.assertNotIn(429, statuses[:10])
+        self.assertEqual(statuses[10], 429)
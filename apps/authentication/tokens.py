@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+BLACKLIST_KEY = 'jwt-blacklist:{jti}'
+BLACKLIST_WARM_KEY = 'jwt-blacklist:warm'
+
+
+def cache_blacklisted_jtis(entries):
+    """
+    Adds `(jti, expires_at)` pairs to the cached blacklist. Each entry expires with its token.
+    """
+    now = timezone.now()
+    by_timeout = {}
+    for jti, expires_at in entries:
+        timeout = int((expires_at - now).total_seconds()) + 1
+        if timeout > 0:
+            by_timeout.setdefault(timeout, {})[BLACKLIST_KEY.format(jti=jti)] = 1
+    for timeout, values in by_timeout.items():
+        cache.set_many(values, timeout)
+
+
+def is_jti_blacklisted(jti):
+    """
+    Answers from the cache once `warm_token_blacklist_cache` has loaded every live
+    blacklisted JTI into it, and from the database until then.
+    """
+    if settings.JWT_BLACKLIST_CACHE_ENABLED and cache.get(BLACKLIST_WARM_KEY):
+        return cache.get(BLACKLIST_KEY.format(jti=jti)) is not None
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist check is served by the cached JTI set.
+    Blacklisting still writes the outstanding/blacklisted rows, which stay the source of truth.
+    """
+
+    def check_blacklist(self):
+        if is_jti_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        expires_at = datetime_from_epoch(self.payload['exp'])
+        user_id = get_user_model().unordered.filter(
+            **{api_settings.USER_ID_FIELD: self.payload.get(api_settings.USER_ID_CLAIM)}
+        ).values_list('pk', flat=True).first()
+        token, _created = OutstandingToken.objects.get_or_create(
+            jti=jti,
+            defaults={
+                'user_id': user_id,
+                'created_at': self.current_time,
+                'token': str(self),
+                'expires_at': expires_at,
+            }
+        )
+        blacklisted = BlacklistedToken.objects.get_or_create(token=token)
+        cache_blacklisted_jtis([(jti, expires_at)])
+        return blacklisted
@@ -0,0 +1,13 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from apps.payments.services import TransactionExportService
+
+
+class TransactionExportSerializer(serializers.Serializer):
+    __doc__ = _("""
+               Transaction export parameters. `month` is `YYYY-MM` in the brand's timezone.
+           """)
+    brand = serializers.UUIDField()
+    month = serializers.DateField(input_formats=['%Y-%m'])
+    export_format = serializers.ChoiceField(choices=tuple(TransactionExportService.FORMATS), default='ndjson')
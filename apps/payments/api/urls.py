@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import TransactionExportAPIView
+
+urlpatterns = [
+    path('transactions/export/', TransactionExportAPIView.as_view(), name='transactions-export-api'),
+]
@@ -0,0 +1,41 @@
+from django.db import router
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.translation import gettext_lazy as _
+from rest_framework import generics
+from rest_framework.permissions import IsAuthenticated
+
+from apps.ads.models import Brand
+from apps.authentication.authentications import CustomAuthentication
+from apps.payments.api.serializers import TransactionExportSerializer
+from apps.payments.models import Transaction
+from apps.payments.services import TransactionExportService
+from mixins.view_mixins import ReplicaReadMixin
+
+
+class TransactionExportAPIView(ReplicaReadMixin, generics.GenericAPIView):
+    __doc__ = _("""
+    API endpoint streaming a brand's transactions for a month as NDJSON or CSV.
+    """)
+    serializer_class = TransactionExportSerializer
+    authentication_classes = (CustomAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    pagination_class = None
+    replica_actions = None
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        brand = get_object_or_404(Brand, pk=params['brand'], owner=request.user)
+
+        export_format = params['export_format']
+        # The rows are read while the response streams, after the routing of the request ends.
+        using = router.db_for_read(Transaction)
+        response = StreamingHttpResponse(
+            TransactionExportService.export(brand, params['month'], export_format, using=using),
+            content_type=TransactionExportService.FORMATS[export_format]
+        )
+        filename = f'transactions-{brand.pk}-{params["month"]:%Y-%m}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
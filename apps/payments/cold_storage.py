@@ -0,0 +1,216 @@
+"""
+Columnar files for archived transactions.
+
+A file holds the rows of one UTC month, sorted by brand and `created_at`, in row groups.
+Each column of a row group is a fixed-width array compressed with zlib. A JSON footer
+lists where every block sits, with the brand and `created_at` bounds of each row group,
+so readers skip the groups a query cannot match. Files are opened with `mmap` and a
+block is only read and decompressed when its row group is scanned.
+
+    [MAGIC] [blocks ...] [footer JSON] [footer length: uint32 LE] [MAGIC]
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import uuid
+import zlib
+from array import array
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+MAGIC = b'ADTXCOL1'
+VERSION = 1
+ROW_GROUP_SIZE = 65536
+AMOUNT_SCALE = 4
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+NULL_UUID = bytes(16)
+
+# Column name to encoding. `choice` columns store a 1-based index into the footer
+# dictionary of the column, 0 being null.
+COLUMNS = (
+    ('uuid', 'uuid'),
+    ('created_at', 'timestamp'),
+    ('brand_id', 'uuid'),
+    ('campaign_id', 'uuid'),
+    ('ad_id', 'uuid'),
+    ('transaction_type', 'choice'),
+    ('cost_type', 'choice'),
+    ('amount', 'decimal'),
+)
+FIELDS = tuple(name for name, _kind in COLUMNS)
+
+
+def _to_micros(value):
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def _pack(typecode, values):
+    packed = array(typecode, values)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(typecode, raw):
+    unpacked = array(typecode)
+    unpacked.frombytes(raw)
+    if sys.byteorder == 'big':
+        unpacked.byteswap()
+    return unpacked
+
+
+def _encode(kind, values, dictionary):
+    if kind == 'uuid':
+        return b''.join(value.bytes if value is not None else NULL_UUID for value in values)
+    if kind == 'timestamp':
+        return _pack('q', (_to_micros(value) for value in values))
+    if kind == 'decimal':
+        return _pack('q', (int(value.scaleb(AMOUNT_SCALE)) for value in values))
+    return _pack('B', (dictionary.index(value) + 1 if value is not None else 0 for value in values))
+
+
+def _decode(kind, raw, dictionary):
+    if kind == 'uuid':
+        return [
+            uuid.UUID(bytes=raw[offset:offset + 16]) if raw[offset:offset + 16] != NULL_UUID else None
+            for offset in range(0, len(raw), 16)
+        ]
+    if kind == 'timestamp':
+        return [_from_micros(value) for value in _unpack('q', raw)]
+    if kind == 'decimal':
+        return [Decimal(value).scaleb(-AMOUNT_SCALE) for value in _unpack('q', raw)]
+    return [dictionary[value - 1] if value else None for value in _unpack('B', raw)]
+
+
+def write(path, rows, dictionaries, row_group_size=ROW_GROUP_SIZE):
+    """
+    Writes `rows`, tuples of `FIELDS` sorted by brand and `created_at`, to `path`.
+    `dictionaries` maps each choice column to its possible values. The file is written
+    next to `path` and moved into place, so readers never see a partial file.
+    Returns the number of rows written.
+    """
+    footer = {
+        'version': VERSION,
+        'columns': [list(column) for column in COLUMNS],
+        'dictionaries': {name: list(values) for name, values in dictionaries.items()},
+        'amount_scale': AMOUNT_SCALE,
+        'rows': 0,
+        'row_groups': [],
+    }
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as fp:
+        fp.write(MAGIC)
+        group = []
+        for row in rows:
+            group.append(row)
+            if len(group) == row_group_size:
+                footer['row_groups'].append(_write_row_group(fp, group, footer['dictionaries']))
+                group = []
+        if group:
+            footer['row_groups'].append(_write_row_group(fp, group, footer['dictionaries']))
+        footer['rows'] = sum(row_group['rows'] for row_group in footer['row_groups'])
+        encoded_footer = json.dumps(footer, separators=(',', ':')).encode()
+        fp.write(encoded_footer)
+        fp.write(struct.pack('<I', len(encoded_footer)))
+        fp.write(MAGIC)
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(tmp_path, path)
+    return footer['rows']
+
+
+def _write_row_group(fp, rows, dictionaries):
+    blocks = {}
+    for index, (name, kind) in enumerate(COLUMNS):
+        block = zlib.compress(_encode(kind, [row[index] for row in rows], dictionaries.get(name)))
+        blocks[name] = [fp.tell(), len(block)]
+        fp.write(block)
+    created_at = [_to_micros(row[1]) for row in rows]
+    return {
+        'rows': len(rows),
+        'blocks': blocks,
+        'min': {'brand_id': rows[0][2].hex, 'created_at': min(created_at)},
+        'max': {'brand_id': rows[-1][2].hex, 'created_at': max(created_at)},
+    }
+
+
+class ColumnarFile(object):
+    """
+    Memory-mapped reader of a columnar transactions file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC or self._mmap[-len(MAGIC):] != MAGIC:
+            self.close()
+            raise ValueError(f'{path} is not a columnar transactions file.')
+        footer_end = len(self._mmap) - len(MAGIC) - 4
+        (footer_length,) = struct.unpack('<I', self._mmap[footer_end:footer_end + 4])
+        self.footer = json.loads(self._mmap[footer_end - footer_length:footer_end])
+        self.kinds = dict(self.footer['columns'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+
+    @property
+    def rows(self):
+        return self.footer['rows']
+
+    def get_row_groups(self, brand_id=None, start=None, end=None):
+        """
+        Returns the row groups whose bounds may hold rows of `brand_id` in [start, end).
+        """
+        row_groups = self.footer['row_groups']
+        if brand_id is not None:
+            row_groups = [
+                row_group for row_group in row_groups
+                if row_group['min']['brand_id'] <= brand_id.hex <= row_group['max']['brand_id']
+            ]
+        if start is not None:
+            row_groups = [row_group for row_group in row_groups if row_group['max']['created_at'] >= _to_micros(start)]
+        if end is not None:
+            row_groups = [row_group for row_group in row_groups if row_group['min']['created_at'] < _to_micros(end)]
+        return row_groups
+
+    def read_column(self, row_group, name):
+        offset, length = row_group['blocks'][name]
+        with memoryview(self._mmap)[offset:offset + length] as block:
+            raw = zlib.decompress(block)
+        return _decode(self.kinds[name], raw, self.footer['dictionaries'].get(name))
+
+    def scan(self, brand_id=None, start=None, end=None):
+        """
+        Yields the rows of `brand_id` in [start, end) as tuples of `FIELDS`, in file order.
+        Only the brand and `created_at` blocks are read for row groups without a match.
+        """
+        for row_group in self.get_row_groups(brand_id, start, end):
+            brands = self.read_column(row_group, 'brand_id')
+            created_at = self.read_column(row_group, 'created_at')
+            matches = [
+                index for index in range(row_group['rows'])
+                if (brand_id is None or brands[index] == brand_id)
+                and (start is None or created_at[index] >= start)
+                and (end is None or created_at[index] < end)
+            ]
+            if not matches:
+                continue
+            columns = {'brand_id': brands, 'created_at': created_at}
+            for name in FIELDS:
+                if name not in columns:
+                    columns[name] = self.read_column(row_group, name)
+            for index in matches:
+                yield tuple(columns[name][index] for name in FIELDS)
@@ -0,0 +1,36 @@
+import sys
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ads.models import Brand
+from apps.payments.services import TransactionExportService
+from utils.db_router import read_from_replica
+
+
+class Command(BaseCommand):
+    help = "Streams a brand's transactions for a month to a file as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--brand', required=True, help='UUID of the brand.')
+        parser.add_argument('--month', required=True, help='YYYY-MM in the brand timezone.')
+        parser.add_argument('--format', choices=tuple(TransactionExportService.FORMATS), default='ndjson')
+        parser.add_argument('--output', help='Destination file; defaults to stdout.')
+
+    def handle(self, *args, **options):
+        try:
+            brand = Brand.objects.get(pk=options['brand'])
+        except (Brand.DoesNotExist, ValueError):
+            raise CommandError(f'Brand {options["brand"]} does not exist.')
+        try:
+            month = datetime.strptime(options['month'], '%Y-%m').date()
+        except ValueError:
+            raise CommandError('--month must be formatted as YYYY-MM.')
+
+        with read_from_replica():
+            lines = TransactionExportService.export(brand, month, options['format'])
+            if options['output']:
+                with open(options['output'], 'w', newline='') as fp:
+                    fp.writelines(lines)
+            else:
+                sys.stdout.writelines(lines)
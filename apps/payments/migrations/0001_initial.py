@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('ads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Transaction',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the object was created.', verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('amount', models.DecimalField(decimal_places=4, max_digits=10, verbose_name='Amount')),
+                ('transaction_type', models.CharField(choices=[('cost', 'Cost'), ('payment', 'Payment')], max_length=10, verbose_name='Transaction Type')),
+                ('cost_type', models.CharField(blank=True, choices=[('click', 'Click'), ('impression', 'Impression'), ('view', 'View'), ('acquisition', 'Acquisition')], max_length=15, null=True, verbose_name='Cost Type')),
+                ('ad', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='ads.ad', verbose_name='Ad')),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='ads.brand', verbose_name='Brand')),
+                ('campaign', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='ads.campaign', verbose_name='Campaign')),
+            ],
+            options={
+                'verbose_name': 'Transaction',
+                'verbose_name_plural': 'Transactions',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:45
+
+from django.db import migrations, models
+import utils.uuids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaction',
+            name='uuid',
+            field=models.UUIDField(default=utils.uuids.uuid7, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_transaction_time_ordered_uuid'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['brand', 'created_at'], name='payments_tx_brand_created_idx'),
+        ),
+    ]
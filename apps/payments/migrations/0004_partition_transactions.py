@@ -0,0 +1,94 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:30
+
+from datetime import timezone as dt_timezone
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import migrations
+from django.db.migrations.exceptions import IrreversibleError
+from django.utils import timezone
+
+TABLE = 'payments_transaction'
+LEGACY_TABLE = f'{TABLE}_legacy'
+
+
+def partition_transactions(apps, schema_editor):
+    """
+    Turns the transactions table into a table partitioned by `created_at` month (UTC).
+
+    The existing table is attached as the `_legacy` partition holding everything up to the
+    end of the current month, so no row is copied. Its primary key becomes
+    (uuid, created_at), as PostgreSQL requires the partition key in unique constraints.
+    Partitions for the following months are created here and then by the
+    `create_transaction_partitions` task.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s',
+            [TABLE]
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('p', 'f')",
+            [TABLE]
+        )
+        constraints = cursor.fetchall()
+        primary_key = next(name for name, kind, _definition in constraints if kind == 'p')
+
+        # Free the index names for the partitioned table. Attaching matches the renamed
+        # indexes to the new ones by definition.
+        cursor.execute(f'ALTER TABLE {qn(TABLE)} RENAME TO {qn(LEGACY_TABLE)}')
+        cursor.execute(f'ALTER TABLE {qn(LEGACY_TABLE)} DROP CONSTRAINT {qn(primary_key)}')
+        cursor.execute(f'ALTER TABLE {qn(LEGACY_TABLE)} ADD PRIMARY KEY (uuid, created_at)')
+        for name, _definition in indexes:
+            if name != primary_key:
+                cursor.execute(f'ALTER INDEX {qn(name)} RENAME TO {qn(name[:59] + "_old")}')
+
+        cursor.execute(
+            f'CREATE TABLE {qn(TABLE)} (LIKE {qn(LEGACY_TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            'PARTITION BY RANGE (created_at)'
+        )
+        cursor.execute(f'ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(primary_key)} PRIMARY KEY (uuid, created_at)')
+        for name, kind, definition in constraints:
+            if kind == 'f':
+                cursor.execute(f'ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(name)} {definition}')
+        for name, definition in indexes:
+            if name != primary_key:
+                cursor.execute(definition)
+
+        month_start = timezone.now().astimezone(dt_timezone.utc).replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        legacy_end = month_start + relativedelta(months=1)
+        cursor.execute(
+            f'ALTER TABLE {qn(TABLE)} ATTACH PARTITION {qn(LEGACY_TABLE)} '
+            f"FOR VALUES FROM (MINVALUE) TO ('{legacy_end.isoformat()}')"
+        )
+        for months in range(1, settings.PAYMENTS_PARTITION_MONTHS_AHEAD + 1):
+            start = month_start + relativedelta(months=months)
+            end = start + relativedelta(months=1)
+            cursor.execute(
+                f'CREATE TABLE {qn(f"{TABLE}_y{start:%Y}m{start:%m}")} PARTITION OF {qn(TABLE)} '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+
+
+def keep_partitions(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        raise IrreversibleError('The transactions table cannot be turned back into a plain table.')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_transaction_brand_created_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_transactions, keep_partitions),
+    ]
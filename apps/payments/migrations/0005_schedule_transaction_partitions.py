@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-19 18:05
+
+from django.db import migrations
+
+TASK_NAME = 'create_transaction_partitions'
+
+
+def schedule_partition_task(apps, schema_editor):
+    """
+    Registers `create_transaction_partitions` with the beat database scheduler. Inserts into
+    a month without a partition fail, so it runs hourly and a missed run costs nothing.
+    """
+    CrontabSchedule = apps.get_model('django_celery_beat', 'CrontabSchedule')
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    schedule, _created = CrontabSchedule.objects.get_or_create(
+        minute='15', hour='*', day_of_week='*', day_of_month='*', month_of_year='*', timezone='UTC'
+    )
+    PeriodicTask.objects.update_or_create(
+        name='Create transaction partitions',
+        defaults={'task': TASK_NAME, 'crontab': schedule, 'enabled': True}
+    )
+
+
+def unschedule_partition_task(apps, schema_editor):
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    PeriodicTask.objects.filter(task=TASK_NAME).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_partition_transactions'),
+        ('django_celery_beat', '0019_alter_periodictasks_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(schedule_partition_task, unschedule_partition_task),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-19 20:40
+
+from django.db import migrations
+
+TASK_NAME = 'archive_transaction_months'
+
+
+def schedule_archive_task(apps, schema_editor):
+    """
+    Registers `archive_transaction_months` with the beat database scheduler. A month only
+    becomes due once a month, so a daily run off peak hours is enough to catch up after
+    a missed one.
+    """
+    CrontabSchedule = apps.get_model('django_celery_beat', 'CrontabSchedule')
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    schedule, _created = CrontabSchedule.objects.get_or_create(
+        minute='45', hour='2', day_of_week='*', day_of_month='*', month_of_year='*', timezone='UTC'
+    )
+    PeriodicTask.objects.update_or_create(
+        name='Archive transaction months',
+        defaults={'task': TASK_NAME, 'crontab': schedule, 'enabled': True}
+    )
+
+
+def unschedule_archive_task(apps, schema_editor):
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    PeriodicTask.objects.filter(task=TASK_NAME).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_schedule_transaction_partitions'),
+        ('django_celery_beat', '0019_alter_periodictasks_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(schedule_archive_task, unschedule_archive_task),
+    ]
@@ -2,10 +2,10 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 from apps.ads.models import Brand, Campaign, Ad
-from mixins.model_mixins import BaseModelMixin
+from mixins.model_mixins import TimeOrderedUUIDModelMixin
 
 
-class Transaction(BaseModelMixin):
+class Transaction(TimeOrderedUUIDModelMixin):
     class TransactionTypeChoices(models.TextChoices):
         COST = 'cost', _('Cost')
         PAYMENT = 'payment', _('Payment')
@@ -59,6 +59,9 @@ class Transaction(BaseModelMixin):
     class Meta:
         verbose_name = _("Transaction")
         verbose_name_plural = _("Transactions")
+        indexes = [
+            models.Index(fields=['brand', 'created_at'], name='payments_tx_brand_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_transaction_type_display()} - {self.get_cost_type_display()} - {self.amount}"
@@ -0,0 +1,293 @@
+import csv
+import heapq
+import os
+import re
+from datetime import timezone as dt_timezone
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.payments import cold_storage
+from apps.payments.models import Transaction
+from utils.db import delete_in_batches
+
+
+class _EchoBuffer(object):
+    """File-like object whose `write` hands the line back, so csv.writer can feed a generator."""
+
+    def write(self, value):
+        return value
+
+
+class TransactionExportService(object):
+    FIELDS = (
+        'uuid', 'created_at', 'brand_id', 'campaign_id', 'ad_id',
+        'transaction_type', 'cost_type', 'amount'
+    )
+    FORMATS = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+    CHUNK_SIZE = 2000
+
+    @staticmethod
+    def get_month_range(brand, month):
+        """Returns the aware [start, end) bounds of a month in the brand's timezone."""
+        first_day = month.replace(day=1)
+        return brand.get_local_range(first_day, first_day + relativedelta(months=1))
+
+    @classmethod
+    def iter_rows(cls, brand, month, using=None):
+        """
+        Yields the ledger rows of a brand for a month as tuples of `FIELDS`, from the
+        database alias `using` and from archived months. `iterator()` streams them
+        through a server-side cursor on PostgreSQL.
+        """
+        start, end = cls.get_month_range(brand, month)
+        rows = Transaction.objects.db_manager(using).filter(
+            brand=brand,
+            created_at__gte=start,
+            created_at__lt=end
+        ).order_by('created_at', 'uuid').values_list(*cls.FIELDS).iterator(chunk_size=cls.CHUNK_SIZE)
+        archived_rows = TransactionArchiveService.iter_rows(brand.pk, start, end)
+        return heapq.merge(archived_rows, rows, key=lambda row: (row[1], row[0].hex))
+
+    @classmethod
+    def iter_ndjson(cls, rows):
+        encoder = DjangoJSONEncoder()
+        for row in rows:
+            yield encoder.encode(dict(zip(cls.FIELDS, row))) + '\n'
+
+    @classmethod
+    def iter_csv(cls, rows):
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(cls.FIELDS)
+        for row in rows:
+            yield writer.writerow(row)
+
+    @classmethod
+    def export(cls, brand, month, export_format, using=None):
+        """Returns a generator of encoded lines for the given format."""
+        rows = cls.iter_rows(brand, month, using)
+        if export_format == 'csv':
+            return cls.iter_csv(rows)
+        return cls.iter_ndjson(rows)
+
+
+class TransactionPartitionService(object):
+    """
+    Monthly range partitions of the transactions table on PostgreSQL, keyed on `created_at`
+    in UTC. Migration 0004 turns the table into a partitioned one, with the rows that
+    existed then in a single `_legacy` partition. On other databases the table stays
+    plain and nothing here applies.
+    """
+    BOUNDS_RE = re.compile(r"FROM \((?P<start>[^)]+)\) TO \((?P<end>[^)]+)\)")
+
+    @staticmethod
+    def get_table():
+        return Transaction._meta.db_table
+
+    @classmethod
+    def is_partitioned(cls):
+        if connection.vendor != 'postgresql':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass', [cls.get_table()])
+            return cursor.fetchone() is not None
+
+    @staticmethod
+    def get_month_start(value, months=0):
+        """Returns the first UTC instant of the month of `value`, moved by `months`."""
+        value = value.astimezone(dt_timezone.utc)
+        return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0) + relativedelta(months=months)
+
+    @classmethod
+    def get_partition_name(cls, month_start):
+        return f'{cls.get_table()}_y{month_start:%Y}m{month_start:%m}'
+
+    @classmethod
+    def get_partitions(cls):
+        """
+        Returns `(name, start, end)` for every attached partition. An unbounded side is None.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) '
+                'FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+                'WHERE pg_inherits.inhparent = %s::regclass ORDER BY child.relname',
+                [cls.get_table()]
+            )
+            rows = cursor.fetchall()
+        partitions = []
+        for name, bounds in rows:
+            match = cls.BOUNDS_RE.search(bounds)
+            if match is None:
+                # A DEFAULT partition has no range.
+                continue
+            partitions.append((name, cls._parse_bound(match['start']), cls._parse_bound(match['end'])))
+        return partitions
+
+    @staticmethod
+    def _parse_bound(value):
+        if value in ('MINVALUE', 'MAXVALUE'):
+            return None
+        return parse_datetime(value.strip("'"))
+
+    @classmethod
+    def create_partitions(cls, months_ahead):
+        """
+        Creates the partitions of the current month and of the next `months_ahead` months
+        that no attached partition covers yet. Returns the names of the new partitions.
+        """
+        existing = cls.get_partitions()
+        table = connection.ops.quote_name(cls.get_table())
+        created = []
+        with connection.cursor() as cursor:
+            for months in range(months_ahead + 1):
+                start = cls.get_month_start(timezone.now(), months)
+                end = start + relativedelta(months=1)
+                if any((lower is None or lower < end) and (upper is None or upper > start)
+                       for _name, lower, upper in existing):
+                    continue
+                name = cls.get_partition_name(start)
+                cursor.execute(
+                    f'CREATE TABLE {connection.ops.quote_name(name)} PARTITION OF {table} '
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                )
+                created.append(name)
+        return created
+
+    @classmethod
+    def drop_partition(cls, month_start):
+        """
+        Detaches and drops the partition holding exactly the month starting at `month_start`.
+        Returns whether there was one.
+        """
+        name = cls.get_partition_name(month_start)
+        if name not in {partition[0] for partition in cls.get_partitions()}:
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'ALTER TABLE {connection.ops.quote_name(cls.get_table())} '
+                f'DETACH PARTITION {connection.ops.quote_name(name)}'
+            )
+            cursor.execute(f'DROP TABLE {connection.ops.quote_name(name)}')
+        return True
+
+    @classmethod
+    def drop_empty_partitions(cls, retention_months):
+        """
+        Detaches and drops the empty partitions that only cover months older than
+        `retention_months` full months, such as the legacy partition once every month in
+        it was archived. Returns their names.
+        """
+        cutoff = cls.get_month_start(timezone.now(), -retention_months)
+        table = connection.ops.quote_name(cls.get_table())
+        dropped = []
+        with connection.cursor() as cursor:
+            for name, _start, end in cls.get_partitions():
+                if end is None or end > cutoff:
+                    continue
+                cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {connection.ops.quote_name(name)})')
+                if cursor.fetchone()[0]:
+                    continue
+                cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {connection.ops.quote_name(name)}')
+                cursor.execute(f'DROP TABLE {connection.ops.quote_name(name)}')
+                dropped.append(name)
+        return dropped
+
+
+class TransactionArchiveService(object):
+    """
+    Moves closed months of the ledger out of the database into columnar files under
+    PAYMENTS_ARCHIVE_DIR, one per UTC month (see `cold_storage`), and reads them back.
+    Months past the retention period are closed: no transaction is recorded in them anymore.
+    """
+    DICTIONARIES = {
+        'transaction_type': Transaction.TransactionTypeChoices.values,
+        'cost_type': Transaction.CostTypeChoices.values,
+    }
+    CHUNK_SIZE = 5000
+
+    @staticmethod
+    def get_path(month_start):
+        return os.path.join(settings.PAYMENTS_ARCHIVE_DIR, f'transactions-{month_start:%Y-%m}.col')
+
+    @staticmethod
+    def sort_key(row):
+        return row[2].hex, row[1], row[0].hex
+
+    @classmethod
+    def get_months_to_archive(cls, retention_months):
+        """
+        Returns the starts of the UTC months older than `retention_months` full months,
+        from the oldest one that still has rows in the database.
+        """
+        cutoff = TransactionPartitionService.get_month_start(timezone.now(), -retention_months)
+        oldest = Transaction.objects.filter(created_at__lt=cutoff).aggregate(oldest=Min('created_at'))['oldest']
+        months = []
+        month_start = oldest and TransactionPartitionService.get_month_start(oldest)
+        while month_start is not None and month_start < cutoff:
+            months.append(month_start)
+            month_start += relativedelta(months=1)
+        return months
+
+    @classmethod
+    def archive_month(cls, month_start, batch_size):
+        """
+        Writes the rows of a month to its file, merged with the rows already archived
+        there, then removes them from the database. Returns the number of rows in the file.
+        """
+        month_end = month_start + relativedelta(months=1)
+        queryset = Transaction.objects.filter(created_at__gte=month_start, created_at__lt=month_end)
+        if not queryset.exists():
+            return 0
+
+        path = cls.get_path(month_start)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        rows = queryset.order_by('brand_id', 'created_at', 'uuid').values_list(
+            *cold_storage.FIELDS
+        ).iterator(chunk_size=cls.CHUNK_SIZE)
+        if os.path.exists(path):
+            with cold_storage.ColumnarFile(path) as archived:
+                written = cold_storage.write(
+                    path, cls._unique(heapq.merge(archived.scan(), rows, key=cls.sort_key)), cls.DICTIONARIES
+                )
+        else:
+            written = cold_storage.write(path, rows, cls.DICTIONARIES)
+
+        dropped = (
+            TransactionPartitionService.is_partitioned()
+            and TransactionPartitionService.drop_partition(month_start)
+        )
+        if not dropped:
+            delete_in_batches(queryset, batch_size)
+        return written
+
+    @staticmethod
+    def _unique(rows):
+        # A month whose rows were archived but not yet deleted is merged with itself.
+        previous = None
+        for row in rows:
+            if row[0] != previous:
+                yield row
+            previous = row[0]
+
+    @classmethod
+    def iter_rows(cls, brand_id, start, end):
+        """
+        Yields the archived rows of a brand in [start, end) as tuples of `cold_storage.FIELDS`,
+        ordered by `created_at`.
+        """
+        month_start = TransactionPartitionService.get_month_start(start)
+        while month_start < end:
+            path = cls.get_path(month_start)
+            if os.path.exists(path):
+                with cold_storage.ColumnarFile(path) as archived:
+                    yield from archived.scan(brand_id, start, end)
+            month_start += relativedelta(months=1)
@@ -0,0 +1,43 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from apps.payments.services import TransactionArchiveService, TransactionPartitionService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, name='create_transaction_partitions')
+def create_transaction_partitions(self, months_ahead=None):
+    """
+    Creates the monthly transaction partitions ahead of time. Inserts into a month
+    without a partition fail, so migration 0005 schedules this hourly.
+    """
+    if not TransactionPartitionService.is_partitioned():
+        return []
+    if months_ahead is None:
+        months_ahead = settings.PAYMENTS_PARTITION_MONTHS_AHEAD
+    created = TransactionPartitionService.create_partitions(months_ahead)
+    logger.info(f'Created transaction partitions: {created}')
+    return created
+
+
+@shared_task(bind=True, name='archive_transaction_months')
+def archive_transaction_months(self, retention_months=None, batch_size=5000):
+    """
+    Moves the months past the retention period to cold storage files, then drops the
+    partitions they emptied. Migration 0006 schedules this daily.
+    """
+    if retention_months is None:
+        retention_months = settings.PAYMENTS_TRANSACTION_RETENTION_MONTHS
+    archived = {}
+    for month_start in TransactionArchiveService.get_months_to_archive(retention_months):
+        written = TransactionArchiveService.archive_month(month_start, batch_size)
+        if written:
+            archived[f'{month_start:%Y-%m}'] = written
+    dropped = []
+    if TransactionPartitionService.is_partitioned():
+        dropped = TransactionPartitionService.drop_empty_partitions(retention_months)
+    logger.info(f'Archived transaction months: {archived}, dropped partitions: {dropped}')
+    return {'archived': archived, 'dropped_partitions': dropped}
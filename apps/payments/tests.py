@@ -1,10 +1,31 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import re
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from django.utils import timezone
 from decimal import Decimal
 
+from dateutil.relativedelta import relativedelta
+from django_celery_beat.models import PeriodicTask
+from rest_framework.test import APIClient, APITestCase
+
 from apps.users.models import User
 from apps.ads.models import Brand, Campaign, AdSet, Ad
 from apps.payments.models import Transaction
+from apps.payments.services import TransactionArchiveService, TransactionExportService, TransactionPartitionService
+from apps.payments import cold_storage
+from apps.payments.tasks import archive_transaction_months, create_transaction_partitions
 
 
 class PaymentsModelTests(TestCase):
@@ -74,3 +95,280 @@ class PaymentsModelTests(TestCase):
         )
         daily_spend = self.brand.get_daily_spend()
         self.assertEqual(daily_spend, Decimal("12.00"))
+
+    def test_spend_uses_brand_local_day_bounds(self):
+        self.brand.timezone_str = "America/New_York"
+        self.brand.save()
+        day_start, day_end = self.brand.get_local_range(date(2026, 3, 8), date(2026, 3, 9))
+        self.assertEqual(day_start, datetime(2026, 3, 8, 5, tzinfo=dt_timezone.utc))
+        # The DST switch makes this local day 23 hours long.
+        self.assertEqual(day_end - day_start, timedelta(hours=23))
+
+        for created_at in (day_start - timedelta(seconds=1), day_start, day_end - timedelta(seconds=1), day_end):
+            transaction = Transaction.objects.create(
+                brand=self.brand,
+                amount=Decimal("1.00"),
+                transaction_type=Transaction.TransactionTypeChoices.COST
+            )
+            Transaction.objects.filter(pk=transaction.pk).update(created_at=created_at)
+        self.assertEqual(self.brand.get_spend(day_start, day_end), Decimal("2.00"))
+
+    def test_partition_tasks_skip_unpartitioned_tables(self):
+        self.assertEqual(create_transaction_partitions(), [])
+        month_start = TransactionPartitionService.get_month_start(datetime(2026, 12, 31, 23, tzinfo=dt_timezone.utc), 1)
+        self.assertEqual(TransactionPartitionService.get_partition_name(month_start), "payments_transaction_y2027m01")
+
+    def test_transaction_keys_are_time_ordered(self):
+        transactions = [
+            Transaction.objects.create(
+                brand=self.brand,
+                amount=Decimal("1.00"),
+                transaction_type=Transaction.TransactionTypeChoices.PAYMENT
+            )
+            for _ in range(50)
+        ]
+        keys = [transaction.pk for transaction in transactions]
+        self.assertEqual({key.version for key in keys}, {7})
+        self.assertEqual(sorted(keys), keys)
+        self.assertEqual(list(Transaction.objects.order_by("pk").values_list("pk", flat=True)), keys)
+
+
+@skipUnless(connection.vendor == "postgresql", "Transactions are only partitioned on PostgreSQL.")
+class TransactionPartitionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="partitioner")
+        self.brand = Brand.objects.create(
+            name="Partition Brand",
+            daily_budget=Decimal("100.00"),
+            monthly_budget=Decimal("1000.00"),
+            timezone_str="America/Edmonton",
+            owner=self.user
+        )
+
+    @staticmethod
+    def get_month_start(months):
+        return TransactionPartitionService.get_month_start(timezone.now(), months)
+
+    @classmethod
+    def get_partition_name(cls, months):
+        return TransactionPartitionService.get_partition_name(cls.get_month_start(months))
+
+    def create_transaction(self, created_at):
+        transaction = Transaction.objects.create(
+            brand=self.brand,
+            amount=Decimal("1.00"),
+            transaction_type=Transaction.TransactionTypeChoices.COST
+        )
+        Transaction.objects.filter(pk=transaction.pk).update(created_at=created_at)
+
+    def detach_legacy_partition(self):
+        # Frees the months the legacy partition covers, so tests can lay out their own.
+        with connection.cursor() as cursor:
+            cursor.execute("ALTER TABLE payments_transaction DETACH PARTITION payments_transaction_legacy")
+
+    def test_migrated_schema(self):
+        self.assertTrue(TransactionPartitionService.is_partitioned())
+        self.assertEqual(
+            TransactionPartitionService.get_partitions(),
+            [("payments_transaction_legacy", None, self.get_month_start(1))] + [
+                (self.get_partition_name(months), self.get_month_start(months), self.get_month_start(months + 1))
+                for months in range(1, settings.PAYMENTS_PARTITION_MONTHS_AHEAD + 1)
+            ]
+        )
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, "payments_transaction")
+        primary_keys = [constraint["columns"] for constraint in constraints.values() if constraint["primary_key"]]
+        self.assertEqual(primary_keys, [["uuid", "created_at"]])
+
+    def test_create_partitions(self):
+        months_ahead = settings.PAYMENTS_PARTITION_MONTHS_AHEAD
+        self.assertEqual(TransactionPartitionService.create_partitions(months_ahead), [])
+
+        self.detach_legacy_partition()
+        self.assertEqual(
+            TransactionPartitionService.create_partitions(months_ahead + 1),
+            [self.get_partition_name(0), self.get_partition_name(months_ahead + 1)]
+        )
+        self.create_transaction(timezone.now())
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {self.get_partition_name(0)}")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_drop_empty_partitions(self):
+        self.detach_legacy_partition()
+        with connection.cursor() as cursor:
+            for months in (-3, -2, -1):
+                cursor.execute(
+                    f"CREATE TABLE {self.get_partition_name(months)} PARTITION OF payments_transaction "
+                    f"FOR VALUES FROM ('{self.get_month_start(months).isoformat()}') "
+                    f"TO ('{self.get_month_start(months + 1).isoformat()}')"
+                )
+        TransactionPartitionService.create_partitions(0)
+        self.create_transaction(self.get_month_start(-2) + timedelta(days=1))
+
+        # Only empty partitions entirely before the retention cutoff go.
+        self.assertEqual(TransactionPartitionService.drop_empty_partitions(1), [self.get_partition_name(-3)])
+        names = [name for name, _start, _end in TransactionPartitionService.get_partitions()]
+        self.assertNotIn(self.get_partition_name(-3), names)
+        self.assertIn(self.get_partition_name(-2), names)
+        self.assertIn(self.get_partition_name(-1), names)
+
+    def test_spend_scans_at_most_two_partitions(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.brand.get_monthly_spend()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {queries.captured_queries[-1]['sql']}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        # A local month overlaps at most two UTC months; pruning skips the other partitions.
+        scanned = set(re.findall(r" on (payments_transaction_\w+)", plan))
+        self.assertTrue(scanned, plan)
+        self.assertLessEqual(len(scanned), 2, plan)
+
+
+class TransactionExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="exporter", email="exporter@example.com", password="testpass")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.brand = Brand.objects.create(
+            name="Export Brand",
+            daily_budget=Decimal("100.00"),
+            monthly_budget=Decimal("1000.00"),
+            timezone_str="America/Edmonton",
+            owner=self.user
+        )
+        self.campaign = Campaign.objects.create(brand=self.brand, name="Export Campaign")
+        self.adset = AdSet.objects.create(campaign=self.campaign, name="Export AdSet")
+        self.ad = Ad.objects.create(adset=self.adset, name="Export Ad", cost_per_click=Decimal("0.10"))
+        brand_tz = self.brand.get_brand_timezone()
+        for created_at, amount in (
+            (brand_tz.localize(datetime(2024, 3, 1, 0, 30)), Decimal("0.10")),
+            (brand_tz.localize(datetime(2024, 3, 31, 23, 30)), Decimal("0.20")),
+            (brand_tz.localize(datetime(2024, 4, 1, 0, 30)), Decimal("0.40")),
+        ):
+            tx = Transaction.objects.create(
+                brand=self.brand,
+                campaign=self.campaign,
+                ad=self.ad,
+                amount=amount,
+                transaction_type=Transaction.TransactionTypeChoices.COST,
+                cost_type=Transaction.CostTypeChoices.CLICK
+            )
+            Transaction.objects.filter(pk=tx.pk).update(created_at=created_at)
+        self.url = reverse('transactions-export-api')
+
+    def test_ndjson_export_uses_brand_month(self):
+        response = self.client.get(self.url, {'brand': str(self.brand.pk), 'month': '2024-03'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['amount'] for row in rows], ['0.1000', '0.2000'])
+        self.assertEqual(rows[0]['ad_id'], str(self.ad.pk))
+
+    def test_csv_export(self):
+        response = self.client.get(self.url, {'brand': str(self.brand.pk), 'month': '2024-04', 'export_format': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(tuple(rows[0]), TransactionExportService.FIELDS)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][-1], '0.4000')
+
+    def test_export_rejects_other_owners_brand(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="testpass")
+        self.client.force_authenticate(user=other)
+        response = self.client.get(self.url, {'brand': str(self.brand.pk), 'month': '2024-03'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'export.ndjson')
+            call_command(
+                'export_transactions', brand=str(self.brand.pk), month='2024-03', output=output
+            )
+            with open(output) as fp:
+                self.assertEqual(len(fp.readlines()), 2)
+
+
+class TransactionArchiveTests(APITestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.archive_dir.cleanup)
+        overrides = override_settings(PAYMENTS_ARCHIVE_DIR=self.archive_dir.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.user = User.objects.create_user(username="archiver", email="archiver@example.com", password="testpass")
+        self.brands = [
+            Brand.objects.create(
+                name=f"Archive Brand {index}",
+                daily_budget=Decimal("100.00"),
+                monthly_budget=Decimal("1000.00"),
+                owner=self.user
+            )
+            for index in range(2)
+        ]
+        self.old_month = timezone.now().replace(day=15) - relativedelta(years=3)
+        for brand in self.brands:
+            for day in range(1, 4):
+                self.create_transaction(brand, self.old_month.replace(day=day), Transaction.CostTypeChoices.CLICK)
+            self.create_transaction(brand, timezone.now(), None)
+
+    @staticmethod
+    def create_transaction(brand, created_at, cost_type):
+        transaction = Transaction.objects.create(
+            brand=brand,
+            amount=Decimal("1.2345"),
+            transaction_type=Transaction.TransactionTypeChoices.COST,
+            cost_type=cost_type
+        )
+        Transaction.objects.filter(pk=transaction.pk).update(created_at=created_at)
+
+    def test_closed_months_move_to_cold_storage(self):
+        expected = list(TransactionExportService.iter_rows(self.brands[0], self.old_month.date()))
+        self.assertEqual(len(expected), 3)
+
+        result = archive_transaction_months(retention_months=24)
+        self.assertEqual(result["archived"], {f"{self.old_month:%Y-%m}": 6})
+        self.assertEqual(Transaction.objects.count(), 2)
+        self.assertEqual(list(TransactionExportService.iter_rows(self.brands[0], self.old_month.date())), expected)
+
+        # A month archived again is merged with its file.
+        self.create_transaction(self.brands[0], self.old_month.replace(day=4), None)
+        self.assertEqual(archive_transaction_months(retention_months=24)["archived"], {f"{self.old_month:%Y-%m}": 7})
+        self.assertEqual(len(list(TransactionExportService.iter_rows(self.brands[0], self.old_month.date()))), 4)
+
+    def test_task_archives_every_month_past_retention(self):
+        later_months = [self.old_month + relativedelta(months=1), self.old_month + relativedelta(months=3)]
+        for month in later_months:
+            self.create_transaction(self.brands[1], month, Transaction.CostTypeChoices.VIEW)
+        recent = timezone.now() - relativedelta(months=12)
+        self.create_transaction(self.brands[1], recent, Transaction.CostTypeChoices.VIEW)
+
+        result = archive_transaction_months(retention_months=24)
+        # The month in between has no rows, so it gets no file.
+        self.assertEqual(
+            result["archived"],
+            {f"{self.old_month:%Y-%m}": 6, f"{later_months[0]:%Y-%m}": 1, f"{later_months[1]:%Y-%m}": 1}
+        )
+        self.assertEqual(Transaction.objects.count(), 3)
+        for month in later_months:
+            self.assertEqual(len(list(TransactionExportService.iter_rows(self.brands[1], month.date()))), 1)
+        self.assertEqual(archive_transaction_months(retention_months=24)["archived"], {})
+
+    def test_archive_task_is_scheduled(self):
+        self.assertTrue(PeriodicTask.objects.filter(task="archive_transaction_months", enabled=True).exists())
+
+    def test_files_are_pruned_by_row_group_bounds(self):
+        archive_transaction_months(retention_months=24)
+        path = TransactionArchiveService.get_path(TransactionPartitionService.get_month_start(self.old_month))
+        with cold_storage.ColumnarFile(path) as archived:
+            rows = list(archived.scan())
+
+        small_groups = os.path.join(self.archive_dir.name, "small.col")
+        cold_storage.write(small_groups, rows, TransactionArchiveService.DICTIONARIES, row_group_size=3)
+        with cold_storage.ColumnarFile(small_groups) as archived:
+            self.assertEqual(archived.rows, 6)
+            self.assertEqual(len(archived.get_row_groups(brand_id=rows[0][2])), 1)
+            self.assertEqual(list(archived.scan(brand_id=rows[-1][2])), rows[3:])
+            self.assertEqual(list(archived.scan(start=rows[1][1], end=rows[2][1])), [rows[1], rows[4]])
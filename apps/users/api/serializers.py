@@ -1,21 +1,33 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 
+from apps.users.managers import normalize_email
 from apps.users.models import User
 from apps.authentication.tasks import send_account_verification_email
 
 
 class UserSerializer(serializers.ModelSerializer):
+    logo_variants = serializers.SerializerMethodField()
+    logo_processing = serializers.SerializerMethodField()
+
     class Meta:
         model = User
         fields = (
-            'uuid', 'email', 'is_active', 'logo',
+            'uuid', 'email', 'is_active', 'logo', 'logo_variants', 'logo_processing',
             'phone_number', 'first_name', 'last_name',
-            'gender', 'created_at', 'updated_at'
+            'gender', 'email_verified_at', 'created_at', 'updated_at'
         )
-        read_only_fields = ('created_at', 'updated_at', 'is_active')
+        # Logos are uploaded as raw bytes through `UserLogoAPIView`.
+        read_only_fields = ('created_at', 'updated_at', 'is_active', 'email_verified_at', 'logo')
+
+    def get_logo_variants(self, obj):
+        return {name: default_storage.url(storage_name) for name, storage_name in obj.logo_variants.items()}
+
+    def get_logo_processing(self, obj):
+        return bool(obj.logo_pending)
 
     def update(self, instance, validated_data):
-        email = validated_data.pop('email', None)
+        email = normalize_email(validated_data.pop('email', None))
         if email and email != instance.email:
             send_account_verification_email.delay(str(instance.pk), email)
         return super().update(instance, validated_data)
@@ -1,12 +1,13 @@
 from django.urls import path
 from rest_framework import routers
 
-from .views import UserView
+from .views import UserLogoAPIView, UserView
 
 router = routers.DefaultRouter()
 
 urlpatterns = [
     path('', UserView.as_view(), name='user-api'),
+    path('logo/', UserLogoAPIView.as_view(), name='user-logo-api'),
 ]
 
 urlpatterns += router.urls
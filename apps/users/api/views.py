@@ -1,9 +1,12 @@
-from rest_framework import mixins, generics, viewsets
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, mixins, generics, status, viewsets
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 from apps.authentication.authentications import CustomAuthentication
 from apps.users.api.serializers import UserSerializer
 from apps.users.models import User
+from apps.users.services import UserLogoService
 
 
 class UserView(generics.RetrieveUpdateDestroyAPIView):
@@ -20,3 +23,26 @@ class UserView(generics.RetrieveUpdateDestroyAPIView):
     def perform_destroy(self, instance):
         instance.is_active = False
         instance.save()
+
+
+class UserLogoAPIView(generics.GenericAPIView):
+    __doc__ = _("""
+    API endpoint replacing the user's logo. `PUT` the image file as the raw request body with
+    its `image/*` content type. It is resized off-request: the answer is `202 Accepted` while
+    `logo_processing` is true, or `200 OK` when the same image was processed before.
+    """)
+    authentication_classes = (CustomAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    serializer_class = UserSerializer
+
+    def put(self, request, *args, **kwargs):
+        if not request.content_type.startswith('image/'):
+            raise exceptions.UnsupportedMediaType(request.content_type)
+        # A fresh row, as the authenticated user may be shared through the user cache.
+        user = User.unordered.get(pk=request.user.pk)
+        try:
+            processing = UserLogoService.upload(user, request.stream, int(request.META.get('CONTENT_LENGTH') or 0))
+        except ValueError as exc:
+            raise exceptions.ParseError(str(exc))
+        status_code = status.HTTP_202_ACCEPTED if processing else status.HTTP_200_OK
+        return Response(self.get_serializer(user).data, status=status_code)
@@ -0,0 +1,22 @@
+from django.contrib.auth.models import UserManager as DjangoUserManager
+
+
+def normalize_email(email):
+    """
+    Returns the canonical form of an email address: stripped and lowercased.
+    Emails are stored in this form, so every lookup is an exact match on the unique index.
+    """
+    return (email or '').strip().lower()
+
+
+class UserManager(DjangoUserManager):
+    @classmethod
+    def normalize_email(cls, email):
+        return normalize_email(email)
+
+    def get_by_natural_key(self, username):
+        return self.get(**{self.model.USERNAME_FIELD: normalize_email(username)})
+
+    def filter_by_email(self, email):
+        # Emails are unique, so the default ordering would only add a sort.
+        return self.filter(email=normalize_email(email)).order_by()
@@ -0,0 +1,30 @@
+import apps.users.managers
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    for pk, email in User.objects.exclude(email=Lower('email')).values_list('pk', 'email').iterator():
+        normalized = email.strip().lower()
+        # Accounts differing only by case cannot share the unique index; they are left
+        # as they are for a manual merge.
+        if not User.objects.filter(email=normalized).exists():
+            User.objects.filter(pk=pk).update(email=normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', apps.users.managers.UserManager()),
+            ],
+        ),
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+    ]
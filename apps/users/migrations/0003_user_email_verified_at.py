@@ -0,0 +1,31 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_email_verified_at(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    UserVerificationRequest = apps.get_model('authentication', 'UserVerificationRequest')
+    confirmed = UserVerificationRequest.objects.filter(
+        user=OuterRef('pk'),
+        email=OuterRef('email'),
+        used=True,
+        is_active=False
+    ).order_by('-updated_at').values('updated_at')[:1]
+    User.objects.filter(email_verified_at__isnull=True).update(email_verified_at=Subquery(confirmed))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_lowercase_emails'),
+        ('authentication', '0004_verification_email_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='email_verified_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Email verified at'),
+        ),
+        migrations.RunPython(backfill_email_verified_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_users_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='logo_pending',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the uploaded logo that is being processed.', max_length=64, verbose_name='Pending logo'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='logo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Storage name of each downscaled copy of the logo, by variant name.', verbose_name='Logo variants'),
+        ),
+    ]
@@ -4,6 +4,9 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 from mixins.model_mixins import BaseModelMixin, UserInfoModelMixin
+from utils.db import UnorderedManager
+from utils.images import RENDITION_EXTENSION
+from .managers import UserManager, normalize_email
 
 
 def upload_user_image(instance, filename):
@@ -20,6 +23,20 @@ class User(BaseModelMixin, AbstractUser, UserInfoModelMixin):
         null=True,
         blank=True
     )
+    logo_variants = models.JSONField(
+        _('Logo variants'),
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text=_('Storage name of each downscaled copy of the logo, by variant name.')
+    )
+    logo_pending = models.CharField(
+        _('Pending logo'),
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text=_('SHA-256 of the uploaded logo that is being processed.')
+    )
     email = models.EmailField(
         _('email address'),
         unique=True
@@ -28,9 +45,33 @@ class User(BaseModelMixin, AbstractUser, UserInfoModelMixin):
         _('UUID'),
         default=uuid.uuid4
     )
+    email_verified_at = models.DateTimeField(
+        _('Email verified at'),
+        null=True,
+        blank=True
+    )
+
+    objects = UserManager()
+    unordered = UnorderedManager()
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+    class Meta(BaseModelMixin.Meta):
+        indexes = [
+            models.Index(fields=['-created_at'], name='users_user_created_idx'),
+        ]
+
     def __str__(self):
         return f'{self.first_name} {self.last_name}-{self.email}'
+
+    def save(self, *args, **kwargs):
+        self.email = normalize_email(self.email)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def get_logo_name(sha256, variant=None):
+        """Returns the storage name of uploaded logo bytes, or of one of their variants."""
+        if variant is None:
+            return f'users/logos/uploads/{sha256}'
+        return f'users/logos/{sha256[:2]}/{sha256}-{variant}.{RENDITION_EXTENSION}'
@@ -0,0 +1,57 @@
+import hashlib
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.translation import gettext as _
+
+from apps.users.models import User
+from apps.users.tasks import get_stored_logo_variants, process_user_logo
+
+
+class UserLogoService(object):
+    """
+    Logos are accepted as raw bytes and decoded off-request by `process_user_logo`. Variants
+    are named after the SHA-256 of the uploaded bytes, so an image processed before is
+    applied at once from the stored variants.
+    """
+    CHUNK_SIZE = 64 * 1024
+
+    @classmethod
+    def upload(cls, user, stream, length):
+        """
+        Reads `length` logo bytes from `stream` without decoding them. Returns whether they
+        are left to process, or raises `ValueError` when the size is not acceptable.
+        """
+        if not 0 < length <= settings.USER_LOGO_MAX_SIZE:
+            raise ValueError(_('Send a logo of at most {size} bytes.').format(size=settings.USER_LOGO_MAX_SIZE))
+        digest = hashlib.sha256()
+        with tempfile.SpooledTemporaryFile(max_size=16 * cls.CHUNK_SIZE) as buffer:
+            remaining = length
+            while remaining:
+                data = stream.read(min(cls.CHUNK_SIZE, remaining))
+                if not data:
+                    raise ValueError(_('The logo was not fully received.'))
+                digest.update(data)
+                buffer.write(data)
+                remaining -= len(data)
+            sha256 = digest.hexdigest()
+
+            variants = get_stored_logo_variants(sha256)
+            if variants is not None:
+                user.logo = variants[max(settings.USER_LOGO_SIZES, key=settings.USER_LOGO_SIZES.get)]
+                user.logo_variants = variants
+                user.logo_pending = ''
+                user.save(update_fields=['logo', 'logo_variants', 'logo_pending', 'updated_at'])
+                return False
+
+            source_name = User.get_logo_name(sha256)
+            if not default_storage.exists(source_name):
+                buffer.seek(0)
+                default_storage.save(source_name, File(buffer))
+        user.logo_pending = sha256
+        user.save(update_fields=['logo_pending', 'updated_at'])
+        transaction.on_commit(lambda: process_user_logo.delay(user.pk, sha256))
+        return True
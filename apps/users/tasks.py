@@ -0,0 +1,54 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from apps.users.models import User
+from utils.images import make_renditions
+
+logger = logging.getLogger(__name__)
+
+
+def get_stored_logo_variants(sha256):
+    """Returns the variants of logo bytes when they were all processed before, else None."""
+    variants = {name: User.get_logo_name(sha256, name) for name in settings.USER_LOGO_SIZES}
+    if all(default_storage.exists(variant_name) for variant_name in variants.values()):
+        return variants
+    return None
+
+
+@shared_task(bind=True, name='process_user_logo')
+def process_user_logo(self, user_pk, sha256):
+    """
+    Decodes uploaded logo bytes, stores one downscaled variant per USER_LOGO_SIZES entry and
+    makes them the user's logo, unless another logo was uploaded in the meantime.
+    """
+    source_name = User.get_logo_name(sha256)
+    variants = get_stored_logo_variants(sha256) or {}
+    if not variants:
+        try:
+            with default_storage.open(source_name, 'rb') as fp:
+                images = make_renditions(fp, settings.USER_LOGO_SIZES)
+        except (ValueError, OSError) as exc:
+            logger.info(f'Logo {sha256} of user {user_pk} was rejected: {exc}')
+        else:
+            for name, data in images.items():
+                variant_name = User.get_logo_name(sha256, name)
+                if not default_storage.exists(variant_name):
+                    variant_name = default_storage.save(variant_name, ContentFile(data))
+                variants[name] = variant_name
+
+    with transaction.atomic():
+        user = User.unordered.select_for_update().filter(pk=user_pk, logo_pending=sha256).first()
+        if user is not None:
+            if variants:
+                user.logo = variants[max(settings.USER_LOGO_SIZES, key=settings.USER_LOGO_SIZES.get)]
+                user.logo_variants = variants
+            user.logo_pending = ''
+            user.save(update_fields=['logo', 'logo_variants', 'logo_pending', 'updated_at'])
+    default_storage.delete(source_name)
+    logger.info(f'Processed logo {sha256} of user {user_pk}: {variants}')
+    return variants
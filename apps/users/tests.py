@@ -0,0 +1,80 @@
+import os
+import tempfile
+from io import BytesIO
+
+from PIL import Image
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from apps.authentication.cache import user_cache
+from apps.users.models import User
+from apps.users.tasks import process_user_logo
+
+
+class UserLogoTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        overrides = override_settings(MEDIA_ROOT=self.media_root.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.user = User.objects.create_user(username="logouser", email="logo@example.com", password="testpass")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        buffer = BytesIO()
+        Image.new("RGB", (2000, 1000), (10, 120, 200)).save(buffer, "JPEG")
+        self.image = buffer.getvalue()
+
+    def put_logo(self, content, content_type="image/jpeg"):
+        return self.client.put(reverse("user-logo-api"), content, content_type=content_type)
+
+    def test_logo_is_processed_off_request(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.put_logo(self.image)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(response.data["logo_processing"])
+        # The processing task and the user cache invalidation.
+        self.assertEqual(len(callbacks), 2)
+
+        self.user.refresh_from_db()
+        variants = process_user_logo(self.user.pk, self.user.logo_pending)
+        self.assertEqual(set(variants), {"small", "medium", "large"})
+        with Image.open(os.path.join(self.media_root.name, variants["small"])) as image:
+            self.assertEqual((image.format, image.size), ("WEBP", (64, 32)))
+        self.assertEqual(os.listdir(os.path.join(self.media_root.name, "users", "logos", "uploads")), [])
+
+        response = self.client.get(reverse("user-api"))
+        self.assertFalse(response.data["logo_processing"])
+        self.assertEqual(response.data["logo_variants"]["large"], f"/media/{variants['large']}")
+        self.assertTrue(response.data["logo"].endswith(variants["large"]))
+
+        # The same image is applied from the stored variants, without another task.
+        other = User.objects.create_user(username="otherlogo", email="other@example.com", password="testpass")
+        self.client.force_authenticate(user=other)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.put_logo(self.image)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["logo_variants"], self.client.get(reverse("user-api")).data["logo_variants"])
+        # Only the user cache invalidation.
+        self.assertEqual(len(callbacks), 1)
+
+    def test_undecodable_logo_keeps_previous_one(self):
+        self.user.logo = "users/logos/previous.webp"
+        self.user.save()
+        self.put_logo(b"not an image")
+        self.user.refresh_from_db()
+        self.assertEqual(process_user_logo(self.user.pk, self.user.logo_pending), {})
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.logo.name, self.user.logo_pending), ("users/logos/previous.webp", ""))
+
+    def test_logo_upload_is_checked_before_reading(self):
+        self.assertEqual(self.put_logo(self.image, "text/plain").status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        with override_settings(USER_LOGO_MAX_SIZE=len(self.image) - 1):
+            self.assertEqual(self.put_logo(self.image).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(User.objects.get(pk=self.user.pk).logo_pending, "")
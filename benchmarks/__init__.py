@@ -0,0 +1,6 @@
+"""
+Benchmarks for the hot paths of the ad platform.
+
+Each module is runnable with `python -m benchmarks.<name>`, works on a throwaway
+test database and emits machine-readable JSON results.
+"""
@@ -0,0 +1,131 @@
+"""
+Load test comparing the sync (WSGI) and async (ASGI) read paths of the ads API.
+
+    python -m benchmarks.async_load --requests 2000 --concurrency 200 --threads 8 --output async_load.json
+
+The sync path is driven by `--threads` worker threads, like a threaded WSGI server:
+requests beyond that queue for a free thread. The async path keeps `--concurrency`
+requests in flight on one event loop. The response cache is disabled unless `--warm`
+is given, so every request reaches the database.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from benchmarks.utils import benchmark_database, setup, summarize, write_results
+
+ENDPOINTS = {
+    'brands': ('brands-api-list', 'async-brands-api-list'),
+    'ads': ('ads-api-list', 'async-ads-api-list'),
+    'report': ('performance-report-api', 'async-performance-report-api'),
+}
+
+
+def seed(ads):
+    from apps.ads.models import Ad, AdSet, Brand, Campaign
+    from apps.users.models import User
+
+    user = User.objects.create_user(username='benchmark', email='benchmark@example.com', password='benchmark')
+    brand = Brand.objects.create(
+        name='Benchmark Brand',
+        daily_budget=Decimal('1000000.00'),
+        monthly_budget=Decimal('10000000.00'),
+        owner=user
+    )
+    campaigns = [Campaign.objects.create(brand=brand, name=f'Campaign {index}') for index in range(5)]
+    adsets = [AdSet.objects.create(campaign=campaigns[index % 5], name=f'AdSet {index}') for index in range(10)]
+    for index in range(ads):
+        Ad.objects.create(adset=adsets[index % 10], name=f'Ad {index}')
+    return user
+
+
+def _result(samples, wall):
+    # Latencies run from submission, so time spent waiting for a worker is included.
+    return {**summarize(samples), 'wall_s': round(wall, 3), 'requests_per_s': round(len(samples) / wall, 1)}
+
+
+def run_sync(url, headers, requests, threads):
+    from django.db import connections
+    from django.test import Client
+
+    def call(submitted_at):
+        response = Client(headers=headers).get(url)
+        assert response.status_code == 200, response.content
+        return time.perf_counter() - submitted_at
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='wsgi') as executor:
+        futures = [executor.submit(call, time.perf_counter()) for _ in range(requests)]
+        samples = [future.result() for future in futures]
+    wall = time.perf_counter() - started
+    connections.close_all()
+    return _result(samples, wall)
+
+
+async def run_async(url, headers, requests, concurrency):
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call():
+        submitted_at = time.perf_counter()
+        async with semaphore:
+            response = await client.get(url, headers=headers)
+        assert response.status_code == 200, response.content
+        return time.perf_counter() - submitted_at
+
+    started = time.perf_counter()
+    samples = await asyncio.gather(*(call() for _ in range(requests)))
+    return _result(samples, time.perf_counter() - started)
+
+
+def run(user, args):
+    from django.core.cache import cache
+    from django.test.utils import override_settings
+    from django.urls import reverse
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+    overrides = {} if args.warm else {'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}}
+    results = {}
+    with override_settings(**overrides):
+        for name, (sync_name, async_name) in ENDPOINTS.items():
+            cache.clear()
+            results[name] = {
+                'sync': run_sync(reverse(sync_name), headers, args.requests, args.threads),
+                'async': asyncio.run(run_async(reverse(async_name), headers, args.requests, args.concurrency)),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ads', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--warm', action='store_true', help='Keep the response cache enabled.')
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        user = seed(args.ads)
+        results = run(user, args)
+        write_results('async_load', {
+            'ads': args.ads,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'threads': args.threads,
+            'warm': args.warm,
+            'endpoints': results,
+        }, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""
+Throughput and latency benchmark for the billing path: `Ad.log_click`, `log_impression`,
+`log_view`, `log_acquisition` and `_create_transaction_and_check_budget`.
+
+    python -m benchmarks.billing --workers 1,8,32 --ledger-sizes 0,1000000,10000000 --output billing.json
+    DB_ENGINE=django.db.backends.postgresql DB_NAME=adtest DB_USER=... DB_PASSWORD=... DB_HOST=localhost \\
+        python -m benchmarks.billing --output billing-postgresql.json
+
+The database comes from the usual DB_* settings: SQLite by default, or a local PostgreSQL.
+For each ledger size, in increasing order, the ledger is topped up with cost transactions
+spread over the last two years of `--brands` brands, then every operation runs `--events`
+billing events on each worker count. Workers are threads with their own connection, and
+each one bills the ads of one brand, so workers share brand row locks once they outnumber
+the brands. Events that fail are counted as errors and left out of the latency and
+throughput. On SQLite, concurrent billing transactions fail with "database is locked" as
+they would in the app; `--sqlite-immediate` starts them with BEGIN IMMEDIATE instead, so
+they queue for the write lock. The results record which mode was measured.
+
+With `--baseline`, the results are compared to those of an earlier run. The command exits
+non-zero when a p99 latency or a throughput is more than `--tolerance` worse, or when the
+share of failed events grew by more than `--error-tolerance`.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from benchmarks.utils import benchmark_database, setup, summarize, write_results
+
+OPERATIONS = ('log_click', 'log_impression', 'log_view', 'log_acquisition', 'create_transaction_and_check_budget')
+HISTORY_MINUTES = 2 * 365 * 24 * 60
+
+
+def seed(brands, ads_per_brand):
+    from apps.ads.models import Ad, AdSet, Brand, Campaign
+    from apps.users.models import User
+
+    user = User.objects.create_user(username='benchmark', email='benchmark@example.com', password='benchmark')
+    brand_ads = []
+    for index in range(brands):
+        # Budgets no benchmark can reach, so campaigns keep running.
+        brand = Brand.objects.create(
+            name=f'Benchmark Brand {index}',
+            daily_budget=Decimal('10000000.00'),
+            monthly_budget=Decimal('99999999.00'),
+            owner=user
+        )
+        campaign = Campaign.objects.create(
+            brand=brand, name=f'Campaign {index}', status=Campaign.CampaignStatus.RUNNING
+        )
+        adset = AdSet.objects.create(campaign=campaign, name=f'AdSet {index}')
+        brand_ads.append([
+            Ad.objects.create(
+                adset=adset,
+                name=f'Ad {index}.{ad_index}',
+                cost_per_click=Decimal('0.10'),
+                cost_per_impression=Decimal('2.00'),
+                cost_per_view=Decimal('0.05'),
+                cost_per_acquisition=Decimal('5.00')
+            ).pk
+            for ad_index in range(ads_per_brand)
+        ])
+    return brand_ads
+
+
+@contextmanager
+def explicit_created_at(model):
+    """Lets `bulk_create` keep the `created_at` values it is given."""
+    field = model._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def top_up_ledger(brand_ads, rows, batch):
+    """
+    Adds `rows` cost transactions to the ledger, round-robin over the benchmark ads and one
+    per minute going back two years, the most recent ones falling on the current day.
+    """
+    from django.db import connection
+    from django.utils import timezone
+    from apps.ads.models import Ad
+    from apps.payments.models import Transaction
+
+    ads = list(
+        Ad.objects.select_related('adset').filter(pk__in=[pk for pks in brand_ads for pk in pks]).order_by('pk')
+    )
+    now = timezone.now()
+    cost_types = list(Transaction.CostTypeChoices.values)
+    with explicit_created_at(Transaction):
+        for offset in range(0, rows, batch):
+            Transaction.objects.bulk_create([
+                Transaction(
+                    brand_id=ads[index % len(ads)].brand_id,
+                    campaign_id=ads[index % len(ads)].adset.campaign_id,
+                    ad=ads[index % len(ads)],
+                    amount=Decimal('0.0100'),
+                    transaction_type=Transaction.TransactionTypeChoices.COST,
+                    cost_type=cost_types[index % len(cost_types)],
+                    created_at=now - timedelta(minutes=index % HISTORY_MINUTES)
+                )
+                for index in range(offset, min(offset + batch, rows))
+            ])
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Transaction._meta.db_table}')
+
+
+def bill(ad, operation):
+    from apps.payments.models import Transaction
+
+    if operation == 'create_transaction_and_check_budget':
+        return ad._create_transaction_and_check_budget(Decimal('0.10'), Transaction.CostTypeChoices.CLICK)
+    return getattr(ad, operation)()
+
+
+def run_worker(ad_pks, operation, events):
+    """Bills `events` events over `ad_pks` and returns the latency samples and the error count."""
+    from django.db import DatabaseError, connection
+    from apps.ads.models import Ad
+
+    try:
+        ads = list(Ad.objects.select_related('adset__campaign__brand').filter(pk__in=ad_pks))
+        samples, errors = [], 0
+        for index in range(events):
+            started = time.perf_counter()
+            try:
+                billed, message = bill(ads[index % len(ads)], operation)
+            except DatabaseError:
+                errors += 1
+                continue
+            samples.append(time.perf_counter() - started)
+            if not billed:
+                raise RuntimeError(f'{operation} did not bill: {message}')
+        return samples, errors
+    finally:
+        connection.close()
+
+
+def run(brand_ads, operation, workers, events):
+    from apps.ads.models import ad_stats_buffer
+
+    per_worker = max(1, events // workers)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='billing') as executor:
+        futures = [
+            executor.submit(run_worker, brand_ads[index % len(brand_ads)], operation, per_worker)
+            for index in range(workers)
+        ]
+        outcomes = [future.result() for future in futures]
+    wall = time.perf_counter() - started
+    ad_stats_buffer.flush()
+
+    samples = [sample for worker_samples, _errors in outcomes for sample in worker_samples]
+    return {
+        'operation': operation,
+        'workers': workers,
+        'events': per_worker * workers,
+        'errors': sum(errors for _samples, errors in outcomes),
+        'wall_s': round(wall, 3),
+        'events_per_s': round(len(samples) / wall, 1),
+        'latency': summarize(samples) if samples else None,
+    }
+
+
+def run_key(result):
+    return result['operation'], result['workers'], result['ledger_size']
+
+
+def error_rate(result):
+    return result['errors'] / result['events'] if result['events'] else 0.0
+
+
+def compare(runs, baseline_path, tolerance, error_tolerance, sqlite_immediate):
+    """
+    Returns the runs whose p99 latency or throughput is more than `tolerance` worse than
+    in the baseline document, measured on the same database and SQLite transaction mode,
+    or whose share of failed events grew by more than `error_tolerance`.
+    """
+    from django.db import connection
+
+    with open(baseline_path) as fp:
+        baseline = json.load(fp)
+    if baseline['database'] != connection.vendor:
+        raise SystemExit(f'The baseline was measured on {baseline["database"]}, not {connection.vendor}.')
+    if baseline['results'].get('sqlite_immediate', False) != sqlite_immediate:
+        raise SystemExit(f'The baseline was measured with sqlite_immediate={not sqlite_immediate}.')
+    baseline_runs = {run_key(result): result for result in baseline['results']['runs']}
+
+    regressions = []
+    for result in runs:
+        before = baseline_runs.get(run_key(result))
+        if before is None:
+            continue
+        # Failed events are left out of latency and throughput, so they are compared first.
+        error_rate_change = error_rate(result) - error_rate(before)
+        p99_change = throughput_change = 0.0
+        if before['latency'] and result['latency']:
+            p99_change = result['latency']['p99_ms'] / before['latency']['p99_ms'] - 1
+            throughput_change = result['events_per_s'] / before['events_per_s'] - 1
+        if p99_change > tolerance or throughput_change < -tolerance or error_rate_change > error_tolerance:
+            regressions.append({
+                'operation': result['operation'],
+                'workers': result['workers'],
+                'ledger_size': result['ledger_size'],
+                'p99_change': round(p99_change, 3),
+                'throughput_change': round(throughput_change, 3),
+                'error_rate_change': round(error_rate_change, 3),
+            })
+    return regressions
+
+
+def _int_list(value):
+    return sorted(int(item) for item in value.split(','))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=_int_list, default='1,8,32')
+    parser.add_argument('--ledger-sizes', type=_int_list, default='0,1000000,10000000')
+    parser.add_argument('--operations', default=','.join(OPERATIONS))
+    parser.add_argument('--events', type=int, default=2000, help='Billing events per operation and worker count.')
+    parser.add_argument('--brands', type=int, default=8)
+    parser.add_argument('--ads', type=int, default=10, help='Ads per brand.')
+    parser.add_argument('--seed-batch', type=int, default=10000)
+    parser.add_argument('--baseline', help='JSON output of an earlier run to compare with.')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument(
+        '--error-tolerance', type=float, default=0.01, help='Allowed growth of the share of failed events.'
+    )
+    parser.add_argument(
+        '--sqlite-immediate', action='store_true',
+        help='Start SQLite transactions with BEGIN IMMEDIATE, which the app does not do.'
+    )
+    parser.add_argument('--output')
+    args = parser.parse_args()
+    operations = [operation for operation in args.operations.split(',') if operation]
+    unknown = set(operations) - set(OPERATIONS)
+    if unknown:
+        parser.error(f'Unknown operations: {", ".join(sorted(unknown))}')
+
+    setup()
+    with benchmark_database(sqlite_immediate=args.sqlite_immediate) as connection:
+        from apps.payments.models import Transaction
+
+        sqlite_immediate = args.sqlite_immediate and connection.vendor == 'sqlite'
+
+        brand_ads = seed(args.brands, args.ads)
+        runs = []
+        for ledger_size in args.ledger_sizes:
+            # Earlier sizes and billed events count towards the next size.
+            top_up_ledger(brand_ads, max(0, ledger_size - Transaction.objects.count()), args.seed_batch)
+            for operation in operations:
+                for workers in args.workers:
+                    ledger_rows = Transaction.objects.count()
+                    result = run(brand_ads, operation, workers, args.events)
+                    runs.append({'ledger_size': ledger_size, 'ledger_rows': ledger_rows, **result})
+
+        results = {
+            'workers': args.workers,
+            'ledger_sizes': args.ledger_sizes,
+            'events': args.events,
+            'brands': args.brands,
+            'ads_per_brand': args.ads,
+            'sqlite_immediate': sqlite_immediate,
+            'runs': runs,
+        }
+        if args.baseline:
+            results['baseline'] = args.baseline
+            results['regressions'] = compare(
+                runs, args.baseline, args.tolerance, args.error_tolerance, sqlite_immediate
+            )
+        write_results('billing', results, args.output)
+
+    if results.get('regressions'):
+        sys.stderr.write(f'{len(results["regressions"])} billing regressions against {args.baseline}\n')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Latency benchmark for the performance report API.
+
+    python -m benchmarks.reporting --ads 50 --days 90 --iterations 50 --output reporting.json
+
+Seeds hourly rollups into a throwaway database, times the report endpoint for the
+dashboard group-bys and exits non-zero when a p95 misses its target.
+"""
+import argparse
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from benchmarks.utils import benchmark_database, setup, summarize, write_results
+
+# Targets for a 30 day window over the default data set (~72k rollup rows).
+P95_TARGETS_MS = {
+    'campaign,day': 100,
+    'brand,cost_type': 100,
+    'ad,day': 150,
+    'campaign,hour,cost_type': 250,
+}
+
+
+def seed(ads, days):
+    from apps.ads.models import Ad, AdSet, Brand, Campaign, PerformanceRollup
+    from apps.payments.models import Transaction
+    from apps.users.models import User
+    from django.utils import timezone
+
+    user = User.objects.create_user(username='benchmark', email='benchmark@example.com', password='benchmark')
+    brand = Brand.objects.create(
+        name='Benchmark Brand',
+        daily_budget=Decimal('1000000.00'),
+        monthly_budget=Decimal('10000000.00'),
+        owner=user
+    )
+    campaigns = [Campaign.objects.create(brand=brand, name=f'Campaign {index}') for index in range(5)]
+    adsets = [AdSet.objects.create(campaign=campaigns[index % 5], name=f'AdSet {index}') for index in range(10)]
+    ad_objects = [Ad.objects.create(adset=adsets[index % 10], name=f'Ad {index}') for index in range(ads)]
+
+    today = timezone.now().date()
+    cost_types = (Transaction.CostTypeChoices.CLICK, Transaction.CostTypeChoices.IMPRESSION)
+    rollups = (
+        PerformanceRollup(
+            brand=brand,
+            campaign_id=ad.adset.campaign_id,
+            adset_id=ad.adset_id,
+            ad=ad,
+            owner=user,
+            cost_type=cost_type,
+            local_date=today - timedelta(days=day),
+            local_hour=hour,
+            events=10,
+            amount=Decimal('1.2345')
+        )
+        for ad in ad_objects
+        for day in range(days)
+        for hour in range(24)
+        for cost_type in cost_types
+    )
+    PerformanceRollup.objects.bulk_create(rollups, batch_size=5000)
+    return user, today
+
+
+def run(user, today, days, iterations):
+    from django.core.cache import cache
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = reverse('performance-report-api')
+    params = {'start': today - timedelta(days=min(days, 30) - 1), 'end': today, 'page_size': 100}
+
+    results = {}
+    for group_by, target in P95_TARGETS_MS.items():
+        samples = []
+        for _ in range(iterations):
+            cache.clear()
+            started = time.perf_counter()
+            response = client.get(url, {**params, 'group_by': group_by})
+            samples.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.content
+        results[group_by] = {**summarize(samples), 'p95_target_ms': target}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ads', type=int, default=50)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        user, today = seed(args.ads, args.days)
+        results = run(user, today, args.days, args.iterations)
+        write_results('reporting', {'ads': args.ads, 'days': args.days, 'group_by': results}, args.output)
+
+    missed = [group_by for group_by, result in results.items() if result['p95_ms'] > result['p95_target_ms']]
+    if missed:
+        sys.stderr.write(f'p95 target missed for: {", ".join(missed)}\n')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
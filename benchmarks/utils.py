@@ -0,0 +1,116 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from contextlib import ExitStack, contextmanager
+
+import django
+from django.utils import timezone
+
+# Seconds a SQLite connection waits for a lock held by another one.
+SQLITE_BUSY_TIMEOUT = 30
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'adTest.settings')
+    django.setup()
+
+
+@contextmanager
+def benchmark_database(keepdb=False, sqlite_immediate=False):
+    """
+    Creates a throwaway test database for the duration of a benchmark.
+    SQLite gets a file database, so concurrent workers share it, and its connections wait
+    up to SQLITE_BUSY_TIMEOUT for a lock. Transactions stay deferred, as in the app, so a
+    writer that read first still fails with "database is locked" when another one holds
+    the write lock. With `sqlite_immediate`, they take the write lock up front instead and
+    concurrent writers queue like they do on PostgreSQL.
+    """
+    from django.db import DEFAULT_DB_ALIAS, connection, connections
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    with ExitStack() as stack:
+        if connection.vendor == 'sqlite':
+            if not connection.settings_dict['TEST'].get('NAME'):
+                connection.settings_dict['TEST']['NAME'] = os.path.join(
+                    tempfile.gettempdir(), 'adtest_benchmark.sqlite3'
+                )
+            # Worker connections are opened from the same settings.
+            connection.settings_dict['OPTIONS'].setdefault('timeout', SQLITE_BUSY_TIMEOUT)
+            if sqlite_immediate:
+                stack.enter_context(_sqlite_immediate_transactions(type(connections[DEFAULT_DB_ALIAS])))
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb)
+        try:
+            yield connection
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+            teardown_test_environment()
+
+
+@contextmanager
+def _sqlite_immediate_transactions(wrapper_class):
+    """
+    Starts `atomic` blocks with BEGIN IMMEDIATE. A deferred transaction that reads before
+    writing fails at once when another one holds the write lock, whatever the busy timeout.
+    Django 5.1 has `OPTIONS['transaction_mode']` for this; 4.2 does not.
+    """
+    def begin_immediate(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
+
+    original = wrapper_class._start_transaction_under_autocommit
+    wrapper_class._start_transaction_under_autocommit = begin_immediate
+    try:
+        yield
+    finally:
+        wrapper_class._start_transaction_under_autocommit = original
+
+
+def summarize(samples):
+    """
+    Returns count, mean and p50/p95/p99 of latency samples given in seconds, in milliseconds.
+    """
+    quantiles = statistics.quantiles(samples, n=100, method='inclusive') if len(samples) > 1 else samples * 99
+    return {
+        'count': len(samples),
+        'mean_ms': round(statistics.fmean(samples) * 1000, 3),
+        'p50_ms': round(quantiles[49] * 1000, 3),
+        'p95_ms': round(quantiles[94] * 1000, 3),
+        'p99_ms': round(quantiles[98] * 1000, 3),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(benchmark, results, output=None):
+    """
+    Writes a JSON document with the results and the environment they were measured in.
+    """
+    from django.db import connection
+
+    document = {
+        'benchmark': benchmark,
+        'commit': _git_commit(),
+        'measured_at': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'python': platform.python_version(),
+        'results': results,
+    }
+    payload = json.dumps(document, indent=2, default=str)
+    if output:
+        with open(output, 'w') as fp:
+            fp.write(payload + '\n')
+    else:
+        sys.stdout.write(payload + '\n')
+    return document
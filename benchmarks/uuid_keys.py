@@ -0,0 +1,122 @@
+"""
+Insert benchmark for random (UUID version 4) against time-ordered (UUID version 7)
+primary keys on the transactions table.
+
+    python -m benchmarks.uuid_keys --rows 200000 --batch 1000 --output uuid_keys.json
+
+For each key kind the table is emptied and filled in `--batch` sized inserts. The
+benchmark reports insert throughput and the size of the table and of its primary key
+index. Sizes come from `pg_relation_size` on PostgreSQL and from the `dbstat` table
+on SQLite, when SQLite was built with it.
+"""
+import argparse
+import sys
+import time
+import uuid
+from decimal import Decimal
+
+from benchmarks.utils import benchmark_database, setup, summarize, write_results
+from utils.uuids import uuid7
+
+KEY_KINDS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+def seed():
+    from apps.ads.models import Brand
+    from apps.users.models import User
+
+    user = User.objects.create_user(username='benchmark', email='benchmark@example.com', password='benchmark')
+    return Brand.objects.create(
+        name='Benchmark Brand',
+        daily_budget=Decimal('1000000.00'),
+        monthly_budget=Decimal('10000000.00'),
+        owner=user
+    )
+
+
+def relation_sizes(connection, table):
+    """
+    Returns the size in bytes of `table` and of its primary key index, or None where
+    the database does not report it.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT pg_relation_size(%s::regclass), pg_relation_size(indexrelid) '
+                'FROM pg_index WHERE indrelid = %s::regclass AND indisprimary',
+                [table, table]
+            )
+            table_bytes, index_bytes = cursor.fetchone()
+            return {'table_bytes': table_bytes, 'pk_index_bytes': index_bytes}
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'PRAGMA index_list("{table}")')
+            pk_index = next((row[1] for row in cursor.fetchall() if row[3] == 'pk'), None)
+            try:
+                cursor.execute(
+                    'SELECT name, SUM(pgsize) FROM dbstat WHERE name IN (%s, %s) GROUP BY name', [table, pk_index]
+                )
+            except Exception:
+                return {'table_bytes': None, 'pk_index_bytes': None}
+            sizes = dict(cursor.fetchall())
+            return {'table_bytes': sizes.get(table), 'pk_index_bytes': sizes.get(pk_index)}
+    return {'table_bytes': None, 'pk_index_bytes': None}
+
+
+def run_kind(brand, make_key, rows, batch):
+    from django.db import connection
+    from apps.payments.models import Transaction
+
+    Transaction.objects.all().delete()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'VACUUM FULL {Transaction._meta.db_table}')
+
+    samples = []
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        transactions = [
+            Transaction(
+                uuid=make_key(),
+                brand=brand,
+                amount=Decimal('0.1000'),
+                transaction_type=Transaction.TransactionTypeChoices.COST,
+                cost_type=Transaction.CostTypeChoices.CLICK
+            )
+            for _ in range(min(batch, rows - offset))
+        ]
+        batch_started = time.perf_counter()
+        Transaction.objects.bulk_create(transactions)
+        samples.append(time.perf_counter() - batch_started)
+    wall = time.perf_counter() - started
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Transaction._meta.db_table}')
+    return {
+        'batch_latency': summarize(samples),
+        'wall_s': round(wall, 3),
+        'rows_per_s': round(rows / wall, 1),
+        **relation_sizes(connection, Transaction._meta.db_table),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        brand = seed()
+        results = {kind: run_kind(brand, make_key, args.rows, args.batch) for kind, make_key in KEY_KINDS.items()}
+        write_results('uuid_keys', {'rows': args.rows, 'batch': args.batch, 'keys': results}, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
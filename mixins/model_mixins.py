@@ -3,6 +3,8 @@ from django.core.validators import RegexValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from utils.uuids import uuid7
+
 
 class BaseModelMixin(models.Model):
     __doc__ = _("Base Model includes `created_at` and `updated_at`.")
@@ -27,6 +29,17 @@ class BaseModelMixin(models.Model):
         ordering = ['-created_at']
 
 
+class TimeOrderedUUIDModelMixin(BaseModelMixin):
+    __doc__ = _("Base Model whose `uuid` primary keys are time-ordered (UUID version 7).")
+    uuid = models.UUIDField(
+        primary_key=True,
+        default=uuid7
+    )
+
+    class Meta(BaseModelMixin.Meta):
+        abstract = True
+
+
 class UserInfoModelMixin(models.Model):
     class GenderChoices(models.TextChoices):
         MALE = 'male', _('Male')
@@ -1,15 +1,25 @@
 import base64
+import hashlib
 
 from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.http import parse_etags, quote_etag
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from utils import db_router
+from utils.cache import aget_data_version, get_data_version
+from utils.decorators import cache_response, view_cache_version
 
 
 class BasicAuthMixin:
     """
     Mixin to enforce Basic Authentication on APIView classes.
     """
-    VALID_USERNAME = settings.ADYEN_BASIC_USERNAME
-    VALID_PASSWORD = settings.ADYEN_BASIC_PASSWORD
+    VALID_USERNAME = getattr(settings, 'ADYEN_BASIC_USERNAME', None)
+    VALID_PASSWORD = getattr(settings, 'ADYEN_BASIC_PASSWORD', None)
 
     def enforce_basic_auth(self, request):
         # Get the Authorization header
@@ -32,3 +42,175 @@ class BasicAuthMixin:
     def perform_authentication(self, request):
         self.enforce_basic_auth(request)
         return super().perform_authentication(request)
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin to let clients trim read responses with `?fields=` and `?omit=`.
+
+    The selection is applied to the serializer and pushed down to the queryset
+    with `defer()`, so columns nobody asked for never leave the database.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+
+    def _get_field_param(self, param):
+        value = self.request.query_params.get(param, '')
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+    def _get_serializer_fields(self):
+        if not hasattr(self, '_serializer_fields'):
+            self._serializer_fields = self.get_serializer_class()().fields
+        return self._serializer_fields
+
+    def get_sparse_fieldset(self):
+        """
+        Returns the serializer field names to render, or None to render all of them.
+        """
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        if not hasattr(self, '_sparse_fieldset'):
+            requested = self._get_field_param(self.fields_query_param)
+            omitted = self._get_field_param(self.omit_query_param)
+            if not requested and not omitted:
+                self._sparse_fieldset = None
+            else:
+                available = set(self._get_serializer_fields())
+                selected = requested & available if requested else available
+                self._sparse_fieldset = selected - omitted
+        return self._sparse_fieldset
+
+    def get_deferred_columns(self, model, fieldset):
+        """
+        Returns the concrete model fields that none of the selected serializer fields read.
+        """
+        serializer_fields = self._get_serializer_fields()
+        roots = {serializer_fields[name].source.split('.')[0] for name in fieldset}
+        model_fields = {field.name for field in model._meta.get_fields()}
+        if not roots <= model_fields:
+            # A selected field reads a property or method; it may touch any column.
+            return set()
+        concrete = {field.name for field in model._meta.concrete_fields}
+        return concrete - roots - {model._meta.pk.name}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fieldset = self.get_sparse_fieldset()
+        if fieldset is None:
+            return queryset
+        deferred = self.get_deferred_columns(queryset.model, fieldset)
+        return queryset.defer(*deferred) if deferred else queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fieldset = self.get_sparse_fieldset()
+        if fieldset is not None:
+            target = getattr(serializer, 'child', serializer)
+            for name in set(target.fields) - fieldset:
+                target.fields.pop(name)
+        return serializer
+
+
+class ConditionalGetMixin:
+    """
+    Mixin to answer `If-None-Match` on list and retrieve with `304 Not Modified`.
+
+    The ETag comes from a cheap validator (row count and latest `etag_fields`
+    over the filtered queryset, or the object's own `etag_fields`) and the
+    owner data version, so an unchanged resource is never serialized.
+    """
+    etag_fields = ('updated_at',)
+
+    def get_list_validator(self, queryset):
+        aggregates = {f'latest_{index}': Max(field) for index, field in enumerate(self.etag_fields)}
+        return queryset.order_by().aggregate(count=Count('pk'), **aggregates)
+
+    def get_object_validator(self, instance):
+        values = []
+        for field in self.etag_fields:
+            value = instance
+            for attr in field.split('__'):
+                value = getattr(value, attr, None)
+            values.append(value)
+        return instance.pk, values
+
+    def get_etag(self, validator):
+        user = self.request.user
+        # Bulk updates that leave `etag_fields` alone still bump the data version.
+        version = get_data_version(user.pk) if user.is_authenticated else None
+        raw = f'{self.request.get_full_path()}:{user.pk}:{version}:{validator}'
+        return quote_etag(hashlib.md5(raw.encode('utf-8')).hexdigest())
+
+    def _conditional_response(self, etag, render):
+        if_none_match = self.request.headers.get('If-None-Match')
+        if if_none_match and {etag, '*'} & set(parse_etags(if_none_match)):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = render()
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        validator = self.get_list_validator(self.filter_queryset(self.get_queryset()))
+        return self._conditional_response(
+            self.get_etag(validator),
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self._conditional_response(
+            self.get_etag(self.get_object_validator(instance)),
+            lambda: Response(self.get_serializer(instance).data)
+        )
+
+
+class ResponseCacheMixin:
+    """
+    Mixin to cache list and retrieve responses per user.
+
+    Entries are versioned by the requesting owner's data version, so any write
+    to their resources invalidates them at once.
+    """
+
+    def get_cache_version(self, request):
+        return get_data_version(request.user.pk)
+
+    async def aget_cache_version(self, request):
+        return await aget_data_version(request.user.pk)
+
+    @cache_response(timeout=settings.RESPONSE_CACHE_TIMEOUT, cache_version=view_cache_version)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response(timeout=settings.RESPONSE_CACHE_TIMEOUT, cache_version=view_cache_version)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+class ReplicaReadMixin:
+    """
+    Mixin to serve the safe requests of `replica_actions` from the read replica.
+
+    `None` opts in every safe request. Unsafe requests pin the user to the primary
+    for a few seconds, so their next reads see what they just wrote.
+    """
+    replica_actions = ('list',)
+
+    def reads_from_replica(self, request):
+        if request.method not in SAFE_METHODS:
+            return False
+        return self.replica_actions is None or getattr(self, 'action', None) in self.replica_actions
+
+    def dispatch(self, request, *args, **kwargs):
+        with db_router.replica_scope():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS:
+            db_router.pin_to_primary(request.user.pk)
+        elif self.reads_from_replica(request):
+            db_router.route_reads_to_replica(not db_router.is_pinned(request.user.pk))
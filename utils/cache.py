@@ -0,0 +1,194 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from utils import db_router
+
+DATA_VERSION_KEY = 'data-version:{owner_id}'
+AD_STATS_VERSION_KEY = 'ad-stats-version:{owner_id}'
+
+_stats_lock = threading.Lock()
+_response_cache_stats = Counter()
+
+
+def get_version(key):
+    """
+    Returns the counter stored under `key`, used as a cache version for dependent entries.
+    """
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never rewinds to a version
+        # that still has cached entries.
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(key):
+    """
+    Async counterpart of `get_version`.
+    """
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns() // 1000, timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(key):
+    """
+    Moves the counter under `key` forward, orphaning every entry cached under the old value.
+    """
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+
+
+def get_data_version(owner_id):
+    """
+    Returns the current data version of an owner, used as the response cache version.
+    """
+    return get_version(DATA_VERSION_KEY.format(owner_id=owner_id))
+
+
+async def aget_data_version(owner_id):
+    """
+    Async counterpart of `get_data_version`.
+    """
+    return await aget_version(DATA_VERSION_KEY.format(owner_id=owner_id))
+
+
+def bump_data_version(owner_id):
+    """
+    Invalidates every cached response of an owner once the current transaction commits.
+    Bumping earlier would let a concurrent read cache the old rows under the new version.
+    The owner is pinned to the primary as well, so the replica cannot fill the new version
+    with rows it has not caught up on yet, whichever path wrote them.
+    """
+    def bump():
+        db_router.pin_to_primary(owner_id)
+        bump_version(DATA_VERSION_KEY.format(owner_id=owner_id))
+
+    transaction.on_commit(bump)
+
+
+def get_ad_stats_version(owner_id):
+    """
+    Returns the version of an owner's ad counters, moved by every counter flush.
+    """
+    return get_version(AD_STATS_VERSION_KEY.format(owner_id=owner_id))
+
+
+async def aget_ad_stats_version(owner_id):
+    """
+    Async counterpart of `get_ad_stats_version`.
+    """
+    return await aget_version(AD_STATS_VERSION_KEY.format(owner_id=owner_id))
+
+
+def bump_ad_stats_version(owner_id):
+    """
+    Invalidates the cached ad responses of an owner once the current transaction commits,
+    leaving their other cached responses alone. Like `bump_data_version`, it pins the owner
+    to the primary so the new version is not filled with counters the replica lacks.
+    """
+    def bump():
+        db_router.pin_to_primary(owner_id)
+        bump_version(AD_STATS_VERSION_KEY.format(owner_id=owner_id))
+
+    transaction.on_commit(bump)
+
+
+def get_redis_client():
+    """
+    Returns the raw client of the default cache when it is a django-redis cache, else None.
+    """
+    try:
+        from django_redis import get_redis_connection
+    except ImportError:
+        return None
+    try:
+        return get_redis_connection('default')
+    except NotImplementedError:
+        return None
+
+
+def record_response_cache(hit):
+    with _stats_lock:
+        _response_cache_stats['hits' if hit else 'misses'] += 1
+
+
+def get_response_cache_stats():
+    """
+    Returns the response cache hit/miss counters of this process.
+    """
+    with _stats_lock:
+        hits, misses = _response_cache_stats['hits'], _response_cache_stats['misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0
+    }
+
+
+class LRUCache(object):
+    """
+    Thread-safe in-process cache bounded by entry count, with a per-entry TTL.
+    Least recently used entries are evicted first; expired entries count as misses.
+    """
+    _missing = object()
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, self._missing)
+            if entry is not self._missing:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+                del self._data[key]
+                self._stats['expired'] += 1
+            self._stats['misses'] += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self._stats['hits'], self._stats['misses']
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'hits': hits,
+                'misses': misses,
+                'expired': self._stats['expired'],
+                'evictions': self._stats['evictions'],
+                'hit_rate': hits / (hits + misses) if hits + misses else 0.0
+            }
@@ -1,20 +1,25 @@
-from django.db.models import Func, Value, DateTimeField
+from django.db import models
 
 
-class AtTimeZone(Func):
-    function = ''
-    template = '%(expressions)s AT TIME ZONE %(timezone)s'
-    output_field = DateTimeField()
+class UnorderedManager(models.Manager):
+    """
+    Manager without the model's default ordering, for internal lookups and scans that
+    do not need one. Declare it after the default manager.
+    """
 
-    def __init__(self, datetime_field, timezone, **extra):
-        # Pass the datetime field and timezone separately
-        expressions = (datetime_field,)
-        super().__init__(*expressions, timezone=Value(timezone), **extra)
+    def get_queryset(self):
+        return super().get_queryset().order_by()
 
-    def as_sql(self, compiler, connection):
-        # Override as_sql to manually construct the SQL
-        lhs_sql, lhs_params = compiler.compile(self.source_expressions[0])
-        rhs_sql, rhs_params = compiler.compile(self.extra['timezone'])
-        sql = f"{lhs_sql} AT TIME ZONE {rhs_sql}"
-        params = lhs_params + rhs_params
-        return sql, params
+
+def delete_in_batches(queryset, batch_size):
+    """
+    Deletes the rows of `queryset` in primary key batches of `batch_size`, so a large purge
+    never holds long locks. Cascades run per batch. Returns how many rows matched.
+    """
+    deleted = 0
+    while True:
+        pks = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        queryset.model._base_manager.filter(pk__in=pks).delete()
+        deleted += len(pks)
@@ -0,0 +1,87 @@
+"""
+Routing of opted-in reads to the read replica.
+
+Every query goes to the primary unless the code running it opted in, with
+`read_from_replica()` or `ReplicaReadMixin`, and `DATABASE_REPLICA_ENABLED` is set. Writes
+always go to the primary, and so do reads inside a transaction of the primary. A user who
+wrote, or whose data version was bumped by a task, the admin or the billing path, is
+pinned to the primary for `DATABASE_REPLICA_PIN_SECONDS`. They read those writes however
+far the replica lags behind.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+PIN_KEY = 'db-primary-pin:{user_pk}'
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def _pin_key(user_pk):
+    return PIN_KEY.format(user_pk=user_pk)
+
+
+def pin_to_primary(user_pk):
+    """Sends the reads of `user_pk` to the primary until the replica has caught up."""
+    if user_pk is not None and settings.DATABASE_REPLICA_ENABLED:
+        cache.set(_pin_key(user_pk), 1, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_pk):
+    return user_pk is not None and cache.get(_pin_key(user_pk)) is not None
+
+
+async def ais_pinned(user_pk):
+    return user_pk is not None and await cache.aget(_pin_key(user_pk)) is not None
+
+
+def route_reads_to_replica(enabled=True):
+    """
+    Sends the reads of the current scope to the replica, or back to the primary.
+    Call it within `replica_scope()`, which restores the previous routing on exit.
+    """
+    _use_replica.set(enabled and settings.DATABASE_REPLICA_ENABLED)
+
+
+@contextmanager
+def replica_scope():
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def read_from_replica(user_pk=None):
+    """
+    Sends the reads of the block to the replica, unless `user_pk` is pinned to the primary.
+    """
+    with replica_scope():
+        route_reads_to_replica(not is_pinned(user_pk))
+        yield
+
+
+class ReplicaRouter(object):
+    """
+    Database router sending opted-in reads to the `replica` alias.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DB_ALIAS
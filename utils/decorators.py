@@ -1,30 +1,89 @@
-from django.core.cache import cache
+import hashlib
 from functools import wraps
+from urllib.parse import urlencode
 
+from django.core.cache import cache
+from django.utils.http import parse_etags
+from rest_framework import status
 from rest_framework.response import Response
 
+from utils.cache import get_data_version, record_response_cache
+
+CACHED_HEADERS = ('ETag',)
+
+
+def view_cache_key(view, request, *args, **kwargs):
+    """
+    Builds a response cache key from the view, the user and the normalized query params.
+    Returns None for anonymous requests, which are never cached.
+    """
+    if not request.user.is_authenticated:
+        return None
+    params = sorted(
+        (param, value)
+        for param in request.query_params
+        for value in request.query_params.getlist(param)
+    )
+    query_hash = hashlib.md5(urlencode(params).encode('utf-8')).hexdigest()
+    view_name = f'{view.__class__.__module__}.{view.__class__.__name__}.{getattr(view, "action", None)}'
+    lookup = ':'.join(f'{name}={value}' for name, value in sorted(kwargs.items()))
+    return f'response:{view_name}:{request.user.pk}:{lookup}:{query_hash}'
+
 
-def cache_response(timeout=60 * 15, cache_key=None):
+def owner_data_version(view, request, *args, **kwargs):
+    """
+    Returns the data version of the requesting user, bumped on every write to their resources.
+    """
+    return get_data_version(request.user.pk)
+
+
+def view_cache_version(view, request, *args, **kwargs):
+    """
+    Returns the cache version the view picks with `get_cache_version()`.
+    """
+    return view.get_cache_version(request)
+
+
+def cache_response(timeout=60 * 15, cache_key=view_cache_key, cache_version=None):
     """
     A decorator that caches the response of a DRF method for a specified amount of time.
+
+    `cache_key` and `cache_version` are called with the view method arguments; bumping
+    the version invalidates every response cached under it. A cached `ETag` is replayed
+    and matched against `If-None-Match`.
     """
 
     def decorator(func):
         @wraps(func)
-        def wrapper(*args, **kwargs):
-            if cache_key:
-                key = cache_key(*args, **kwargs)
-            else:
-                key = func.__name__ + str(args) + str(kwargs)
-            cached_data = cache.get(key)
-            if cached_data:
-                return Response(cached_data['data'], status=cached_data['status'])
-            response = func(*args, **kwargs)
-            if not response.status_code == 200:
+        def wrapper(view, request, *args, **kwargs):
+            key = cache_key(view, request, *args, **kwargs) if cache_key else None
+            if key is None:
+                return func(view, request, *args, **kwargs)
+            version = cache_version(view, request, *args, **kwargs) if cache_version else None
+
+            cached_data = cache.get(key, version=version)
+            record_response_cache(hit=cached_data is not None)
+            if cached_data is not None:
+                etag = cached_data['headers'].get('ETag')
+                if_none_match = request.headers.get('If-None-Match')
+                if etag and if_none_match and {etag, '*'} & set(parse_etags(if_none_match)):
+                    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                else:
+                    response = Response(cached_data['data'], status=cached_data['status'])
+                for header, value in cached_data['headers'].items():
+                    response[header] = value
+                response['X-Cache'] = 'HIT'
                 return response
-            data = response.data
-            response_dict = {'data': data, 'status': response.status_code}
-            cache.set(key, response_dict, timeout)
+
+            response = func(view, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                response_dict = {
+                    'data': response.data,
+                    'status': response.status_code,
+                    'headers': {header: response[header] for header in CACHED_HEADERS if response.has_header(header)}
+                }
+                cache.set(key, response_dict, timeout, version=version)
+            response['X-Cache'] = 'MISS'
             return response
 
         return wrapper
@@ -1,4 +1,6 @@
+from django.db import connections
 from django_filters import filters
+from rest_framework.filters import SearchFilter
 
 
 class CommaSeparatedValueFilter(filters.BaseCSVFilter, filters.CharFilter):
@@ -6,3 +8,19 @@ class CommaSeparatedValueFilter(filters.BaseCSVFilter, filters.CharFilter):
         if not value:
             return qs
         return qs.filter(**{f'{self.field_name}__in': value})
+
+
+class IndexedSearchFilter(SearchFilter):
+    """
+    SearchFilter whose default lookup is always answered from an index.
+
+    PostgreSQL keeps the substring `icontains` lookup, served by the `gin_trgm_ops`
+    indexes; other backends fall back to an `istartswith` prefix search on the
+    b-tree index of the field.
+    """
+
+    def construct_search(self, field_name, queryset):
+        lookup = super().construct_search(field_name, queryset)
+        if lookup.endswith('__icontains') and connections[queryset.db].vendor != 'postgresql':
+            return lookup[:-len('icontains')] + 'istartswith'
+        return lookup
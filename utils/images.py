@@ -0,0 +1,37 @@
+from io import BytesIO
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+RENDITION_FORMAT = 'WEBP'
+RENDITION_EXTENSION = 'webp'
+RENDITION_CONTENT_TYPE = 'image/webp'
+
+
+def make_renditions(fp, sizes, quality=85):
+    """
+    Decodes the image in `fp` once and returns `{name: bytes}`, one WebP copy per entry of
+    `sizes` (`{name: max_edge}`) fitting in a `max_edge` square. Images are never upscaled,
+    and each copy is scaled down from the previous, larger one.
+    Raises `ValueError` when `fp` does not hold a decodable image.
+    """
+    try:
+        with Image.open(fp) as source:
+            largest = max(sizes.values())
+            # JPEG decodes straight to a reduced scale when the target is much smaller.
+            source.draft('RGB', (largest, largest))
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as exc:
+        raise ValueError(f'Not a decodable image: {exc}') from exc
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    renditions = {}
+    for name, edge in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        image = image.copy()
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, RENDITION_FORMAT, quality=quality, method=4)
+        renditions[name] = buffer.getvalue()
+    return renditions
@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from rest_framework import throttling
+
+from utils.cache import get_redis_client
+
+
+class SlidingWindowRateThrottle(throttling.SimpleRateThrottle):
+    """
+    Rate throttle counted in the shared cache with a sliding window.
+
+    Each client has a counter per fixed window of `duration` seconds. The request rate is
+    the current counter plus the previous one weighted by the part of it still inside the
+    sliding window, so a client costs two integers however many requests it makes. With
+    django-redis the increment and the read of the previous window go out in one pipeline;
+    other caches fall back to `add`/`incr`. Rejected requests are counted too.
+    """
+    cache = cache
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, elapsed = divmod(self.now, self.duration)
+        self.elapsed_fraction = elapsed / self.duration
+        self.current, self.previous = self.count(f'{self.key}:{int(window)}', f'{self.key}:{int(window) - 1}')
+        return self.get_request_rate() <= self.num_requests
+
+    def get_request_rate(self):
+        return self.previous * (1 - self.elapsed_fraction) + self.current
+
+    def count(self, current_key, previous_key):
+        """
+        Increments the current window counter. Returns it with the previous window count.
+        """
+        # Counters live for two windows: their own and the one weighing them as previous.
+        timeout = self.duration * 2
+        client = get_redis_client()
+        if client is not None:
+            current_key, previous_key = self.cache.make_key(current_key), self.cache.make_key(previous_key)
+            pipeline = client.pipeline()
+            pipeline.incr(current_key)
+            pipeline.expire(current_key, timeout)
+            pipeline.get(previous_key)
+            current, _expire, previous = pipeline.execute()
+            return current, int(previous or 0)
+
+        self.cache.add(current_key, 0, timeout)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # Expired between add and incr.
+            self.cache.set(current_key, 1, timeout)
+            current = 1
+        return current, self.cache.get(previous_key, 0)
+
+    def wait(self):
+        """
+        Seconds until the sliding rate drops below the limit, if no other request comes in.
+        """
+        remaining = 1 - self.elapsed_fraction
+        if self.current >= self.num_requests:
+            # Only the decay of this window, once it becomes the previous one, frees a slot.
+            return (remaining + 1 - self.num_requests / self.current) * self.duration
+        # The previous window decays until it leaves room next to the current count.
+        target = 1 - (self.num_requests - self.current) / self.previous
+        return max(0, target - self.elapsed_fraction) * self.duration